@@ -0,0 +1,161 @@
+import argparse
+import json
+import operator
+import sys
+from typing import Optional, Dict, Iterable, Tuple, Any
+
+import numpy as np
+
+import activity_storage
+
+# Columnar, vectorised reporting over the day records written by save_daily_data. Everything below works on whole
+# arrays; the only per-day Python work is the single pass that turns the parsed history into rows.
+
+FIELDS = activity_storage.DAY_RECORD_FIELDS
+# Short column names used by the analytics API and the CLI.
+COLUMNS = {
+    "active": "total_active_seconds_today", "idle": "total_idle_seconds_today",
+    "max_idle": "max_idle_seconds_today", "max_active": "max_active_seconds_today",
+    "distance": "mouse_total_distance_today", "keystrokes": "keystrokes_today", "clicks": "mouse_clicks_today",
+}
+PERIODS = ("day", "week", "month", "year")
+EFFECTIVE_THRESHOLD = 66.6 # same cut-off the GUI uses for the effectiveness bar colour
+
+class DayColumns:
+    # One datetime64[D] array of days (sorted, unique) plus one float64 array per saved field.
+    def __init__(self, days: np.ndarray, values: np.ndarray):
+        self.days = days
+        self.values = values # shape (len(days), len(FIELDS))
+
+    def __len__(self): return len(self.days)
+
+    def column(self, name: str) -> np.ndarray:
+        field = COLUMNS.get(name, name)
+        if field not in FIELDS: raise ValueError(f"Unknown column {name!r}; expected one of {', '.join(COLUMNS)}")
+        return self.values[:, FIELDS.index(field)]
+
+    @classmethod
+    def from_records(cls, items: Iterable[Tuple[str, Any]]) -> "DayColumns":
+        # Accepts (iso_day, record) pairs; legacy records that are a bare number are treated as active seconds.
+        days = []; rows = []; width = len(FIELDS); row_of = operator.itemgetter(*FIELDS)
+        for day, record in items:
+            if isinstance(record, dict):
+                try: rows.append(row_of(record))
+                except KeyError: rows.append([record.get(f, 0) or 0 for f in FIELDS]) # older records lack some fields
+            elif isinstance(record, (int, float)): rows.append([float(record)] + [0] * (width - 1))
+            else: continue
+            days.append(day)
+        if not days: return cls(np.array([], dtype="datetime64[D]"), np.zeros((0, width)))
+        day_arr = np.array(days, dtype="datetime64[D]"); values = np.array(rows, dtype=np.float64)
+        order = np.argsort(day_arr, kind="stable")
+        return cls(day_arr[order], values[order])
+
+    @classmethod
+    def from_history(cls, data_file: str = activity_storage.DEFAULT_DATA_FILE) -> "DayColumns":
+        return cls.from_records(activity_storage.JournalStore(data_file).load_all().items())
+
+    @classmethod
+    def from_history_db(cls, db, start: str = "0000-01-01", end: str = "9999-12-31") -> "DayColumns":
+        return cls.from_records((r.pop("day"), r) for r in db.days(start, end))
+
+    def between(self, start: Optional[str] = None, end: Optional[str] = None) -> "DayColumns":
+        lo = 0 if start is None else np.searchsorted(self.days, np.datetime64(start, "D"), "left")
+        hi = len(self.days) if end is None else np.searchsorted(self.days, np.datetime64(end, "D"), "right")
+        return DayColumns(self.days[lo:hi], self.values[lo:hi])
+
+def weekdays(days: np.ndarray) -> np.ndarray:
+    # Monday=0 like datetime.date.weekday(); 1970-01-01 was a Thursday.
+    return (days.astype("datetime64[D]").astype(np.int64) + 3) % 7
+
+def period_keys(days: np.ndarray, period: str) -> np.ndarray:
+    if period == "day": return days
+    if period == "week": return days - weekdays(days).astype("timedelta64[D]") # the Monday starting each week
+    if period == "month": return days.astype("datetime64[M]")
+    if period == "year": return days.astype("datetime64[Y]")
+    raise ValueError(f"Unknown period {period!r}; expected one of {', '.join(PERIODS)}")
+
+def effectiveness(active: np.ndarray, idle: np.ndarray) -> np.ndarray:
+    # active / (active + idle) * 100, and 0 where nothing was tracked, exactly as the GUI shows it.
+    total = active + idle
+    return np.divide(active * 100.0, total, out=np.zeros_like(total, dtype=np.float64), where=total > 0)
+
+def rollup(cols: DayColumns, period: str = "week", func: str = "sum") -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    # Per-period totals ("sum"), per-day averages ("mean") or peaks ("max") of every column, plus effectiveness
+    # over the period's summed active/idle time and the number of tracked days.
+    if func not in ("sum", "mean", "max"): raise ValueError("func must be one of sum, mean, max")
+    keys, inverse = np.unique(period_keys(cols.days, period), return_inverse=True)
+    n = len(keys); counts = np.bincount(inverse, minlength=n)
+    sums = np.stack([np.bincount(inverse, weights=cols.values[:, i], minlength=n) for i in range(len(FIELDS))], axis=1) \
+        if n else np.zeros((0, len(FIELDS)))
+    if func == "sum": agg = sums
+    elif func == "mean": agg = sums / np.maximum(counts, 1)[:, None]
+    else: agg = np.full((n, len(FIELDS)), -np.inf); np.maximum.at(agg, inverse, cols.values)
+    out = {name: agg[:, FIELDS.index(field)] for name, field in COLUMNS.items()}
+    out["effectiveness"] = effectiveness(sums[:, FIELDS.index(COLUMNS["active"])], sums[:, FIELDS.index(COLUMNS["idle"])])
+    out["days"] = counts
+    return keys, out
+
+def effectiveness_trend(cols: DayColumns, window: int = 7) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Daily effectiveness and its trailing `window`-day value (summed active / summed active+idle, so long days
+    # weigh more than short ones). Gaps in the calendar are not filled; the window counts tracked days.
+    active = cols.column("active"); idle = cols.column("idle")
+    daily = effectiveness(active, idle)
+    ca = np.concatenate(([0.0], np.cumsum(active))); ci = np.concatenate(([0.0], np.cumsum(idle)))
+    hi = np.arange(1, len(active) + 1); lo = np.maximum(0, hi - window)
+    return cols.days, daily, effectiveness(ca[hi] - ca[lo], ci[hi] - ci[lo])
+
+def percentiles(cols: DayColumns, column: str, q=(10, 25, 50, 75, 90, 99)) -> Dict[float, float]:
+    values = cols.column(column)
+    if not len(values): return {p: 0.0 for p in q}
+    return dict(zip(q, np.percentile(values, q).tolist()))
+
+def weekday_profile(cols: DayColumns, column: str, func: str = "mean") -> np.ndarray:
+    # Seven values, Monday first. "mean" averages over the tracked days falling on each weekday.
+    wd = weekdays(cols.days); values = cols.column(column)
+    totals = np.bincount(wd, weights=values, minlength=7)
+    if func == "sum": return totals
+    if func != "mean": raise ValueError("func must be sum or mean")
+    return totals / np.maximum(np.bincount(wd, minlength=7), 1)
+
+def summary(cols: DayColumns) -> Dict[str, Any]:
+    active = cols.column("active"); idle = cols.column("idle"); daily = effectiveness(active, idle)
+    tracked = (active + idle) > 0
+    return {
+        "days": int(len(cols)), "first_day": str(cols.days[0]) if len(cols) else None, "last_day": str(cols.days[-1]) if len(cols) else None,
+        "active_hours": float(active.sum() / 3600), "idle_hours": float(idle.sum() / 3600),
+        "effectiveness": float(effectiveness(np.array([active.sum()]), np.array([idle.sum()]))[0]),
+        "effective_days": int((daily[tracked] >= EFFECTIVE_THRESHOLD).sum()),
+        "keystrokes": int(cols.column("keystrokes").sum()), "clicks": int(cols.column("clicks").sum()),
+        "distance": float(cols.column("distance").sum()),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Vectorised reports over the activitytracker3000 history")
+    parser.add_argument("--data-file", default=activity_storage.DEFAULT_DATA_FILE)
+    parser.add_argument("--from", dest="start"); parser.add_argument("--to", dest="end")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("summary", help="totals over the whole range")
+    roll = sub.add_parser("rollup", help="per-week/month/year figures")
+    roll.add_argument("--period", default="week", choices=PERIODS); roll.add_argument("--agg", default="sum", choices=("sum", "mean", "max"))
+    pct = sub.add_parser("percentiles", help="distribution of one column across days")
+    pct.add_argument("--column", default="active", choices=sorted(COLUMNS))
+    prof = sub.add_parser("weekdays", help="day-of-week profile of one column")
+    prof.add_argument("--column", default="active", choices=sorted(COLUMNS))
+    args = parser.parse_args(argv)
+
+    cols = DayColumns.from_history(args.data_file).between(args.start, args.end)
+    if args.command == "summary":
+        print(json.dumps(summary(cols), indent=2))
+    elif args.command == "rollup":
+        keys, out = rollup(cols, args.period, args.agg)
+        for i, key in enumerate(keys):
+            print(f"{key}  days {out['days'][i]:>3}  active {out['active'][i] / 3600:8.2f} h  idle {out['idle'][i] / 3600:8.2f} h  "
+                  f"eff {out['effectiveness'][i]:5.1f}%  keys {int(out['keystrokes'][i]):>9}  clicks {int(out['clicks'][i]):>7}")
+    elif args.command == "percentiles":
+        for q, v in percentiles(cols, args.column).items(): print(f"p{q:<3} {v:12.1f}")
+    else:
+        for name, v in zip(("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"), weekday_profile(cols, args.column)): print(f"{name}  {v:12.1f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+import argparse
+import csv
+import datetime
+import gzip
+import io
+import itertools
+import json
+import os
+import struct
+import sys
+from array import array
+from typing import Optional, Dict, Any, List, Tuple, Iterable, Iterator, BinaryIO
+
+import activity_storage
+import focus_store
+
+# --- Configuration ---
+BLOCK_ROWS = 4096 # rows per chunk written (and per block of the columnar format); memory use is bounded by it
+# --- End Configuration ---
+
+# Export of the day records and focus sessions as generator pipelines:
+#   source (streamed from disk) -> date filter -> field selection -> chunks of BLOCK_ROWS -> writer
+# Nothing holds more than one chunk, so the size of the history does not matter.
+#
+# Columns are (name, type) with type one of "date" (ISO day), "f8", "i8", "bool" or "str".
+DAY_COLUMNS: List[Tuple[str, str]] = [("day", "date")] + [
+    (f, "i8" if f in activity_storage.INT_DAY_FIELDS else "f8") for f in activity_storage.DAY_RECORD_FIELDS]
+FOCUS_COLUMNS: List[Tuple[str, str]] = [
+    ("day", "date"), ("start", "f8"), ("end", "f8"), ("planned_seconds", "i8"), ("active_seconds", "f8"),
+    ("effectiveness", "f8"), ("paused_seconds", "f8"), ("interruptions", "i8"), ("completed", "bool")]
+FORMATS = ("csv", "jsonl", "columnar")
+
+# --- Sources ---
+def day_rows(data_file: str = activity_storage.DEFAULT_DATA_FILE, start: Optional[str] = None, end: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    # Day records in [start, end] (ISO dates, inclusive), streamed from the snapshot and journal. Legacy records
+    # that are a bare number are the active seconds.
+    defaults = {f: 0 if t == "i8" else 0.0 for f, t in DAY_COLUMNS[1:]}
+    for day, record in activity_storage.JournalStore(data_file).stream_days():
+        if (start and day < start) or (end and day > end): continue
+        if isinstance(record, (int, float)): record = {"total_active_seconds_today": float(record)}
+        elif not isinstance(record, dict): continue
+        yield {"day": day, **defaults, **{k: v for k, v in record.items() if k in defaults}}
+
+def focus_rows(store_file: str = focus_store.DEFAULT_FOCUS_STORE_FILE, start: Optional[str] = None, end: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    if not os.path.exists(store_file): return
+    t0 = datetime.datetime.fromisoformat(start).timestamp() if start else None
+    t1 = (datetime.datetime.fromisoformat(end) + datetime.timedelta(days=1)).timestamp() if end else None
+    store = focus_store.FocusStore(store_file, writable=False)
+    try: yield from store.iter_range(t0, t1, BLOCK_ROWS)
+    finally: store.close()
+
+# --- Pipeline stages ---
+def select(rows: Iterable[Dict[str, Any]], columns: List[Tuple[str, str]], extra: Optional[Dict[str, Any]] = None) -> Iterator[List[Any]]:
+    names = [n for n, _ in columns]; extra = extra or {}
+    for row in rows: yield [extra[n] if n in extra else row[n] for n in names]
+
+def chunked(rows: Iterable[List[Any]], size: int = BLOCK_ROWS) -> Iterator[List[List[Any]]]:
+    it = iter(rows)
+    while True:
+        block = list(itertools.islice(it, size))
+        if not block: return
+        yield block
+
+def resolve_columns(available: List[Tuple[str, str]], fields: Optional[List[str]], user: Optional[str]) -> List[Tuple[str, str]]:
+    types = dict(available)
+    if fields:
+        unknown = [f for f in fields if f not in types]
+        if unknown: raise ValueError(f"Unknown field(s) {', '.join(unknown)}; expected {', '.join(types)}")
+        columns = [(f, types[f]) for f in fields]
+    else: columns = list(available)
+    return ([("user", "str")] if user is not None else []) + columns
+
+# --- Writers: consume chunks, return rows written ---
+def write_csv(blocks: Iterable[List[List[Any]]], columns: List[Tuple[str, str]], out: BinaryIO) -> int:
+    text = io.TextIOWrapper(out, encoding="utf-8", newline="", write_through=True); n = 0
+    try:
+        w = csv.writer(text); w.writerow([c for c, _ in columns])
+        for block in blocks: w.writerows(block); n += len(block)
+    finally: text.detach()
+    return n
+
+def write_jsonl(blocks: Iterable[List[List[Any]]], columns: List[Tuple[str, str]], out: BinaryIO) -> int:
+    names = [c for c, _ in columns]; n = 0
+    for block in blocks:
+        out.write("".join(json.dumps(dict(zip(names, row)), separators=(",", ":")) + "\n" for row in block).encode("utf-8")); n += len(block)
+    return n
+
+# Columnar: b"AT3KCOL1", u32 length + JSON schema {"columns": [[name, type], ...]}, then blocks of
+#   u32 row count, then every column of the block in schema order:
+#     date  i32 days since 1970-01-01         f8  float64         i8  int64         bool  u8
+#     str   u32 byte length of each value, then the UTF-8 bytes of all values
+# and a final u32 0. All little-endian. A reader can hand each fixed-width column straight to numpy.frombuffer.
+COLUMNAR_MAGIC = b"AT3KCOL1"
+_EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+_U32 = struct.Struct("<I")
+
+def _pack_column(values: List[Any], kind: str) -> bytes:
+    if kind == "date": a = array("i", [datetime.date.fromisoformat(v).toordinal() - _EPOCH_ORDINAL for v in values])
+    elif kind == "f8": a = array("d", values)
+    elif kind == "i8": a = array("q", [int(v) for v in values])
+    elif kind == "bool": return bytes(1 if v else 0 for v in values)
+    else:
+        encoded = [str(v).encode("utf-8") for v in values]
+        a = array("I", map(len, encoded))
+        if sys.byteorder != "little": a.byteswap()
+        return a.tobytes() + b"".join(encoded)
+    if sys.byteorder != "little": a.byteswap()
+    return a.tobytes()
+
+def write_columnar(blocks: Iterable[List[List[Any]]], columns: List[Tuple[str, str]], out: BinaryIO) -> int:
+    schema = json.dumps({"columns": [list(c) for c in columns]}).encode("utf-8")
+    out.write(COLUMNAR_MAGIC + _U32.pack(len(schema)) + schema); n = 0
+    for block in blocks:
+        out.write(_U32.pack(len(block)))
+        for i, (_, kind) in enumerate(columns): out.write(_pack_column([row[i] for row in block], kind))
+        n += len(block)
+    out.write(_U32.pack(0))
+    return n
+
+def read_columnar(f: BinaryIO) -> Iterator[Dict[str, List[Any]]]:
+    # Yields one {column: values} dict per block; the inverse of write_columnar.
+    if f.read(8) != COLUMNAR_MAGIC: raise ValueError("not an activitytracker3000 columnar export")
+    columns = json.loads(f.read(_U32.unpack(f.read(4))[0]))["columns"]
+    sizes = {"date": ("i", 4), "f8": ("d", 8), "i8": ("q", 8)}
+    while True:
+        n = _U32.unpack(f.read(4))[0]
+        if not n: return
+        block = {}
+        for name, kind in columns:
+            if kind == "bool": block[name] = [b != 0 for b in f.read(n)]; continue
+            code, width = sizes.get(kind, ("I", 4))
+            a = array(code); a.frombytes(f.read(n * width))
+            if sys.byteorder != "little": a.byteswap()
+            if kind == "date": block[name] = [datetime.date.fromordinal(d + _EPOCH_ORDINAL).isoformat() for d in a]
+            elif kind == "str":
+                data = f.read(sum(a)); values = []; pos = 0
+                for length in a: values.append(data[pos:pos + length].decode("utf-8")); pos += length
+                block[name] = values
+            else: block[name] = a.tolist()
+        yield block
+
+WRITERS = {"csv": write_csv, "jsonl": write_jsonl, "columnar": write_columnar}
+
+def export(kind: str, fmt: str, out: BinaryIO, source: str, start: Optional[str] = None, end: Optional[str] = None,
+           fields: Optional[List[str]] = None, user: Optional[str] = None) -> int:
+    # kind "days" reads a history file (mouse_activity_log.json or a merged history), "focus" a focus session store.
+    if kind == "days": available, rows = DAY_COLUMNS, day_rows(source, start, end)
+    else: available, rows = FOCUS_COLUMNS, focus_rows(source, start, end)
+    columns = resolve_columns(available, fields, user)
+    return WRITERS[fmt](chunked(select(rows, columns, {"user": user} if user is not None else None)), columns, out)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export activitytracker3000 history as CSV, JSON Lines or columnar binary, streamed in constant memory")
+    parser.add_argument("kind", choices=("days", "focus"))
+    parser.add_argument("--source", help=f"history file for days (default {activity_storage.DEFAULT_DATA_FILE}), "
+                                         f"session store for focus (default {focus_store.DEFAULT_FOCUS_STORE_FILE})")
+    parser.add_argument("--from", dest="start", help="first date (YYYY-MM-DD)"); parser.add_argument("--to", dest="end", help="last date, inclusive")
+    parser.add_argument("--fields", help="comma-separated columns to export (default: all)")
+    parser.add_argument("--format", choices=FORMATS, help="default: from the output name, else csv")
+    parser.add_argument("--user", help="add a user column with this value, for loading several people's exports into one table")
+    parser.add_argument("--gzip", action="store_true", help="compress (implied by an output name ending in .gz)")
+    parser.add_argument("-o", "--output", default="-", help="output file, - for stdout")
+    args = parser.parse_args(argv)
+
+    source = args.source or (activity_storage.DEFAULT_DATA_FILE if args.kind == "days" else focus_store.DEFAULT_FOCUS_STORE_FILE)
+    name = args.output[:-3] if args.output.endswith(".gz") else args.output
+    fmt = args.format or {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".col": "columnar"}.get(os.path.splitext(name)[1], "csv")
+    fields = [f.strip() for f in args.fields.split(",") if f.strip()] if args.fields else None
+    compress = args.gzip or args.output.endswith(".gz")
+    raw = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    out = gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) if compress else raw
+    try: rows = export(args.kind, fmt, out, source, args.start, args.end, fields, args.user)
+    except ValueError as e: print(f"Export failed: {e}", file=sys.stderr); return 1
+    finally:
+        if out is not raw: out.close()
+        if raw is not sys.stdout.buffer: raw.close()
+        else: raw.flush()
+    if args.output != "-": print(f"Exported {rows} {args.kind} rows to {args.output}", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
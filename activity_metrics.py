@@ -0,0 +1,163 @@
+import bisect
+import threading
+import time
+from typing import Optional, Dict, Any, List, Tuple, Callable
+
+import activity_storage
+
+# In-process metrics: counters, gauges and fixed-bucket histograms updated in place by the code they measure, and
+# rendered in the Prometheus text format on demand (HTTP on 127.0.0.1 and/or a file written on exit).
+# Updates take no lock. They run under the GIL, so a concurrent update from another thread can very rarely be lost,
+# which is fine for monitoring and keeps an observe() at a few hundred nanoseconds. With enabled = False every
+# update returns at once and nothing is served.
+
+enabled = True
+LATENCY_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+SIZE_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+_registry: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], Any] = {}
+_help: Dict[str, Tuple[str, str]] = {}
+_registry_lock = threading.Lock()
+
+def set_enabled(flag: bool):
+    global enabled
+    enabled = bool(flag)
+
+class Gauge:
+    # Either set() by the code or read from `fn` at render time, e.g. a counter the code keeps anyway (zero cost
+    # until scraped).
+    __slots__ = ("value", "fn")
+    suffix = ""
+    def __init__(self, fn: Optional[Callable[[], float]] = None): self.value = 0.0; self.fn = fn
+    def set(self, v: float):
+        if enabled: self.value = v
+    def samples(self, name, labels):
+        if self.fn is None: return [(name + self.suffix, labels, self.value)]
+        try: return [(name + self.suffix, labels, self.fn())]
+        except Exception: return []
+
+class Counter(Gauge):
+    __slots__ = ()
+    suffix = "_total"
+    def __init__(self, fn: Optional[Callable[[], float]] = None): super().__init__(fn); self.value = 0
+    def inc(self, n=1):
+        if enabled: self.value += n
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "sum", "count")
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = tuple(bounds); self.counts = [0] * (len(self.bounds) + 1); self.sum = 0.0; self.count = 0
+    def observe(self, v: float):
+        if not enabled: return
+        self.counts[bisect.bisect_left(self.bounds, v)] += 1; self.sum += v; self.count += 1
+    def samples(self, name, labels):
+        out = []; cumulative = 0
+        for bound, n in zip(self.bounds, self.counts):
+            cumulative += n; out.append((name + "_bucket", labels + (("le", _format_value(bound)),), cumulative))
+        out.append((name + "_bucket", labels + (("le", "+Inf"),), cumulative + self.counts[-1]))
+        out += [(name + "_sum", labels, self.sum), (name + "_count", labels, self.count)]
+        return out
+
+def _get(kind: str, cls, name: str, help_text: str, labels: Dict[str, str], *args):
+    key = (name, tuple(sorted(labels.items())))
+    with _registry_lock:
+        metric = _registry.get(key)
+        if metric is None:
+            _help.setdefault(name, (kind, help_text)); metric = _registry[key] = cls(*args)
+        return metric
+
+def histogram(name: str, help_text: str, buckets=LATENCY_BUCKETS, **labels) -> Histogram: return _get("histogram", Histogram, name, help_text, labels, buckets)
+def counter(name: str, help_text: str, fn: Optional[Callable[[], float]] = None, **labels) -> Counter:
+    c = _get("counter", Counter, name, help_text, labels, fn)
+    if fn is not None: c.fn = fn # re-registering a callback points it at the newest owner
+    return c
+def gauge(name: str, help_text: str, fn: Optional[Callable[[], float]] = None, **labels) -> Gauge:
+    g = _get("gauge", Gauge, name, help_text, labels, fn)
+    if fn is not None: g.fn = fn
+    return g
+
+class TimedLock:
+    # Drop-in for threading.Lock (with-statement, acquire/release) that records how long callers wait for it and
+    # how long it is held. Only the holder writes _acquired_at, so no extra locking is needed.
+    __slots__ = ("_lock", "_wait", "_hold", "_acquired_at")
+    def __init__(self, name: str):
+        self._lock = threading.Lock(); self._acquired_at = 0.0
+        self._wait = histogram("activitytracker_lock_wait_seconds", "Time spent waiting to acquire a lock", lock=name)
+        self._hold = histogram("activitytracker_lock_hold_seconds", "Time a lock was held", lock=name)
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        if not enabled:
+            got = self._lock.acquire(blocking, timeout)
+            if got: self._acquired_at = 0.0
+            return got
+        t0 = time.perf_counter(); got = self._lock.acquire(blocking, timeout); t1 = time.perf_counter()
+        if got: self._wait.observe(t1 - t0); self._acquired_at = t1
+        return got
+
+    def release(self):
+        t = self._acquired_at
+        if t: self._hold.observe(time.perf_counter() - t)
+        self._lock.release()
+
+    def locked(self) -> bool: return self._lock.locked()
+    def __enter__(self): self.acquire(); return self
+    def __exit__(self, *exc): self.release()
+
+# --- Exposition ---
+def _format_value(v) -> str:
+    if isinstance(v, int): return str(v)
+    v = float(v)
+    if v != v: return "NaN"
+    if v in (float("inf"), float("-inf")): return "+Inf" if v > 0 else "-Inf"
+    return repr(v)
+
+def _escape(v: str) -> str:
+    return v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def render() -> str:
+    # Prometheus text exposition format 0.0.4.
+    with _registry_lock: items = sorted(_registry.items(), key=lambda kv: kv[0]); helps = dict(_help)
+    lines: List[str] = []; current = None
+    for (name, labels), metric in items:
+        if name != current:
+            current = name; kind, help_text = helps[name]; family = name + getattr(metric, "suffix", "")
+            lines.append(f"# HELP {family} {help_text}"); lines.append(f"# TYPE {family} {kind}")
+        for sample, sample_labels, value in metric.samples(name, labels):
+            label_s = ",".join(f'{k}="{_escape(str(v))}"' for k, v in sample_labels)
+            lines.append(f"{sample}{{{label_s}}} {_format_value(value)}" if label_s else f"{sample} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+def dump(path: str):
+    activity_storage.atomic_write_text(path, render())
+
+def _metrics_handler():
+    # http.server is imported only when the endpoint is started: it costs more at startup than everything else here.
+    import http.server
+    class MetricsHandler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] not in ("/metrics", "/"): self.send_error(404); return
+            body = render().encode("utf-8")
+            self.send_response(200); self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body))); self.end_headers(); self.wfile.write(body)
+        def log_message(self, format, *args): pass # scrapes every few seconds would flood stdout
+    return http.server.ThreadingHTTPServer, MetricsHandler
+
+class MetricsServer:
+    # Serves render() on http://127.0.0.1:<port>/metrics (never on other interfaces) and writes it to dump_file
+    # on stop(). port None/0 skips the endpoint, dump_file None the file; nothing runs while metrics are disabled.
+    def __init__(self, port: Optional[int], dump_file: Optional[str] = None):
+        self.port = port; self.dump_file = dump_file; self._server = None
+
+    def start(self):
+        if not enabled or not self.port: return
+        server_cls, handler = _metrics_handler()
+        try: self._server = server_cls(("127.0.0.1", self.port), handler)
+        except OSError as e: print(f"Metrics endpoint unavailable on 127.0.0.1:{self.port}: {e}"); return
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True, name="MetricsHTTP").start()
+
+    def stop(self):
+        if self._server is not None: self._server.shutdown(); self._server.server_close(); self._server = None
+        if enabled and self.dump_file:
+            try: dump(self.dump_file)
+            except Exception as e: print(f"Error writing metrics to {self.dump_file}: {e}")
@@ -0,0 +1,46 @@
+from array import array
+from typing import Optional, Tuple
+
+# --- Configuration ---
+RATE_WINDOWS = (60, 300, 900) # seconds: the 1, 5 and 15 minute rates
+RING_SECONDS = 1024 # per-second slots kept; must exceed the longest window
+# --- End Configuration ---
+
+class RollingCounter:
+    # Sliding-window counts over the last RATE_WINDOWS seconds of a running total that only grows (the listener
+    # accumulators' keystrokes, clicks and distance). Slot s % RING_SECONDS holds the total at the end of second s,
+    # so the count over the last W seconds is the current total minus one slot: reads are O(1) for any window,
+    # and memory is two fixed arrays however long the process runs.
+    #
+    # advance() is called by the one thread that grows the total, just before it adds an event. Within a second it
+    # is a single comparison; at the first event of a new second it closes the seconds since the previous event
+    # (at most RING_SECONDS slots after a long pause, so amortised O(1) per event). Readers on other threads only
+    # read, without a lock; a count read during an update can be off by that one event.
+    __slots__ = ("_cum", "_stamp", "_sec", "_base")
+    def __init__(self):
+        self._cum = array("d", bytes(8 * RING_SECONDS)); self._stamp = array("q", [-1]) * RING_SECONDS
+        self._sec: Optional[int] = None; self._base = 0.0
+
+    def advance(self, now: float, total: float):
+        sec = int(now); last = self._sec
+        if sec == last: return
+        if last is None or sec < last:
+            # First event, or the clock was set back: start over, so no slot from the old timeline is read.
+            self._base = total
+            if last is not None: self._stamp = array("q", [-1]) * RING_SECONDS
+        else:
+            cum = self._cum; stamp = self._stamp
+            for s in range(max(last, sec - RING_SECONDS), sec): i = s % RING_SECONDS; cum[i] = total; stamp[i] = s
+        self._sec = sec
+
+    def count(self, now: float, total: float, window: int) -> float:
+        # Events (or pixels) over the `window` seconds up to `now`, given the owner's current total.
+        last = self._sec
+        if last is None: return 0.0
+        s0 = int(now) - window
+        if s0 >= last: return 0.0 # nothing since the window opened
+        i = s0 % RING_SECONDS
+        return max(0.0, total - (self._cum[i] if self._stamp[i] == s0 else self._base))
+
+    def per_minute(self, now: float, total: float) -> Tuple[float, ...]:
+        return tuple(self.count(now, total, w) * 60.0 / w for w in RATE_WINDOWS)
@@ -0,0 +1,226 @@
+import argparse
+import bisect
+import datetime
+import math
+import os
+import struct
+import sys
+import threading
+import time
+from typing import Optional, Dict, Any, List, Tuple
+
+import activity_state
+
+# --- Configuration ---
+DEFAULT_RECORD_DIR = "recordings"
+FLUSH_INTERVAL = 5.0 # seconds of input buffered in memory before it is written out
+FLUSH_BYTES = 64 * 1024
+# --- End Configuration ---
+
+# Raw input streams, one file per writer per day: <dir>/YYYY-MM-DD.<stream>.rec with stream mouse, keys or session.
+# A file is a 16-byte header followed by fixed 16-byte little-endian records:
+#   timestamp  f64  time.time() of the event
+#   dx, dy     i16  pointer movement since the previous move (0 for everything else), clamped to the i16 range
+#   kind       u8   one of the event kinds below, then 3 bytes of padding
+# Fixed-size records keep writing to one pack per event and let the replay read every column as a strided
+# memoryview without unpacking tuples.
+MOVE, CLICK, KEY, START, STOP, PAUSE, RESUME = 1, 2, 3, 4, 5, 6, 7
+STREAMS = ("mouse", "keys", "session")
+_RECORD = struct.Struct("<dhhB3x")
+RECORD_SIZE = _RECORD.size
+_FILE_HEADER = b"AT3KREC1" + bytes(8)
+
+def record_path(day: str, stream: str, directory: str = DEFAULT_RECORD_DIR) -> str:
+    return os.path.join(directory, f"{day}.{stream}.rec")
+
+def _day_bounds(t: float) -> Tuple[str, float]:
+    day = datetime.date.fromtimestamp(t)
+    return day.isoformat(), datetime.datetime.combine(day + datetime.timedelta(days=1), datetime.time()).timestamp()
+
+class RecordStream:
+    # Buffered append-only stream written by one listener thread. The buffer goes to disk every FLUSH_INTERVAL
+    # seconds or FLUSH_BYTES, and the stream switches to the next day's file at local midnight. Appending takes no
+    # lock; flush() may also be called from the saving thread, and only ever writes and removes a prefix of the
+    # buffer, so a record appended meanwhile is kept for the next flush.
+    def __init__(self, stream: str, directory: str = DEFAULT_RECORD_DIR):
+        self.stream = stream; self.directory = directory
+        self._buf = bytearray(); self._file = None; self._day_end = 0.0; self._last_flush = 0.0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _rotate(self, t: float):
+        day, day_end = _day_bounds(t)
+        with self._lock:
+            self._flush_locked()
+            if self._file is not None: self._file.close()
+            self._file = open(record_path(day, self.stream, self.directory), "ab")
+            if self._file.tell() == 0: self._file.write(_FILE_HEADER)
+        self._day_end = day_end; self._last_flush = t
+
+    def write(self, kind: int, t: float, dx: int = 0, dy: int = 0):
+        if t >= self._day_end: self._rotate(t)
+        buf = self._buf; buf += _RECORD.pack(t, dx, dy, kind)
+        if len(buf) >= FLUSH_BYTES or t - self._last_flush >= FLUSH_INTERVAL: self.flush(); self._last_flush = t
+
+    def flush(self):
+        with self._lock: self._flush_locked()
+
+    def _flush_locked(self):
+        f = self._file; n = len(self._buf)
+        if f is None or not n: return
+        f.write(self._buf[:n]); f.flush(); del self._buf[:n]
+
+    def close(self):
+        with self._lock:
+            self._flush_locked()
+            if self._file is not None: self._file.close(); self._file = None
+
+class MouseRecorder(RecordStream):
+    def __init__(self, directory: str = DEFAULT_RECORD_DIR):
+        super().__init__("mouse", directory); self._last_pos = None
+
+    def move(self, t: float, x: int, y: int):
+        last = self._last_pos; self._last_pos = (x, y)
+        if last is None: self.write(MOVE, t); return
+        self.write(MOVE, t, max(-32768, min(32767, int(x - last[0]))), max(-32768, min(32767, int(y - last[1]))))
+
+    def click(self, t: float): self.write(CLICK, t)
+
+class KeyRecorder(RecordStream):
+    def __init__(self, directory: str = DEFAULT_RECORD_DIR): super().__init__("keys", directory)
+    def key(self, t: float): self.write(KEY, t)
+
+class SessionRecorder(RecordStream):
+    # Start/stop and pause/resume marks from the tracking loop; rare, so every mark is written through at once.
+    def __init__(self, directory: str = DEFAULT_RECORD_DIR): super().__init__("session", directory)
+    def mark(self, kind: int, t: float): self.write(kind, t); self.flush()
+
+# --- Re-processing ---
+class DayRecording:
+    # One day's streams as zero-copy column views: times/kinds (and dx/dy for the mouse) per stream.
+    def __init__(self, day: str, directory: str = DEFAULT_RECORD_DIR):
+        self.day = day; self.columns: Dict[str, Dict[str, Any]] = {}; self._times: Optional[List[float]] = None
+        for stream in STREAMS:
+            path = record_path(day, stream, directory); data = b""
+            if os.path.exists(path):
+                with open(path, "rb") as f: data = f.read()
+                if data[:8] != _FILE_HEADER[:8]: raise ValueError(f"{path} is not an input recording")
+            body = memoryview(data)[len(_FILE_HEADER):] if data else memoryview(b"")
+            body = body[:len(body) - len(body) % RECORD_SIZE] # a torn last record from a crash is ignored
+            self.columns[stream] = {
+                "time": body.cast("d")[::2], "kind": body[12::RECORD_SIZE],
+                "dx": body.cast("h")[4::8], "dy": body.cast("h")[5::8], "count": len(body) // RECORD_SIZE,
+            }
+
+    def activity_times(self) -> List[float]:
+        # Every input timestamp, in order; built once and shared by replays under different settings. Both
+        # listener streams are already sorted, so the sort is a linear merge.
+        if self._times is None: self._times = sorted([*self.columns["mouse"]["time"], *self.columns["keys"]["time"]])
+        return self._times
+
+    def marks(self) -> List[Tuple[float, int]]:
+        c = self.columns["session"]; return list(zip(c["time"], c["kind"]))
+
+    def counters(self) -> Dict[str, Any]:
+        m = self.columns["mouse"]; clicks = bytes(m["kind"]).count(CLICK)
+        return {"mouse_total_distance_today": sum(map(math.hypot, m["dx"], m["dy"])), "mouse_clicks_today": clicks,
+                "keystrokes_today": self.columns["keys"]["count"], "mouse_moves": m["count"] - clicks}
+
+def replay(rec: DayRecording, inactivity_timeout: float, focus_minutes: float = 25, break_minutes: float = 5) -> Dict[str, Any]:
+    # Feeds the day through activity_state exactly as the tracking loop would have run it, but only at the moments
+    # where something can change: at each input that ends an idle spell, at each inactivity expiry, at every timer
+    # boundary and at the session marks. Totals do not depend on when passes happen, so this matches a live run
+    # with the same settings, at a cost proportional to the number of activity spells rather than events.
+    day_start = datetime.datetime.combine(datetime.date.fromisoformat(rec.day), datetime.time()).timestamp()
+    day_end = day_start + 86400
+    times = rec.activity_times(); marks = rec.marks()
+    # From the first start (or midnight) to the last stop (or midnight, or now for today). Between a stop and the
+    # next start nothing was tracked, which is the same as a pause.
+    start = marks[0][0] if marks and marks[0][1] == START else day_start
+    end = marks[-1][0] if marks and marks[-1][1] == STOP else min(day_end, time.time())
+    st = activity_state.new_state(start, focus_minutes * 60, break_minutes * 60)
+    focus_sessions: List[Dict[str, Any]] = []; spells = 0
+    tick = start; paused = False
+
+    def run_until(t: float, last_act: Optional[float] = None):
+        # Advance to t, ending timer periods on the way; last_act (if given) takes effect at t.
+        if paused: return
+        while st["timer_seconds_remaining"] > 0 and tick + st["timer_seconds_remaining"] < t:
+            one_pass(tick + st["timer_seconds_remaining"])
+        if last_act is not None: st["last_activity_time"] = last_act
+        one_pass(t)
+
+    def one_pass(t: float):
+        nonlocal tick
+        elapsed = max(0.0, t - tick)
+        active_part, _, _ = activity_state.advance_activity(st, t, elapsed, inactivity_timeout)
+        ended = activity_state.advance_timer(st, elapsed, active_part)
+        if ended is not None and ended["ended"] == "focus":
+            focus_sessions.append({"end_time": t, "effectiveness": ended["effectiveness"], "duration_minutes": ended["duration_minutes"]})
+        tick = t
+
+    def launch(t: float):
+        # A (re)started tracker: fresh state as at launch, with the day's totals and spells carried over as
+        # load_daily_data reads them back; its first pass has nothing to account and marks it active.
+        fresh = activity_state.new_state(t, focus_minutes * 60, break_minutes * 60)
+        st.update({k: v for k, v in fresh.items() if not k.endswith(("_today", "_duration"))})
+        one_pass(t)
+
+    # Input while paused or stopped is ignored, as the listeners do. In the tracked intervals, spells are runs of
+    # input with gaps shorter than the timeout; only their first and last input matter.
+    intervals = []; open_at = start
+    for t, kind in marks:
+        if kind in (PAUSE, STOP) and open_at is not None: intervals.append((open_at, t)); open_at = None
+        elif kind in (RESUME, START) and open_at is None: open_at = t
+    if open_at is not None: intervals.append((open_at, end))
+    events: List[Tuple[float, int, float]] = [(t, 0, float(kind)) for t, kind in marks]
+    for a, b in intervals:
+        i = bisect.bisect_left(times, a); n = bisect.bisect_left(times, min(b, end))
+        while i < n:
+            first = times[i]; last = first; i += 1
+            while i < n and times[i] - last < inactivity_timeout: last = times[i]; i += 1
+            events.append((first, 1, last)); spells += 1
+    events.sort() # a mark sorts before input at the same instant
+    launch(start)
+    for t, is_input, payload in events:
+        if t < start or t > end: continue
+        if not is_input:
+            kind = int(payload)
+            if kind in (PAUSE, STOP) and not paused: run_until(t); paused = True
+            elif kind == START and paused: paused = False; tick = t; launch(t)
+            elif kind == RESUME and paused: paused = False; tick = t; one_pass(t)
+            continue
+        if st["prev_overall_active_state"] and st["last_activity_time"] + inactivity_timeout < t:
+            run_until(st["last_activity_time"] + inactivity_timeout) # the previous spell runs out first
+        run_until(t, last_act=t)
+        # Inputs inside the spell keep it active; only its last one decides when it expires.
+        st["last_activity_time"] = payload
+    run_until(end)
+    totals = {k: st[k] for k in ("total_active_seconds_today", "total_idle_seconds_today", "max_active_seconds_today",
+                                 "max_idle_seconds_today", "last_activity_duration", "last_inactivity_duration")}
+    return {"inactivity_timeout": inactivity_timeout, "focus_minutes": focus_minutes, "break_minutes": break_minutes,
+            "spells": spells, "focus_sessions": focus_sessions, **totals}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-process recorded input under other inactivity timeouts or timer settings")
+    parser.add_argument("--dir", default=DEFAULT_RECORD_DIR)
+    sub = parser.add_subparsers(dest="command", required=True)
+    rp = sub.add_parser("replay", help="recompute a day's active/idle time and focus sessions")
+    rp.add_argument("day"); rp.add_argument("--timeout", type=float, nargs="+", default=[5.0])
+    rp.add_argument("--focus", type=float, default=25); rp.add_argument("--break", dest="break_minutes", type=float, default=5)
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter(); rec = DayRecording(args.day, args.dir); counters = rec.counters()
+    print(f"{args.day}: {counters['mouse_moves']} moves, {counters['mouse_clicks_today']} clicks, "
+          f"{counters['keystrokes_today']} keys, {counters['mouse_total_distance_today']:,.0f} px")
+    for timeout in args.timeout:
+        r = replay(rec, timeout, args.focus, args.break_minutes)
+        eff = [s["effectiveness"] for s in r["focus_sessions"]]
+        print(f"timeout {timeout:>6.1f}s  active {activity_state.format_hms_string(r['total_active_seconds_today'])}  "
+              f"idle {activity_state.format_hms_string(r['total_idle_seconds_today'])}  spells {r['spells']:>5}  "
+              f"focus sessions {len(eff)}" + (f" (avg {sum(eff) / len(eff):.1f}% effective)" if eff else ""))
+    print(f"({(time.perf_counter() - t0) * 1000:.0f} ms)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+import heapq
+import itertools
+from typing import Optional, Dict, List
+
+class DeadlineScheduler:
+    # Named deadlines on the monotonic clock in one binary heap. schedule() replaces the name's previous deadline
+    # and cancel() drops it, in O(log n) and O(1): a replaced entry is only marked dead, and is discarded when it
+    # reaches the top (or when dead entries outnumber live ones, so the heap stays bounded). next_deadline() and
+    # pop_due() only look at the top, so nothing is scanned while nothing is due.
+    # Owned by one thread (the tracking loop); other threads change what it should schedule and wake that thread.
+    def __init__(self):
+        self._heap: List[list] = []; self._entries: Dict[str, list] = {}; self._seq = itertools.count()
+
+    def schedule(self, name: str, when: float):
+        old = self._entries.get(name)
+        if old is not None:
+            if abs(old[0] - when) < 1e-6: return # same deadline, recomputed from other clock readings
+            old[2] = None
+        entry = [when, next(self._seq), name]; self._entries[name] = entry
+        heapq.heappush(self._heap, entry)
+        if len(self._heap) > 2 * len(self._entries) + 16:
+            self._heap = [e for e in self._heap if e[2] is not None]; heapq.heapify(self._heap)
+
+    def cancel(self, name: str):
+        entry = self._entries.pop(name, None)
+        if entry is not None: entry[2] = None
+
+    def when(self, name: str) -> Optional[float]:
+        entry = self._entries.get(name)
+        return None if entry is None else entry[0]
+
+    def next_deadline(self) -> Optional[float]:
+        heap = self._heap
+        while heap and heap[0][2] is None: heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def pop_due(self, now: float) -> List[str]:
+        # Names whose deadline is at or before `now`, earliest first; they are no longer scheduled.
+        heap = self._heap; due = []
+        while heap and (heap[0][2] is None or heap[0][0] <= now):
+            entry = heapq.heappop(heap); name = entry[2]
+            if name is not None: del self._entries[name]; due.append(name)
+        return due
+
+    def __len__(self) -> int:
+        return len(self._entries)
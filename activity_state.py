@@ -0,0 +1,74 @@
+from typing import Optional, Dict, Any, Tuple
+
+# The active/idle state machine and the focus/break timer, free of clocks, locks and I/O. The tracking loop runs
+# them on app_state (under state_lock); activity_recorder runs them on a private dict to re-process recorded input
+# under other settings. `st` needs the app_state keys used below.
+
+def format_hms_string(s: float) -> str:
+    s=max(0,s); h=s//3600; m=(s%3600)//60; s%=60; return f"{int(h):02d}:{int(m):02d}:{int(s):02d}"
+
+def split_active_interval(was_active: bool, last_act_time: float, t0: float, t1: float, timeout: float) -> float:
+    # Seconds of [t0, t1] still covered by the inactivity timeout of the last input; the rest of the span is idle.
+    if not was_active or t1 <= t0: return 0.0
+    return max(0.0, min(t1, last_act_time + timeout) - t0)
+
+def new_state(now: float, focus_seconds: float, break_seconds: float) -> Dict[str, Any]:
+    # Same starting point as a freshly launched tracker: the launch counts as the last input (as in the engine's
+    # _INITIAL_STATE), so the first pass finds it active and the first spell runs from `now`.
+    return {
+        "last_activity_time": now, "prev_overall_active_state": False,
+        "current_activity_start_time": now, "current_idle_start_time": None,
+        "total_active_seconds_today": 0.0, "total_idle_seconds_today": 0.0,
+        "max_active_seconds_today": 0.0, "max_idle_seconds_today": 0.0,
+        "last_activity_duration": 0.0, "last_inactivity_duration": 0.0,
+        "focus_duration_seconds": focus_seconds, "break_duration_seconds": break_seconds,
+        "timer_mode": "focus", "timer_seconds_remaining": focus_seconds, "current_focus_active_seconds": 0.0,
+    }
+
+def advance_activity(st: Dict[str, Any], now: float, elapsed: float, timeout: float) -> Tuple[float, bool, Optional[str]]:
+    # Accounts the `elapsed` seconds ending at `now` as active/idle and applies any transition.
+    # Returns (active seconds of the span, active now, transition message or None).
+    last_act_time = st["last_activity_time"]; was_active = st["prev_overall_active_state"]
+    cur_idle_start_ts = st["current_idle_start_time"]; cur_act_start_ts = st["current_activity_start_time"]
+    active_now = (now - last_act_time) < timeout
+    active_part = split_active_interval(was_active, last_act_time, now - elapsed, now, timeout)
+    idle_part = elapsed - active_part
+    message = None
+    if was_active and not active_now:
+        st["current_idle_start_time"] = last_act_time
+        if cur_act_start_ts is not None:
+            act_dur = last_act_time - cur_act_start_ts
+            if act_dur > 0: st["last_activity_duration"] = act_dur; st["max_active_seconds_today"] = max(st["max_active_seconds_today"], act_dur)
+        st["current_activity_start_time"] = None; message = "Became inactive."
+    elif not was_active and active_now:
+        st["current_activity_start_time"] = now
+        if cur_idle_start_ts is not None:
+            idle_dur = now - cur_idle_start_ts
+            if idle_dur > 1.0:
+                st["last_inactivity_duration"] = idle_dur; st["max_idle_seconds_today"] = max(st["max_idle_seconds_today"], idle_dur)
+                message = f"Active after {format_hms_string(idle_dur)} idle."
+            else: message = "Active (short idle)."
+        else: message = "Became active."
+        st["current_idle_start_time"] = None
+    st["total_active_seconds_today"] += active_part
+    if cur_idle_start_ts is not None or (was_active and not active_now): st["total_idle_seconds_today"] += idle_part
+    st["prev_overall_active_state"] = active_now
+    return active_part, active_now, message
+
+def advance_timer(st: Dict[str, Any], elapsed: float, active_part: float) -> Optional[Dict[str, Any]]:
+    # Runs the focus/break timer for `elapsed` seconds, `active_part` of them active. Returns the period that ended,
+    # if any: {"ended": "focus", "effectiveness", "duration_minutes", "focus_seconds", "active_seconds", "break_seconds"} or
+    # {"ended": "break", "break_seconds", "focus_seconds"}.
+    timer_mode = st["timer_mode"]
+    if timer_mode == "focus": st["current_focus_active_seconds"] += active_part
+    st["timer_seconds_remaining"] -= elapsed
+    if st["timer_seconds_remaining"] > 0: return None
+    break_seconds = st["break_duration_seconds"]; focus_seconds = st["focus_duration_seconds"]
+    if timer_mode == "focus":
+        effectiveness = (st["current_focus_active_seconds"] / focus_seconds) * 100 if focus_seconds > 0 else 0.0
+        active_seconds = st["current_focus_active_seconds"]
+        st["timer_mode"] = "break"; st["timer_seconds_remaining"] = break_seconds; st["current_focus_active_seconds"] = 0.0
+        return {"ended": "focus", "effectiveness": effectiveness, "duration_minutes": int(focus_seconds / 60), "focus_seconds": focus_seconds,
+                "active_seconds": active_seconds, "break_seconds": break_seconds}
+    st["timer_mode"] = "focus"; st["timer_seconds_remaining"] = focus_seconds; st["current_focus_active_seconds"] = 0.0
+    return {"ended": "break", "break_seconds": break_seconds, "focus_seconds": focus_seconds}
@@ -0,0 +1,210 @@
+import json
+import os
+import re
+import tempfile
+import threading
+from typing import Optional, Dict, Any, Iterator, Iterable, Tuple
+
+# --- Configuration ---
+DEFAULT_DATA_FILE = "mouse_activity_log.json"
+JOURNAL_SUFFIX = ".journal"
+JOURNAL_COMPACT_RECORDS = 240  # ~4 hours of 60 s checkpoints before folding the journal into the snapshot
+# --- End Configuration ---
+
+# Fields save_daily_data writes for every day, in file order.
+DAY_RECORD_FIELDS = [
+    "total_active_seconds_today", "total_idle_seconds_today", "max_idle_seconds_today",
+    "max_active_seconds_today", "mouse_total_distance_today", "keystrokes_today", "mouse_clicks_today",
+    "last_activity_duration", "last_inactivity_duration",
+]
+INT_DAY_FIELDS = {"keystrokes_today", "mouse_clicks_today"}
+
+def atomic_write_text(path: str, text: str):
+    # Write to a sibling temp file and rename over the target, so readers and crashes only ever see a whole file.
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text); f.flush(); os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try: os.unlink(tmp_path)
+        except OSError: pass
+        raise
+
+def read_snapshot(path: str) -> Dict[str, Any]:
+    if not os.path.exists(path): return {}
+    with open(path, "r", encoding="utf-8") as f: content = f.read()
+    return json.loads(content) if content else {}
+
+_WS = re.compile(r"\s*")
+
+def iter_snapshot(path: str, chunk_size: int = 1 << 16) -> Iterator[Tuple[str, Any]]:
+    # Yields the (day, record) pairs of a snapshot in file order while holding only one chunk and one record in
+    # memory, for exports of histories too large to parse in one go. A bare number that runs to the end of the
+    # buffer, or stops at a character that could continue it ("12." of "12.5"), might be cut off, so it is decoded
+    # again once more data has been read.
+    if not os.path.exists(path): return
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buf = ""; pos = 0; eof = False
+        def more() -> bool:
+            nonlocal buf, pos, eof
+            if eof: return False
+            chunk = f.read(chunk_size); eof = not chunk
+            buf = buf[pos:] + chunk; pos = 0
+            return not eof
+        def token():
+            # The next non-blank character, refilling as needed ("" at the end of the file).
+            nonlocal pos
+            while True:
+                pos = _WS.match(buf, pos).end()
+                if pos < len(buf) or not more(): return buf[pos:pos + 1]
+        def value():
+            nonlocal pos
+            while True:
+                try:
+                    v, end = decoder.raw_decode(buf, pos)
+                    if eof or (end < len(buf) and buf[end] not in "0123456789.eE+-"): pos = end; return v
+                except ValueError:
+                    if eof: raise
+                if not more(): v, pos = decoder.raw_decode(buf, pos); return v
+        if token() == "": return
+        if token() != "{": raise ValueError(f"{path} is not a JSON object")
+        pos += 1
+        while True:
+            c = token()
+            if c == "}": return
+            if c == ",": pos += 1; continue
+            key = value()
+            if token() != ":": raise ValueError(f"{path}: expected ':' after {key!r}")
+            pos += 1; token()
+            yield key, value()
+
+class JournalStore:
+    # History = snapshot (the classic mouse_activity_log.json, one object keyed by ISO date) + an append-only
+    # journal of compact checkpoint lines. A checkpoint only appends one line. Once JOURNAL_COMPACT_RECORDS have
+    # piled up, a background thread folds the journal into the snapshot; only reading the journal and replacing it
+    # hold the store's lock, so checkpoints never wait for the snapshot rewrite. Both files are replaced atomically
+    # and replay is idempotent (the last checkpoint for a day wins), so a crash at any point loses at most the line
+    # being appended.
+    #
+    # The first journal line is a header naming the newest day already in the snapshot. The journal is re-seeded
+    # with that day's record on compaction, so reading the current day never needs the (large) snapshot.
+    def __init__(self, data_file: str = DEFAULT_DATA_FILE, compact_every: int = JOURNAL_COMPACT_RECORDS):
+        self.data_file = data_file
+        self.journal_file = os.path.splitext(data_file)[0] + JOURNAL_SUFFIX
+        self.compact_every = compact_every
+        self._lock = threading.Lock(); self._compact_lock = threading.Lock()
+        self._journal_records: Optional[int] = None
+        self._compactor: Optional[threading.Thread] = None; self._tail_checked = False
+
+    def _replay_journal(self) -> Tuple[Optional[Dict[str, Any]], Dict[str, Dict[str, Any]], int]:
+        header = None; days = {}; records = 0
+        if not os.path.exists(self.journal_file): return None, days, 0
+        with open(self.journal_file, "r", encoding="utf-8") as f:
+            for line in f:
+                try: entry = json.loads(line)
+                except ValueError: continue  # torn tail from a crash mid-append
+                if not isinstance(entry, dict): continue
+                if "snapshot_through" in entry: header = entry; continue
+                day = entry.pop("day", None)
+                if day: days[day] = entry; records += 1
+        return header, days, records
+
+    def read_day(self, day: str) -> Optional[Any]:
+        # Startup path: reads the journal only, so its cost does not grow with the history.
+        with self._lock:
+            header, days, records = self._replay_journal()
+            if self._journal_records is None: self._journal_records = records
+        if header is None and os.path.exists(self.data_file):
+            # First run on a pre-journal file: fold once to write the header, so later starts skip the snapshot.
+            try:
+                self.compact()
+                with self._lock: header, days, _ = self._replay_journal()
+            except Exception as e: print(f"Warning compacting {self.data_file}: {e}")
+        if day in days: return days[day]
+        if header is not None and (header["snapshot_through"] or "") < day: return None
+        # An older day (or the compaction above failed): only then parse the snapshot.
+        try: return read_snapshot(self.data_file).get(day)
+        except Exception as e: print(f"Warning loading {self.data_file}: {e}"); return None
+
+    def load_all(self) -> Dict[str, Any]:
+        with self._lock:
+            try: full_data = read_snapshot(self.data_file)
+            except Exception as e: print(f"Warning loading {self.data_file}: {e}"); full_data = {}
+            full_data.update(self._replay_journal()[1])
+        return full_data
+
+    def iter_days(self) -> Iterator[Tuple[str, Any]]:
+        yield from sorted(self.load_all().items())
+
+    def stream_days(self) -> Iterator[Tuple[str, Any]]:
+        # Like iter_days in constant memory: snapshot days in file order with their journal records (a few hundred
+        # lines at most) substituted, then the days only the journal has. A compaction meanwhile is harmless; the
+        # open snapshot keeps its contents after being replaced.
+        with self._lock: days = self._replay_journal()[1]
+        for day, record in iter_snapshot(self.data_file): yield day, days.pop(day, record)
+        yield from sorted(days.items())
+
+    def append_checkpoint(self, day: str, record: Dict[str, Any]) -> int:
+        return self.append_checkpoints([(day, record)])
+
+    def append_checkpoints(self, items: Iterable[Tuple[str, Dict[str, Any]]]) -> int:
+        # Appends one line per (day, record) with a single write and fsync; returns the bytes written. Starts a
+        # background compaction when the journal has grown long enough.
+        lines = [json.dumps({"day": day, **record}, separators=(",", ":")) + "\n" for day, record in items]
+        if not lines: return 0
+        text = "".join(lines)
+        with self._lock:
+            if self._journal_records is None:
+                self._journal_records = self._replay_journal()[2]
+            if not self._tail_checked: text = self._torn_tail_locked() + text; self._tail_checked = True
+            with open(self.journal_file, "a", encoding="utf-8") as f:
+                f.write(text); f.flush(); os.fsync(f.fileno())
+            self._journal_records += len(lines)
+            if self._journal_records >= self.compact_every and self._compactor is None:
+                self._compactor = threading.Thread(target=self._compact_in_background, daemon=True, name="JournalCompact")
+                self._compactor.start()
+        return len(text.encode("utf-8"))
+
+    def _torn_tail_locked(self) -> str:
+        # "\n" when a crash left the journal's last line unterminated, so the next checkpoint starts a line of its own.
+        try:
+            with open(self.journal_file, "rb") as f: f.seek(-1, os.SEEK_END); return "" if f.read(1) == b"\n" else "\n"
+        except OSError: return "" # missing or empty
+
+    def _compact_in_background(self):
+        try: self.compact()
+        except Exception as e: print(f"Warning compacting {self.data_file}: {e}")
+        finally:
+            with self._lock: self._compactor = None
+
+    def join_compaction(self, timeout: Optional[float] = None):
+        # Waits for a background compaction, if one is running; short-lived processes call this before exiting.
+        worker = self._compactor
+        if worker is not None: worker.join(timeout)
+
+    def compact(self) -> int:
+        # Folds the journal into the snapshot and returns the bytes written. The snapshot is read and rewritten
+        # without the store's lock. Until the journal is replaced, it still holds every folded day, so readers
+        # see the same history from either snapshot. Lines appended meanwhile are carried over to the new journal.
+        with self._compact_lock:
+            with self._lock:
+                header, days, records = self._replay_journal()
+                if header is not None and records <= 1 and set(days) <= {header["snapshot_through"]}:
+                    self._journal_records = records; return 0 # only the seed line: nothing to fold
+                folded = os.path.getsize(self.journal_file) if os.path.exists(self.journal_file) else 0
+            full_data = read_snapshot(self.data_file)
+            full_data.update(days); full_data = dict(sorted(full_data.items())) # days may arrive out of order (merges)
+            snapshot_text = json.dumps(full_data, separators=(",", ":"))
+            atomic_write_text(self.data_file, snapshot_text)
+            newest = max(full_data) if full_data else None; seed = ""
+            if newest is not None and isinstance(full_data[newest], dict):
+                seed = json.dumps({"day": newest, **full_data[newest]}, separators=(",", ":")) + "\n"
+            with self._lock:
+                with open(self.journal_file, "rb") as f: f.seek(folded); tail = f.read().decode("utf-8")
+                journal_text = json.dumps({"snapshot_through": newest}) + "\n" + seed + tail
+                atomic_write_text(self.journal_file, journal_text)
+                self._journal_records = (1 if seed else 0) + tail.count("\n")
+        return len(snapshot_text.encode("utf-8")) + len(journal_text.encode("utf-8"))
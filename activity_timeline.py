@@ -0,0 +1,142 @@
+import argparse
+import datetime
+import mmap
+import os
+import struct
+import sys
+from typing import Optional, Iterator, Tuple
+
+# --- Configuration ---
+DEFAULT_TIMELINE_DIR = "timeline"
+# --- End Configuration ---
+
+# One file per day, <dir>/YYYY-MM-DD.atl, memory-mapped by the writer (tracker engine) and by any reader:
+#   header   16 bytes   magic, format version, ISO date as y/m/d
+#   active   10800 B    86,400-bit bitmap, bit i (LSB-first) = second i after local midnight was active
+#   keys     86400 B    keystrokes per second, saturating at 255
+#   clicks   86400 B    mouse clicks per second, saturating at 255
+# 183,616 bytes per day. Each plane has exactly one writer thread (tracking loop, keyboard listener, mouse
+# listener), so no locking is needed and readers in other processes see updates through the shared mapping.
+SLOTS = 86400
+MAGIC = b"AT3KTL"
+VERSION = 1
+_HEADER = struct.Struct("<6sHHBB4x")
+HEADER_SIZE = _HEADER.size
+ACTIVE_OFFSET = HEADER_SIZE
+KEYS_OFFSET = ACTIVE_OFFSET + SLOTS // 8
+CLICKS_OFFSET = KEYS_OFFSET + SLOTS
+FILE_SIZE = CLICKS_OFFSET + SLOTS
+
+def timeline_path(day: str, directory: str = DEFAULT_TIMELINE_DIR) -> str:
+    return os.path.join(directory, f"{day}.atl")
+
+def day_start_timestamp(day: str) -> float:
+    return datetime.datetime.combine(datetime.date.fromisoformat(day), datetime.time()).timestamp()
+
+class DayTimeline:
+    def __init__(self, path: str, writable: bool = False, day: Optional[str] = None):
+        self.path = path
+        if writable and not os.path.exists(path):
+            if day is None: raise ValueError("day is required to create a timeline")
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            d = datetime.date.fromisoformat(day)
+            with open(path, "wb") as f:
+                f.write(_HEADER.pack(MAGIC, VERSION, d.year, d.month, d.day)); f.truncate(FILE_SIZE)
+        with open(path, "r+b" if writable else "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), FILE_SIZE, access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+        magic, version, y, m, d = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close(); raise ValueError(f"{path} is not a version {VERSION} activity timeline")
+        self.day = datetime.date(y, m, d).isoformat()
+        self.day_start = day_start_timestamp(self.day)
+        view = memoryview(self._mmap)
+        # Zero-copy views straight onto the mapping.
+        self.active = view[ACTIVE_OFFSET:KEYS_OFFSET]
+        self.keys = view[KEYS_OFFSET:CLICKS_OFFSET]
+        self.clicks = view[CLICKS_OFFSET:FILE_SIZE]
+
+    @classmethod
+    def open_for_day(cls, day: str, directory: str = DEFAULT_TIMELINE_DIR, writable: bool = False) -> "DayTimeline":
+        return cls(timeline_path(day, directory), writable=writable, day=day)
+
+    def close(self):
+        for v in (self.active, self.keys, self.clicks): v.release()
+        self._mmap.close()
+
+    def flush(self):
+        self._mmap.flush()
+
+    def slot(self, timestamp: float) -> int:
+        # Clamped, so the extra hour of a DST fall-back day lands in the last slot instead of out of range.
+        return min(SLOTS - 1, max(0, int(timestamp - self.day_start)))
+
+    # --- Writers (one thread per plane) ---
+    def mark_active(self, t0: float, t1: float):
+        # Sets every second that [t0, t1) touches; cost is proportional to the span, i.e. O(1) per tracked second.
+        if t1 <= t0: return
+        start = max(0, int(t0 - self.day_start)); end = min(SLOTS, int(-(-(t1 - self.day_start) // 1)))
+        if start >= end: return
+        bm = self.active; sb = start >> 3; eb = (end - 1) >> 3
+        lo = (0xFF << (start & 7)) & 0xFF; hi = 0xFF >> (7 - ((end - 1) & 7))
+        if sb == eb: bm[sb] |= lo & hi; return
+        bm[sb] |= lo; bm[eb] |= hi
+        if eb > sb + 1: bm[sb + 1:eb] = b"\xff" * (eb - sb - 1)
+
+    def add_key(self, timestamp: float):
+        i = self.slot(timestamp); v = self.keys[i]
+        if v < 255: self.keys[i] = v + 1
+
+    def add_click(self, timestamp: float):
+        i = self.slot(timestamp); v = self.clicks[i]
+        if v < 255: self.clicks[i] = v + 1
+
+    # --- Readers ---
+    def is_active(self, second: int) -> bool:
+        return bool(self.active[second >> 3] >> (second & 7) & 1)
+
+    def active_seconds(self, start: int = 0, end: int = SLOTS) -> int:
+        if start == 0 and end == SLOTS: return int.from_bytes(self.active, "little").bit_count()
+        bits = int.from_bytes(self.active[start >> 3:(end + 7) >> 3], "little") >> (start & 7)
+        return (bits & ((1 << (end - start)) - 1)).bit_count()
+
+    def keystrokes(self) -> int:
+        return sum(bytes(self.keys).translate(None, b"\x00"))
+
+    def mouse_clicks(self) -> int:
+        return sum(bytes(self.clicks).translate(None, b"\x00"))
+
+    def hourly_active_seconds(self):
+        return [self.active_seconds(h * 3600, (h + 1) * 3600) for h in range(24)]
+
+def scan(start: str, end: str, directory: str = DEFAULT_TIMELINE_DIR) -> Iterator[Tuple[str, int, int, int]]:
+    # (day, active seconds, keystrokes, clicks) for every timeline file in [start, end].
+    if not os.path.isdir(directory): return
+    for name in sorted(os.listdir(directory)):
+        day = name[:-4]
+        if not name.endswith(".atl") or not (start <= day <= end): continue
+        try: tl = DayTimeline(os.path.join(directory, name))
+        except (OSError, ValueError) as e: print(f"Skipping {name}: {e}"); continue
+        try: yield day, tl.active_seconds(), tl.keystrokes(), tl.mouse_clicks()
+        finally: tl.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-second activity timelines")
+    parser.add_argument("--dir", default=DEFAULT_TIMELINE_DIR)
+    sub = parser.add_subparsers(dest="command", required=True)
+    summ = sub.add_parser("summary", help="per-day totals from the timelines")
+    summ.add_argument("--from", dest="start", default="0000-00-00"); summ.add_argument("--to", dest="end", default="9999-99-99")
+    hours = sub.add_parser("hours", help="active minutes per hour for one day")
+    hours.add_argument("day")
+    args = parser.parse_args(argv)
+    if args.command == "summary":
+        for day, active, keys, clicks in scan(args.start, args.end, args.dir):
+            print(f"{day}  active {active / 3600:6.2f} h  keys {keys:>7}  clicks {clicks:>6}")
+    else:
+        tl = DayTimeline.open_for_day(args.day, args.dir)
+        try:
+            for h, secs in enumerate(tl.hourly_active_seconds()): print(f"{h:02d}:00  {'#' * (secs // 120):<30} {secs // 60:>2} min")
+        finally: tl.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,25 +1,25 @@
-import customtkinter as ctk
 import time
 import datetime
-import json
 import os
-import threading
-import pynput.mouse
-import pynput.keyboard
-from typing import Optional, List, Dict, Any
+import argparse
+from typing import Optional, Dict, Any
 import traceback
 import sys
-import math
 import collections
+import activity_metrics
+import tracker_engine
+from tracker_engine import format_hms_string, format_ms_string
 
 # --- Configuration ---
 APP_NAME = "activitytracker3000"
-DATA_FILE = "mouse_activity_log.json"
-ACTIVITY_CHECK_INTERVAL = 0.1
-INITIAL_INACTIVITY_TIMEOUT = 5.0
-LONG_INACTIVITY_THRESHOLD = 600.0
-INITIAL_FOCUS_MINUTES = 25
-INITIAL_BREAK_MINUTES = 5
+# GUI refresh scheduling; tracking itself lives in tracker_engine and never depends on these.
+GUI_REFRESH_INTERVAL = 1.0 # while only the clocks change; aligned to the wall-clock second
+GUI_FAST_REFRESH_INTERVAL = 0.1 # in the last seconds of a countdown and just before an activity transition
+GUI_FAST_COUNTDOWN_SECONDS = 10
+GUI_PROBE_INTERVAL = 0.1 # how often the engine's event counter is checked, so state changes show at once
+# With --connect the window runs in its own process and serves its own metrics (frame times, log queue).
+GUI_METRICS_PORT = 9479
+GUI_METRICS_DUMP_FILE = "metrics_gui.prom"
 
 APP_FONT_FAMILY = "helvetica"
 BASE_WINDOW_WIDTH = 800
@@ -59,6 +59,7 @@ MIN_FONT_SIZE_FOCUS_HISTORY_TEXT = 8
 BASE_FONT_SIZE_EFFECTIVENESS_VALUE = 48
 MIN_FONT_SIZE_EFFECTIVENESS_VALUE = 18
 BASE_FONT_SIZE_EFFECTIVENESS_TITLE = BASE_FONT_SIZE_SECTION_TITLES
+FONT_SCALE_STEP = 0.05 # window scale is rounded to this before fonts are resized; a drag within one step costs nothing
 
 
 COLOR_WINDOW_BG="#2a2a2a"; COLOR_MAIN_CONTENT_BG="#1D1D1D"; COLOR_BORDER="#1D1D1D"
@@ -66,150 +67,132 @@ BORDER_THICKNESS=15; COLOR_TEXT_PRIMARY="#F0F0F0"; COLOR_TEXT_SECONDARY="#A9A9A9
 COLOR_TEXT_INACTIVE="#FF3B30"; COLOR_CLOCK_TEXT="#E8D85C"; COLOR_ACCENT_ACTIVE_MOUSE="#30D158"
 COLOR_TIMER_FOCUS="#28C740"; COLOR_TIMER_BREAK="#00A9FF"; COLOR_BUTTON_FG="#2E2E2E"; COLOR_BUTTON_HOVER="#3F3F3F"
 COLOR_BUTTON_TEXT=COLOR_TEXT_PRIMARY; CONSOLE_BG="#1a1a1a"; CONSOLE_FG="#a0a0a0"
-CONSOLE_FONT_SIZE=8; MAX_LOG_LINES=150; EFFECTIVENESS_BAR_HEIGHT=6
+CONSOLE_FONT_SIZE=8; EFFECTIVENESS_BAR_HEIGHT=6
+MAX_LOG_LINES = 1000 # Lines kept in the event log console; appending/trimming cost does not depend on it
+FOCUS_HISTORY_PAGE_SIZE = 25 # Focus sessions per page of the history panel; only the shown page is read
 EFFECTIVENESS_BAR_LOW_COLOR = COLOR_TEXT_INACTIVE
 FOCUS_HISTORY_BG = CONSOLE_BG
 FOCUS_HISTORY_FG = CONSOLE_FG
+# Compact overlay (--compact, or the COMPACT button): only the timer and the active/idle state, always on top
+COMPACT_WINDOW_WIDTH = 230
+COMPACT_WINDOW_HEIGHT = 92
+COMPACT_FONT_SIZE_TIMER = 26
+COMPACT_FONT_SIZE_STATE = 11
+COMPACT_ALWAYS_ON_TOP = True
 # --- End Configuration ---
 
-_current_inactivity_timeout = INITIAL_INACTIVITY_TIMEOUT
-
-app_state = {
-    "last_mouse_position": None, "mouse_last_pos_for_distance": None,
-    "mouse_total_distance_today": 0.0, "keystrokes_today": 0,
-    "last_movement_time": time.time(), "last_keyboard_activity_time": time.time(),
-    "total_active_seconds_today": 0.0, "total_idle_seconds_today": 0.0,
-    "max_idle_seconds_today": 0.0, "max_active_seconds_today": 0.0,
-    "current_activity_start_time": time.time(),
-    "current_idle_start_time": None,
-    "last_activity_duration": 0.0,
-    "last_inactivity_duration": 0.0,
-    "current_day_string": datetime.date.today().isoformat(),
-    "running": True, "prev_overall_active_state": False,
-    "last_activity_time": time.time(),
-    "focus_duration_seconds": INITIAL_FOCUS_MINUTES * 60,
-    "break_duration_seconds": INITIAL_BREAK_MINUTES * 60,
-    "timer_mode": "focus",
-    "timer_seconds_remaining": INITIAL_FOCUS_MINUTES * 60,
-    "mouse_clicks_today": 0,
-    "current_focus_active_seconds": 0.0,
-    "focus_session_log": collections.deque(maxlen=5),
+# Font roles: (size at BASE_WINDOW_WIDTH, smallest size, weight). Every widget of a role shares one CTkFont.
+FONT_ROLES = {
+    "total_session_time_right": (BASE_FONT_SIZE_TOTAL_SESSION_TIME_RIGHT, MIN_FONT_SIZE_TOTAL_SESSION_TIME_RIGHT, "bold"),
+    "clock_right": (BASE_FONT_SIZE_CLOCK_RIGHT, MIN_FONT_SIZE_CLOCK_RIGHT, "bold"),
+    "prominent_current_stats": (BASE_FONT_SIZE_PROMINENT_CURRENT_STATS, MIN_FONT_SIZE_PROMINENT_CURRENT_STATS, "bold"),
+    "prominent_stats_subtitle": (BASE_FONT_SIZE_PROMINENT_STATS_SUBTITLE, MIN_FONT_SIZE_PROMINENT_STATS_SUBTITLE, "normal"),
+    "grid_counters": (BASE_FONT_SIZE_GRID_COUNTERS, MIN_FONT_SIZE_GRID_COUNTERS, "bold"),
+    "grid_subtitles": (BASE_FONT_SIZE_GRID_SUBTITLES, MIN_FONT_SIZE_GRID_SUBTITLES, "normal"),
+    "focus_break_timer_value": (BASE_FONT_SIZE_FOCUS_BREAK_TIMER, MIN_FONT_SIZE_FOCUS_BREAK_TIMER, "bold"),
+    "focus_break_timer_on_break": (int(BASE_FONT_SIZE_FOCUS_BREAK_TIMER * 1.2), MIN_FONT_SIZE_FOCUS_BREAK_TIMER, "bold"),
+    "focus_break_status": (BASE_FONT_SIZE_FOCUS_BREAK_STATUS, MIN_FONT_SIZE_FOCUS_BREAK_STATUS, "bold"),
+    "section_titles": (BASE_FONT_SIZE_SECTION_TITLES, MIN_FONT_SIZE_SECTION_TITLES, "bold"),
+    "buttons": (BASE_FONT_SIZE_BUTTONS, MIN_FONT_SIZE_BUTTONS, "bold"),
+    "timed_break_status": (BASE_FONT_SIZE_BUTTONS - 1, max(7, MIN_FONT_SIZE_BUTTONS - 1), "bold"),
+    "timed_break_status_active": (int(BASE_FONT_SIZE_TOTAL_SESSION_TIME_RIGHT * 1.2), MIN_FONT_SIZE_TOTAL_SESSION_TIME_RIGHT, "bold"),
+    "settings_labels": (BASE_FONT_SIZE_SETTINGS_LABELS, MIN_FONT_SIZE_SETTINGS_LABELS, "normal"),
+    "settings_entries": (BASE_FONT_SIZE_SETTINGS_ENTRIES, MIN_FONT_SIZE_SETTINGS_ENTRIES, "normal"),
+    "effectiveness_value": (BASE_FONT_SIZE_EFFECTIVENESS_VALUE, MIN_FONT_SIZE_EFFECTIVENESS_VALUE, "bold"),
+    "effectiveness_title": (BASE_FONT_SIZE_EFFECTIVENESS_TITLE, MIN_FONT_SIZE_SECTION_TITLES, "bold"),
+    "log_title": (BASE_FONT_SIZE_LOG_TITLE, 10, "bold"),
+    "focus_history_text": (BASE_FONT_SIZE_FOCUS_HISTORY_TEXT, MIN_FONT_SIZE_FOCUS_HISTORY_TEXT, "normal"),
+    "event_log_console": (CONSOLE_FONT_SIZE, 7, "normal"),
 }
-state_lock = threading.Lock()
-
-def format_hms_string(s: float) -> str:
-    s=max(0,s); h=s//3600; m=(s%3600)//60; s%=60; return f"{int(h):02d}:{int(m):02d}:{int(s):02d}"
-def format_ms_string(s: float) -> str:
-    s=max(0,s); m=s//60; s%=60; return f"{int(m):02d}:{int(s):02d}"
-
-_app_instance_ref = None
-
-def on_move(x,y):
-    global app_state, _app_instance_ref
-    if _app_instance_ref and (_app_instance_ref.session_globally_paused or _app_instance_ref.timed_break_active): return
-    with state_lock:
-        now=time.time();pos=(x,y)
-        if app_state["mouse_last_pos_for_distance"] is not None:
-            px,py=app_state["mouse_last_pos_for_distance"];app_state["mouse_total_distance_today"]+=math.sqrt((x-px)**2+(y-py)**2)
-        app_state["mouse_last_pos_for_distance"]=pos
-        app_state.update({"last_mouse_position":pos,"last_movement_time":now,"last_activity_time":now})
-
-def on_key_press(key):
-    global app_state, _app_instance_ref
-    if _app_instance_ref and (_app_instance_ref.session_globally_paused or _app_instance_ref.timed_break_active): return
-    with state_lock:
-        app_state["keystrokes_today"]+=1
-        app_state.update({"last_keyboard_activity_time":time.time(),"last_activity_time":time.time()})
-
-def on_click(x, y, button, pressed):
-    global app_state, _app_instance_ref
-    if _app_instance_ref and (_app_instance_ref.session_globally_paused or _app_instance_ref.timed_break_active): return
-    if pressed:
-        with state_lock:
-            app_state["mouse_clicks_today"] += 1
-            app_state.update({"last_activity_time": time.time()})
-
-def load_daily_data():
-    global app_state
-    today_str = datetime.date.today().isoformat()
-    default_data = {"active_seconds":0.0, "idle_seconds":0.0, "max_idle_seconds":0.0,
-                    "max_active_seconds":0.0, "mouse_total_distance":0.0, "keystrokes":0,
-                    "mouse_clicks":0, "last_activity_duration":0.0, "last_inactivity_duration":0.0}
-    data_today = default_data.copy(); full_data = {}
-    if os.path.exists(DATA_FILE):
-        try:
-            with open(DATA_FILE,'r')as f: content=f.read()
-            if content:full_data=json.loads(content)
-        except Exception as e: print(f"Warning loading {DATA_FILE}: {e}")
-    raw_today = full_data.get(today_str)
-    if isinstance(raw_today, dict):
-        for key_ in data_today:
-            if key_ in ["keystrokes", "mouse_clicks"]: data_today[key_] = int(raw_today.get(key_,0))
-            else: data_today[key_] = float(raw_today.get(key_,0.0))
-    elif isinstance(raw_today,(float,int)): data_today["active_seconds"]=float(raw_today)
-    with state_lock:
-        app_state.update({
-            "current_day_string":today_str,
-            "total_active_seconds_today":data_today["active_seconds"],"total_idle_seconds_today":data_today["idle_seconds"],
-            "max_idle_seconds_today":data_today["max_idle_seconds"],"max_active_seconds_today":data_today["max_active_seconds"],
-            "mouse_total_distance_today":data_today["mouse_total_distance"],"keystrokes_today":data_today["keystrokes"],
-            "mouse_clicks_today": data_today["mouse_clicks"],
-            "last_activity_duration": data_today["last_activity_duration"],"last_inactivity_duration": data_today["last_inactivity_duration"],
-            "current_activity_start_time":time.time(),"current_idle_start_time": None,
-        })
-
-def save_daily_data():
-    global app_state; full_data={}
-    if os.path.exists(DATA_FILE):
-        try:
-            with open(DATA_FILE,'r')as f:content=f.read()
-            if content:full_data=json.loads(content)
-        except Exception:full_data={}
-    with state_lock:
-        day_s=app_state["current_day_string"]
-        data_to_save={k:round(app_state[k],2)if isinstance(app_state[k],float)else app_state[k] for k in [
-            "total_active_seconds_today","total_idle_seconds_today","max_idle_seconds_today",
-            "max_active_seconds_today","mouse_total_distance_today","keystrokes_today", "mouse_clicks_today",
-            "last_activity_duration","last_inactivity_duration"]}
-    full_data[day_s]=data_to_save
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser=argparse.ArgumentParser(description=APP_NAME)
+    parser.add_argument("--connect",nargs="?",const=tracker_engine.IPC_SOCKET_PATH,metavar="SOCKET",
+                        help="attach to a running headless engine (python tracker_engine.py) instead of tracking in-process")
+    parser.add_argument("--metrics-port",type=int,default=None,
+                        help=f"localhost metrics port, 0 to disable (default: {tracker_engine.METRICS_PORT}, or {GUI_METRICS_PORT} with --connect)")
+    parser.add_argument("--no-metrics",action="store_true",help="turn metrics collection off entirely")
+    parser.add_argument("--compact",action="store_true",help="start as the small always-on-top timer overlay")
+    return parser.parse_args(argv)
+
+def enter_app_dir():
     try:
-        with open(DATA_FILE,'w')as f:json.dump(full_data,f,indent=4)
-    except Exception as e:print(f"Error writing to {DATA_FILE}: {e}")
+        if hasattr(sys,'_MEIPASS'):os.chdir(sys._MEIPASS)
+        elif"__file__"in globals():os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    except Exception as e:print(f"CWD Error: {e}")
+
+# Cold start: launched as the tracker, the engine and its input listeners start before the GUI toolkit is even
+# imported, so input in the first seconds after login is counted while the window is still being built.
+_early_args = None; _early_engine = None
+if __name__=="__main__":
+    _early_args=parse_args();enter_app_dir()
+    if _early_args.no_metrics:activity_metrics.set_enabled(False)
+    if not _early_args.connect:_early_engine=tracker_engine.TrackerEngine();_early_engine.start()
 
-def add_log_message(app_instance,message: str):
-    if not isinstance(app_instance,ctk.CTk)or not hasattr(app_instance,'event_log_console')or not app_instance.event_log_console.winfo_exists():
+import customtkinter as ctk
+
+_m_gui_refresh = activity_metrics.histogram("activitytracker_gui_refresh_seconds", "Full GUI refresh (frame) time")
+_m_font_resize = activity_metrics.counter("activitytracker_gui_font_resizes", "Shared fonts resized after a window scale step change")
+_m_log_flush = activity_metrics.histogram("activitytracker_gui_log_flush_lines", "Event log lines appended per console flush", buckets=activity_metrics.SIZE_BUCKETS)
+
+def add_log_message(app_instance,message: str,timestamp: Optional[float]=None):
+    if not isinstance(app_instance,ctk.CTk)or not hasattr(app_instance,'_log_pending'):
         print(f"Event Log Console not ready: {message}");return
-    log_text=f"[{datetime.datetime.now().strftime('%H:%M:%S')}] {message}\n"
-    def _update():
+    when=datetime.datetime.now()if timestamp is None else datetime.datetime.fromtimestamp(timestamp)
+    app_instance._log_pending.append(f"[{when.strftime('%H:%M:%S')}] {message}")
+    # One Tk callback per burst: later messages ride along with the flush that is already queued. The flag is only
+    # set once after() has succeeded, so a failed call does not leave the log waiting for a flush that never runs.
+    if not app_instance._log_flush_scheduled:
         try:
-            if not app_instance.event_log_console.winfo_exists():return
-            app_instance.event_log_console.configure(state="normal")
-            lines=[l for l in app_instance.event_log_console.get("1.0","end-1c").split('\n')if l]
-            if len(lines)>=MAX_LOG_LINES:lines=lines[-(MAX_LOG_LINES-1):]
-            app_instance.event_log_console.delete("1.0","end");app_instance.event_log_console.insert("1.0",'\n'.join(lines+[log_text.strip()])+'\n')
-            app_instance.event_log_console.see("end");app_instance.event_log_console.configure(state="disabled")
+            if app_instance.winfo_exists():app_instance.after(0,app_instance._flush_log_messages);app_instance._log_flush_scheduled=True
         except Exception as e:print(f"Error GUI log: {e}")
-    if app_instance.winfo_exists():app_instance.after(0,_update)
+
+class FontRegistry:
+    # One shared CTkFont per FONT_ROLES role. Widgets are created with these objects, so resizing a font re-lays out
+    # every widget that uses it without configuring the widgets. set_scale() rounds the window scale to
+    # FONT_SCALE_STEP: a resize within the current step returns at once, and only fonts whose size changed are touched.
+    def __init__(self, roles: Dict[str, tuple]):
+        self._roles = roles; self.step: Optional[int] = None
+        self._fonts = {role: ctk.CTkFont(family=APP_FONT_FAMILY, size=base, weight=weight) for role, (base, _, weight) in roles.items()}
+        self._sizes = {role: base for role, (base, _, _) in roles.items()}
+
+    def __getitem__(self, role: str) -> "ctk.CTkFont":
+        return self._fonts[role]
+
+    def sizes_for_step(self, step: int) -> Dict[str, int]:
+        scale = step * FONT_SCALE_STEP
+        return {role: max(min_size, int(base * scale)) for role, (base, min_size, _) in self._roles.items()}
+
+    def set_scale(self, scale: float) -> int:
+        # Returns how many fonts were resized.
+        step = max(1, round(scale / FONT_SCALE_STEP))
+        if step == self.step: return 0
+        self.step = step; resized = 0
+        for role, size in self.sizes_for_step(step).items():
+            if size != self._sizes[role]: self._fonts[role].configure(size=size); self._sizes[role] = size; resized += 1
+        return resized
 
 class DominantBorderHubApp(ctk.CTk):
-    def __init__(self):
+    def __init__(self, engine, compact: bool = False):
         super().__init__()
-        global _app_instance_ref
-        _app_instance_ref = self
+        # `engine` is an in-process tracker_engine.TrackerEngine or an EngineClient talking to a headless daemon;
+        # the window only reads snapshots and sends commands either way.
+        self.engine = engine
+        self._owns_engine = isinstance(engine, tracker_engine.TrackerEngine)
 
         self.title(APP_NAME); self.geometry(f"{BASE_WINDOW_WIDTH}x{BASE_WINDOW_HEIGHT}")
         self.minsize(850, BASE_WINDOW_HEIGHT); ctk.set_appearance_mode("Dark")
         self.configure(fg_color=COLOR_WINDOW_BG)
 
-        self.app_launch_time = time.time()
-        self.session_globally_paused = False
-        self.session_pause_start_time = None
-        self.total_session_time_actively_paused = 0.0
-        self.timed_break_active = False
-        self.timed_break_duration_seconds = 0 
-        self.timed_break_end_time = None
-        self.timed_break_initiated_pause = False
-        self._color_tags_defined = False
+        self._closing = False
+        self._snapshot = engine.snapshot(); self._refresh_key = None; self._event_seq = 0; self._session_flags = None; self._engine_error = None
+        self._log_pending = collections.deque(maxlen=MAX_LOG_LINES); self._log_flush_scheduled = False; self._log_line_count = 0
+        activity_metrics.gauge("activitytracker_gui_log_pending", "Event log lines queued for the console", fn=lambda: len(self._log_pending))
+        self._rendered: Dict[str, Dict[str, Any]] = {}
+        self._effectiveness_bar_width = 0; self._effectiveness_bar_shown_width = -1
+        self._focus_history_version = -1; self._focus_history_offset = 0; self._focus_history_total = 0
+        self._window_visible = True; self._refresh_job = None; self._next_refresh_at = 0.0
+        self._deferred_panels_scheduled = False; self._deferred_panels_built = False
 
         try:
             icon_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app_icon.ico")
@@ -217,8 +200,32 @@ class DominantBorderHubApp(ctk.CTk):
             else: print("Icon file not found:", icon_path)
         except Exception as e: print(f"Icon error: {e}")
 
-        load_daily_data(); self._init_fonts()
+        self._init_fonts()
+
+        self._compact = False; self._view_root = None; self._view_attrs: set = set(); self._full_geometry = None
+        self._history_window = None # opened on demand; outlives switches between the full and compact views
+        if compact: self._show_compact_view()
+        else: self._build_full_view()
 
+        add_log_message(self,"App starting...");self.bind("<Configure>",self.on_window_resize_debounced)
+        self.bind("<Map>",self._on_map,add="+");self.bind("<Unmap>",self._on_unmap,add="+")
+        self.bind("<Expose>",self._on_first_expose,add="+")
+        self._resize_debounce_timer=None
+        self.protocol("WM_DELETE_WINDOW",self.on_closing)
+        self.update_gui_display();self.after(250,self.on_window_resize)
+        add_log_message(self,"App started.")
+
+    def _init_fonts(self):
+        self.fonts = FontRegistry(FONT_ROLES)
+
+    def _new_view_attrs(self, before: set) -> set:
+        # Public attributes added since `before`: the widgets (and per-view fonts) of the view just built.
+        return {name for name in vars(self).keys() - before if not name.startswith("_")}
+
+    def _build_full_view(self):
+        # The two-panel dashboard. What it and _create_deferred_panels add is recorded in _view_attrs, so compact
+        # mode can drop the whole widget tree together with every reference to it.
+        before = set(vars(self))
         self.main_split=ctk.CTkFrame(self,fg_color="transparent")
         self.main_split.pack(fill="both",expand=True,padx=15,pady=15)
         self.main_split.grid_columnconfigure(0,weight=2);self.main_split.grid_columnconfigure(1,weight=3)
@@ -233,39 +240,70 @@ class DominantBorderHubApp(ctk.CTk):
         self.main_content_frame.grid_rowconfigure(2, weight=1, minsize=60)  # Prominent Stats
         self.main_content_frame.grid_rowconfigure(3, weight=2, minsize=140) # Compact Stats & Controls
 
-        self._create_timed_break_status_section() # Was part of _create_top_bar_section
-        # self._create_clock_section() # Removed
+        self._create_timed_break_status_section()
         self._create_effectiveness_section()
         self._create_prominent_current_stats_section()
         self._create_compact_stats_grid_section()
         self._create_right_panel_section()
-
-        add_log_message(self,"App starting...");self.bind("<Configure>",self.on_window_resize_debounced)
-        self._resize_debounce_timer=None
-        self.start_mouse_listener();self.start_keyboard_listener();self.start_tracking_loop()
-        self.protocol("WM_DELETE_WINDOW",self.on_closing)
-        self._update_pause_button_states()
-        self.update_gui_display();self.after(250,self.on_window_resize)
-        add_log_message(self,"App started.")
-
-    def _init_fonts(self):
-        self.font_total_session_time_right = (APP_FONT_FAMILY, BASE_FONT_SIZE_TOTAL_SESSION_TIME_RIGHT, "bold") # New
-        self.font_clock_right = (APP_FONT_FAMILY, BASE_FONT_SIZE_CLOCK_RIGHT, "bold") # New
-        self.font_prominent_current_stats = (APP_FONT_FAMILY, BASE_FONT_SIZE_PROMINENT_CURRENT_STATS, "bold")
-        self.font_prominent_stats_subtitle = (APP_FONT_FAMILY, BASE_FONT_SIZE_PROMINENT_STATS_SUBTITLE, "normal")
-        self.font_grid_counters=(APP_FONT_FAMILY,BASE_FONT_SIZE_GRID_COUNTERS,"bold")
-        self.font_grid_subtitles=(APP_FONT_FAMILY,BASE_FONT_SIZE_GRID_SUBTITLES,"normal")
-        self.font_focus_break_timer_value=(APP_FONT_FAMILY,BASE_FONT_SIZE_FOCUS_BREAK_TIMER,"bold")
-        self.font_focus_break_status=(APP_FONT_FAMILY,BASE_FONT_SIZE_FOCUS_BREAK_STATUS,"bold")
-        self.font_section_titles=(APP_FONT_FAMILY,BASE_FONT_SIZE_SECTION_TITLES,"bold")
-        self.font_buttons=(APP_FONT_FAMILY,BASE_FONT_SIZE_BUTTONS,"bold")
-        self.font_settings_labels=(APP_FONT_FAMILY,BASE_FONT_SIZE_SETTINGS_LABELS,"normal")
-        self.font_settings_entries=(APP_FONT_FAMILY,BASE_FONT_SIZE_SETTINGS_ENTRIES,"normal")
-        self.font_effectiveness_value=(APP_FONT_FAMILY,BASE_FONT_SIZE_EFFECTIVENESS_VALUE,"bold")
-        self.font_effectiveness_title=(APP_FONT_FAMILY,BASE_FONT_SIZE_EFFECTIVENESS_TITLE,"bold")
-        self.font_log_title = (APP_FONT_FAMILY, BASE_FONT_SIZE_LOG_TITLE, "bold")
-        self.font_focus_history_text = (APP_FONT_FAMILY, BASE_FONT_SIZE_FOCUS_HISTORY_TEXT)
-        self.font_event_log_console = (APP_FONT_FAMILY, CONSOLE_FONT_SIZE)
+        self._view_root = self.main_split; self._view_attrs = self._new_view_attrs(before)
+
+    def _build_compact_view(self):
+        before = set(vars(self))
+        self.compact_frame = ctk.CTkFrame(self, fg_color=COLOR_MAIN_CONTENT_BG, corner_radius=0)
+        self.compact_frame.pack(fill="both", expand=True)
+        self.compact_timer_font = ctk.CTkFont(family=APP_FONT_FAMILY, size=COMPACT_FONT_SIZE_TIMER, weight="bold")
+        self.compact_state_font = ctk.CTkFont(family=APP_FONT_FAMILY, size=COMPACT_FONT_SIZE_STATE, weight="bold")
+        self.compact_timer_label = ctk.CTkLabel(self.compact_frame, text="00:00", font=self.compact_timer_font, text_color=COLOR_TEXT_PRIMARY)
+        self.compact_timer_label.pack(pady=(8,0))
+        self.compact_state_label = ctk.CTkLabel(self.compact_frame, text="", font=self.compact_state_font, text_color=COLOR_TEXT_SECONDARY)
+        self.compact_state_label.pack(pady=(0,6))
+        self.compact_expand_button = ctk.CTkButton(self.compact_frame, text="\u2922", width=22, height=18, corner_radius=4, font=self.fonts["buttons"],
+                                                   text_color=COLOR_BUTTON_TEXT, fg_color=COLOR_BUTTON_FG, hover_color=COLOR_BUTTON_HOVER,
+                                                   command=lambda: self.after_idle(self.exit_compact_mode))
+        self.compact_expand_button.place(relx=1.0, x=-4, y=4, anchor="ne")
+        for widget in (self.compact_frame, self.compact_timer_label, self.compact_state_label):
+            widget.bind("<Double-Button-1>", lambda e: self.after_idle(self.exit_compact_mode))
+        self._view_root = self.compact_frame; self._view_attrs = self._new_view_attrs(before)
+
+    def _drop_view(self):
+        # Destroys the current view and forgets its widgets and everything rendered into them. Log lines queue in
+        # _log_pending (bounded by MAX_LOG_LINES) until a view with a console exists again.
+        if self._view_root is not None: self._view_root.destroy()
+        for name in self._view_attrs: self.__dict__.pop(name, None)
+        self.__dict__.pop("_right_panel", None)
+        self._view_root = None; self._view_attrs = set(); self._rendered.clear()
+        self._session_flags = None; self._refresh_key = None; self._focus_history_version = -1
+        self._effectiveness_bar_width = 0; self._effectiveness_bar_shown_width = -1
+        self._deferred_panels_built = False; self._log_line_count = 0
+
+    def _show_compact_view(self):
+        self._compact = True
+        self.minsize(COMPACT_WINDOW_WIDTH, COMPACT_WINDOW_HEIGHT); self.geometry(f"{COMPACT_WINDOW_WIDTH}x{COMPACT_WINDOW_HEIGHT}")
+        self.attributes("-topmost", COMPACT_ALWAYS_ON_TOP)
+        self._build_compact_view()
+
+    def enter_compact_mode(self):
+        # Swaps the dashboard for the overlay; the engine keeps tracking exactly as before.
+        if self._compact or self._closing: return
+        self._full_geometry = self.geometry(); self._drop_view(); self._show_compact_view()
+        self._next_refresh_at = 0.0
+
+    def exit_compact_mode(self):
+        if not self._compact or self._closing: return
+        self._drop_view(); self._compact = False
+        self.attributes("-topmost", False); self.minsize(850, BASE_WINDOW_HEIGHT)
+        self.geometry(self._full_geometry or f"{BASE_WINDOW_WIDTH}x{BASE_WINDOW_HEIGHT}")
+        self._build_full_view(); self._deferred_panels_scheduled = True; self.after_idle(self._create_deferred_panels)
+        self._next_refresh_at = 0.0
+
+    def open_history_window(self):
+        # The day history charts; the module (and numpy) is only imported the first time they are opened.
+        hw = self._history_window
+        if hw is not None and hw.winfo_exists(): hw.deiconify(); hw.lift(); hw.focus(); return
+        try:
+            import history_dashboard
+            self._history_window = history_dashboard.HistoryWindow(self, self.engine)
+        except Exception as e: self._history_window = None; add_log_message(self, f"Cannot open the history: {e}")
 
     def _create_timed_break_status_section(self): # Renamed from _create_top_bar_section
         # This frame is now just for the timed break status, which remains at the top of the left panel.
@@ -274,7 +312,7 @@ class DominantBorderHubApp(ctk.CTk):
         status_frame.grid_columnconfigure(0, weight=1)
         
         self.timed_break_status_label = ctk.CTkLabel(status_frame, text="", 
-                                                     font=(APP_FONT_FAMILY, BASE_FONT_SIZE_BUTTONS-1, "bold"), # Smaller font
+                                                     font=self.fonts["timed_break_status"], # Smaller font
                                                      text_color=COLOR_TEXT_INACTIVE)
         self.timed_break_status_label.pack(pady=(0,2), fill="x")
 
@@ -282,10 +320,11 @@ class DominantBorderHubApp(ctk.CTk):
     def _create_effectiveness_section(self):
         frame=ctk.CTkFrame(self.main_content_frame,fg_color="transparent")
         frame.grid(row=1,column=0,pady=(0,1),padx=15,sticky="nsew") # Removed top padding
-        self.effectiveness_title_label=ctk.CTkLabel(frame,text="SESSION EFFECTIVENESS",font=self.font_effectiveness_title,text_color=COLOR_TEXT_SECONDARY); self.effectiveness_title_label.pack(pady=(0,1))
-        self.effectiveness_value_label=ctk.CTkLabel(frame,text="N/A",font=self.font_effectiveness_value,text_color=COLOR_TEXT_PRIMARY); self.effectiveness_value_label.pack(pady=(0,1))
+        self.effectiveness_title_label=ctk.CTkLabel(frame,text="SESSION EFFECTIVENESS",font=self.fonts["effectiveness_title"],text_color=COLOR_TEXT_SECONDARY); self.effectiveness_title_label.pack(pady=(0,1))
+        self.effectiveness_value_label=ctk.CTkLabel(frame,text="N/A",font=self.fonts["effectiveness_value"],text_color=COLOR_TEXT_PRIMARY); self.effectiveness_value_label.pack(pady=(0,1))
         self.effectiveness_bar_bg=ctk.CTkFrame(frame,fg_color="#404040",height=EFFECTIVENESS_BAR_HEIGHT+4,corner_radius=EFFECTIVENESS_BAR_HEIGHT//2); self.effectiveness_bar_bg.pack(fill="x",padx=30,pady=(0,1))
         self.effectiveness_bar=ctk.CTkFrame(self.effectiveness_bar_bg,fg_color=EFFECTIVENESS_BAR_LOW_COLOR,height=EFFECTIVENESS_BAR_HEIGHT,width=0,corner_radius=(EFFECTIVENESS_BAR_HEIGHT//2)-1); self.effectiveness_bar.place(x=2,y=2,relwidth=0)
+        self.effectiveness_bar_bg.bind("<Configure>",self._on_effectiveness_bar_resize,add="+")
 
     def _create_prominent_current_stats_section(self):
         frame = ctk.CTkFrame(self.main_content_frame, fg_color="transparent")
@@ -293,32 +332,32 @@ class DominantBorderHubApp(ctk.CTk):
         frame.grid_columnconfigure((0,1), weight=1)
         active_frame = ctk.CTkFrame(frame, fg_color="transparent")
         active_frame.grid(row=0, column=0, padx=5, pady=2, sticky="nsew")
-        self.current_active_title_label = ctk.CTkLabel(active_frame, text="CURRENT ACTIVE", font=self.font_prominent_stats_subtitle, text_color=COLOR_TEXT_SECONDARY)
+        self.current_active_title_label = ctk.CTkLabel(active_frame, text="CURRENT ACTIVE", font=self.fonts["prominent_stats_subtitle"], text_color=COLOR_TEXT_SECONDARY)
         self.current_active_title_label.pack(pady=(0,1))
-        self.current_active_val_label = ctk.CTkLabel(active_frame, text="00:00:00", font=self.font_prominent_current_stats, text_color=COLOR_TEXT_PRIMARY)
+        self.current_active_val_label = ctk.CTkLabel(active_frame, text="00:00:00", font=self.fonts["prominent_current_stats"], text_color=COLOR_TEXT_PRIMARY)
         self.current_active_val_label.pack()
         idle_frame = ctk.CTkFrame(frame, fg_color="transparent")
         idle_frame.grid(row=0, column=1, padx=5, pady=2, sticky="nsew")
-        self.current_idle_title_label = ctk.CTkLabel(idle_frame, text="CURRENT IDLE", font=self.font_prominent_stats_subtitle, text_color=COLOR_TEXT_SECONDARY)
+        self.current_idle_title_label = ctk.CTkLabel(idle_frame, text="CURRENT IDLE", font=self.fonts["prominent_stats_subtitle"], text_color=COLOR_TEXT_SECONDARY)
         self.current_idle_title_label.pack(pady=(0,1))
-        self.current_idle_val_label = ctk.CTkLabel(idle_frame, text="00:00:00", font=self.font_prominent_current_stats, text_color=COLOR_TEXT_PRIMARY)
+        self.current_idle_val_label = ctk.CTkLabel(idle_frame, text="00:00:00", font=self.fonts["prominent_current_stats"], text_color=COLOR_TEXT_PRIMARY)
         self.current_idle_val_label.pack()
 
     def _create_compact_stats_grid_section(self):
         frame=ctk.CTkFrame(self.main_content_frame,fg_color="transparent")
         frame.grid(row=3,column=0,pady=(0,2),padx=15,sticky="nsew") # Adjusted row
         frame.grid_columnconfigure(0,weight=1)
-        ctk.CTkLabel(frame,text="OTHER DAILY STATS",font=self.font_section_titles,text_color=COLOR_TEXT_SECONDARY).pack(pady=(0,2))
+        ctk.CTkLabel(frame,text="OTHER DAILY STATS",font=self.fonts["section_titles"],text_color=COLOR_TEXT_SECONDARY).pack(pady=(0,2))
         
         grid=ctk.CTkFrame(frame,fg_color="transparent");grid.pack(fill="x",expand=True,padx=10)
         grid.grid_columnconfigure((0,1,2),weight=1)
-        for i in range(3): grid.grid_rowconfigure(i, weight=1)
+        for i in range(4): grid.grid_rowconfigure(i, weight=1)
         def _cell(r,c,title,attr,is_time=True):
             cell_f=ctk.CTkFrame(grid,fg_color="transparent");cell_f.grid(row=r,column=c,padx=1,pady=1,sticky="nsew")
             cell_f.grid_rowconfigure(0,weight=1); cell_f.grid_rowconfigure(1,weight=1); cell_f.grid_columnconfigure(0,weight=1)
-            title_label=ctk.CTkLabel(cell_f,text=title,font=self.font_grid_subtitles,text_color=COLOR_TEXT_SECONDARY)
+            title_label=ctk.CTkLabel(cell_f,text=title,font=self.fonts["grid_subtitles"],text_color=COLOR_TEXT_SECONDARY)
             title_label.grid(row=0,column=0,sticky="s",pady=(0,0))
-            val_lbl=ctk.CTkLabel(cell_f,text="00:00:00"if is_time else"0",font=self.font_grid_counters,text_color=COLOR_TEXT_PRIMARY)
+            val_lbl=ctk.CTkLabel(cell_f,text="00:00:00"if is_time else"0",font=self.fonts["grid_counters"],text_color=COLOR_TEXT_PRIMARY)
             val_lbl.grid(row=1,column=0,sticky="n",pady=(0,0))
             setattr(self,f"{attr}_grid_title",title_label); setattr(self,f"{attr}_grid_val",val_lbl)
         _cell(0,0,"TOTAL ACTIVE","total_active_today"); _cell(0,1,"MAX ACTIVE","max_active_today"); _cell(0,2,"PREV. ACTIVE SPELL","prev_active_spell")
@@ -326,16 +365,18 @@ class DominantBorderHubApp(ctk.CTk):
         _cell(2,0,"MOUSE DIST. (px)","mouse_dist",False); _cell(2,1,"KEYSTROKES","keystrokes",False); 
         clicks_cell_f = ctk.CTkFrame(grid, fg_color="transparent"); clicks_cell_f.grid(row=2, column=2, padx=1, pady=1, sticky="nsew")
         clicks_cell_f.grid_rowconfigure(0,weight=1); clicks_cell_f.grid_rowconfigure(1,weight=1); clicks_cell_f.grid_columnconfigure(0,weight=1)
-        self.mouse_clicks_grid_title = ctk.CTkLabel(clicks_cell_f, text="MOUSE CLICKS", font=self.font_grid_subtitles, text_color=COLOR_TEXT_SECONDARY)
+        self.mouse_clicks_grid_title = ctk.CTkLabel(clicks_cell_f, text="MOUSE CLICKS", font=self.fonts["grid_subtitles"], text_color=COLOR_TEXT_SECONDARY)
         self.mouse_clicks_grid_title.grid(row=0, column=0, sticky="s")
-        self.mouse_clicks_grid_val = ctk.CTkLabel(clicks_cell_f, text="0", font=self.font_grid_counters, text_color=COLOR_TEXT_PRIMARY)
+        self.mouse_clicks_grid_val = ctk.CTkLabel(clicks_cell_f, text="0", font=self.fonts["grid_counters"], text_color=COLOR_TEXT_PRIMARY)
         self.mouse_clicks_grid_val.grid(row=1, column=0, sticky="n")
+        # Live rates over the last 1 / 5 / 15 minutes.
+        _cell(3,0,"KEYS/MIN 1·5·15m","keys_rate",False); _cell(3,1,"CLICKS/MIN 1·5·15m","clicks_rate",False); _cell(3,2,"PX/MIN 1·5·15m","pixels_rate",False)
 
         control_buttons_frame = ctk.CTkFrame(frame, fg_color="transparent")
         control_buttons_frame.pack(pady=(4, 3), padx=5, fill="x", expand=False)
         control_buttons_frame.grid_columnconfigure((0, 1, 2), weight=1, uniform="group_buttons_col")
 
-        grouped_btn_style = {"font": self.font_buttons, "corner_radius": 4, "height": 26,
+        grouped_btn_style = {"font": self.fonts["buttons"], "corner_radius": 4, "height": 26,
                              "text_color": COLOR_BUTTON_TEXT, "border_width": 1, "border_color": "#444",
                              "fg_color": COLOR_BUTTON_FG, "hover_color": COLOR_BUTTON_HOVER}
 
@@ -376,51 +417,48 @@ class DominantBorderHubApp(ctk.CTk):
 
 
         row_idx = 0 # Reset for placing elements
-        ctk.CTkLabel(right_panel, text="FOCUS/BREAK TIMER", font=self.font_section_titles, text_color=COLOR_TEXT_SECONDARY).grid(row=row_idx, column=0, pady=(10,0), sticky="n"); row_idx+=1
+        ctk.CTkLabel(right_panel, text="FOCUS/BREAK TIMER", font=self.fonts["section_titles"], text_color=COLOR_TEXT_SECONDARY).grid(row=row_idx, column=0, pady=(10,0), sticky="n"); row_idx+=1
         timer_display_frame = ctk.CTkFrame(right_panel, fg_color="transparent")
         timer_display_frame.grid(row=row_idx, column=0, pady=(0,5), padx=10, sticky="ew"); row_idx+=1
         timer_display_frame.grid_columnconfigure(0, weight=1)
-        self.focus_break_time_label = ctk.CTkLabel(timer_display_frame, text="00:00", font=self.font_focus_break_timer_value, text_color=COLOR_TEXT_PRIMARY)
+        self.focus_break_time_label = ctk.CTkLabel(timer_display_frame, text="00:00", font=self.fonts["focus_break_timer_value"], text_color=COLOR_TEXT_PRIMARY)
         self.focus_break_time_label.pack(pady=(0,0))
-        self.focus_break_status_label = ctk.CTkLabel(timer_display_frame, text="FOCUS", font=self.font_focus_break_status, text_color=COLOR_TEXT_SECONDARY)
+        self.focus_break_status_label = ctk.CTkLabel(timer_display_frame, text="FOCUS", font=self.fonts["focus_break_status"], text_color=COLOR_TEXT_SECONDARY)
         self.focus_break_status_label.pack(pady=(0,1))
 
         settings_info_frame = ctk.CTkFrame(right_panel, fg_color="transparent")
         settings_info_frame.grid(row=row_idx, column=0, pady=(0,0), padx=10, sticky="ew"); row_idx+=1
         settings_info_frame.grid_columnconfigure(0, weight=1)
-        entry_style = {"font": self.font_settings_entries, "border_width": 1, "corner_radius": 3, "width": 30, "height": 20, "justify": "center", "border_color": "#444"}
-        label_style = {"font": self.font_settings_labels, "text_color": COLOR_TEXT_SECONDARY}
+        entry_style = {"font": self.fonts["settings_entries"], "border_width": 1, "corner_radius": 3, "width": 30, "height": 20, "justify": "center", "border_color": "#444"}
+        label_style = {"font": self.fonts["settings_labels"], "text_color": COLOR_TEXT_SECONDARY}
         settings_grid = ctk.CTkFrame(settings_info_frame, fg_color="transparent")
         settings_grid.pack(pady=(0,2)) 
         settings_grid.grid_columnconfigure((0,1,2,3,4,5), weight=0)
         ctk.CTkLabel(settings_grid, text="Focus(m):", **label_style).grid(row=0, column=0, padx=(0,1), sticky="e")
-        self.focus_minutes_entry = ctk.CTkEntry(settings_grid, **entry_style); self.focus_minutes_entry.insert(0, str(INITIAL_FOCUS_MINUTES)); self.focus_minutes_entry.grid(row=0, column=1, padx=(0,5), sticky="w")
+        self.focus_minutes_entry = ctk.CTkEntry(settings_grid, **entry_style); self.focus_minutes_entry.insert(0, str(int(self._snapshot["focus_duration_seconds"]//60))); self.focus_minutes_entry.grid(row=0, column=1, padx=(0,5), sticky="w")
         ctk.CTkLabel(settings_grid, text="Break(m):", **label_style).grid(row=0, column=2, padx=(5,1), sticky="e")
-        self.break_minutes_entry = ctk.CTkEntry(settings_grid, **entry_style); self.break_minutes_entry.insert(0, str(INITIAL_BREAK_MINUTES)); self.break_minutes_entry.grid(row=0, column=3, padx=(0,5), sticky="w")
+        self.break_minutes_entry = ctk.CTkEntry(settings_grid, **entry_style); self.break_minutes_entry.insert(0, str(int(self._snapshot["break_duration_seconds"]//60))); self.break_minutes_entry.grid(row=0, column=3, padx=(0,5), sticky="w")
         ctk.CTkLabel(settings_grid, text="Delay(s):", **label_style).grid(row=0, column=4, padx=(5,1), sticky="e")
-        self.inactivity_timeout_entry = ctk.CTkEntry(settings_grid, **entry_style); self.inactivity_timeout_entry.insert(0, str(int(_current_inactivity_timeout))); self.inactivity_timeout_entry.grid(row=0, column=5, padx=(0,0), sticky="w")
+        self.inactivity_timeout_entry = ctk.CTkEntry(settings_grid, **entry_style); self.inactivity_timeout_entry.insert(0, str(int(self._snapshot["inactivity_timeout"]))); self.inactivity_timeout_entry.grid(row=0, column=5, padx=(0,0), sticky="w")
         
-        apply_btn_style = {"font": self.font_buttons, "corner_radius": 4, "height": 20, "text_color": COLOR_BUTTON_TEXT, "border_width": 1, "border_color": "#444", "fg_color": COLOR_BUTTON_FG, "hover_color": COLOR_BUTTON_HOVER, "width": 40}
+        apply_btn_style = {"font": self.fonts["buttons"], "corner_radius": 4, "height": 20, "text_color": COLOR_BUTTON_TEXT, "border_width": 1, "border_color": "#444", "fg_color": COLOR_BUTTON_FG, "hover_color": COLOR_BUTTON_HOVER, "width": 40}
         buttons_frame = ctk.CTkFrame(right_panel, fg_color="transparent")
         buttons_frame.grid(row=row_idx, column=0, pady=(2,5), padx=10, sticky="ew"); row_idx+=1
-        buttons_frame.grid_columnconfigure((0,1), weight=1, uniform="apply_btns")
+        buttons_frame.grid_columnconfigure((0,1,2,3), weight=1, uniform="apply_btns")
         self.apply_timer_settings_button = ctk.CTkButton(buttons_frame, text="APPLY TIMER", command=self.apply_timer_settings, **apply_btn_style)
         self.apply_timer_settings_button.grid(row=0, column=0, padx=3, sticky="ew")
         self.apply_inactivity_timeout_button = ctk.CTkButton(buttons_frame, text="APPLY DELAY", command=self.apply_inactivity_timeout_setting, **apply_btn_style)
         self.apply_inactivity_timeout_button.grid(row=0, column=1, padx=3, sticky="ew")
+        self.compact_mode_button = ctk.CTkButton(buttons_frame, text="COMPACT", command=lambda: self.after_idle(self.enter_compact_mode), **apply_btn_style)
+        self.compact_mode_button.grid(row=0, column=2, padx=3, sticky="ew")
+        self.history_button = ctk.CTkButton(buttons_frame, text="HISTORY", command=self.open_history_window, **apply_btn_style)
+        self.history_button.grid(row=0, column=3, padx=3, sticky="ew")
         
         ctk.CTkFrame(right_panel, height=1, fg_color="#333").grid(row=row_idx, column=0, pady=(5,5), padx=20, sticky="ew"); row_idx+=1
 
 
-        self.focus_history_title_label = ctk.CTkLabel(right_panel, text="FOCUS SESSION HISTORY", font=self.font_log_title, text_color=COLOR_TEXT_SECONDARY)
-        self.focus_history_title_label.grid(row=row_idx, column=0, pady=(6,1), sticky="n"); row_idx+=1
-        self.focus_history_textbox = ctk.CTkTextbox(right_panel, fg_color=FOCUS_HISTORY_BG, text_color=FOCUS_HISTORY_FG, font=self.font_focus_history_text, wrap="word", state="disabled", border_width=1, border_color="#333")
-        self.focus_history_textbox.grid(row=row_idx, column=0, sticky="nsew", padx=10, pady=(0,10)); row_idx+=1
-        
-        self.event_log_title_label = ctk.CTkLabel(right_panel, text="EVENT LOG", font=self.font_log_title, text_color=COLOR_TEXT_SECONDARY)
-        self.event_log_title_label.grid(row=row_idx, column=0, pady=(6,1), sticky="n"); row_idx+=1
-        self.event_log_console = ctk.CTkTextbox(right_panel, fg_color=CONSOLE_BG, text_color=CONSOLE_FG, font=self.font_event_log_console, wrap="word", state="disabled", border_width=1, border_color="#333")
-        self.event_log_console.grid(row=row_idx, column=0, sticky="nsew", padx=10, pady=(0,10)); row_idx+=1
+        # Focus history and event log rows: built by _create_deferred_panels once the window has been drawn.
+        self._right_panel = right_panel; self._deferred_panels_row = row_idx; row_idx += 4
 
         ctk.CTkFrame(right_panel, height=1, fg_color="#333").grid(row=row_idx, column=0, pady=(5,5), padx=20, sticky="ew"); row_idx+=1
         
@@ -430,89 +468,92 @@ class DominantBorderHubApp(ctk.CTk):
         time_info_bottom_frame.grid_columnconfigure(0, weight=1) # Center content
 
         self.total_session_time_label_right = ctk.CTkLabel(time_info_bottom_frame, text="TOTAL SESSION: 00:00:00", 
-                                                           font=self.font_total_session_time_right, 
+                                                           font=self.fonts["total_session_time_right"], 
                                                            text_color=COLOR_TEXT_SECONDARY)
         self.total_session_time_label_right.pack(pady=1)
 
         self.current_time_label_right = ctk.CTkLabel(time_info_bottom_frame, text="00:00:00", 
-                                                    font=self.font_clock_right, 
+                                                    font=self.fonts["clock_right"], 
                                                     text_color=COLOR_CLOCK_TEXT)
         self.current_time_label_right.pack(pady=1)
 
 
+    def _on_first_expose(self, event):
+        if self._deferred_panels_scheduled:return
+        self._deferred_panels_scheduled=True
+        # Queued behind the redraw of the first frame, which is already pending when Expose arrives.
+        self.after_idle(self._create_deferred_panels)
+
+    def _create_deferred_panels(self):
+        # The two text panels cost more to build than the rest of the window; the first frame shows without them.
+        # Log lines queue in _log_pending meanwhile and the focus history renders on the next refresh.
+        if self._closing or self._deferred_panels_built or self._compact:return
+        self._deferred_panels_built=True;before=set(vars(self))
+        right_panel=self._right_panel;row_idx=self._deferred_panels_row
+        focus_history_header = ctk.CTkFrame(right_panel, fg_color="transparent")
+        focus_history_header.grid(row=row_idx, column=0, pady=(6,1), padx=10, sticky="ew"); row_idx+=1
+        focus_history_header.grid_columnconfigure(1, weight=1)
+        pager_btn_style = {"font": self.fonts["buttons"], "corner_radius": 4, "height": 18, "width": 24, "text_color": COLOR_BUTTON_TEXT, "fg_color": COLOR_BUTTON_FG, "hover_color": COLOR_BUTTON_HOVER}
+        self.focus_history_newer_button = ctk.CTkButton(focus_history_header, text="\u2039", command=lambda: self._page_focus_history(-1), state="disabled", **pager_btn_style)
+        self.focus_history_newer_button.grid(row=0, column=0, sticky="w")
+        self.focus_history_title_label = ctk.CTkLabel(focus_history_header, text="FOCUS SESSION HISTORY", font=self.fonts["log_title"], text_color=COLOR_TEXT_SECONDARY)
+        self.focus_history_title_label.grid(row=0, column=1, sticky="n")
+        self.focus_history_older_button = ctk.CTkButton(focus_history_header, text="\u203a", command=lambda: self._page_focus_history(1), state="disabled", **pager_btn_style)
+        self.focus_history_older_button.grid(row=0, column=2, sticky="e")
+        self.focus_history_textbox = ctk.CTkTextbox(right_panel, fg_color=FOCUS_HISTORY_BG, text_color=FOCUS_HISTORY_FG, font=self.fonts["focus_history_text"], wrap="word", state="disabled", border_width=1, border_color="#333")
+        self.focus_history_textbox.grid(row=row_idx, column=0, sticky="nsew", padx=10, pady=(0,10)); row_idx+=1
+        # Tags live in the widget, so each rebuilt textbox (after compact mode) gets its own.
+        self.focus_history_textbox.tag_config("eff_good", foreground=COLOR_ACCENT_ACTIVE_MOUSE)
+        self.focus_history_textbox.tag_config("eff_bad", foreground=COLOR_TEXT_INACTIVE)
+
+        self.event_log_title_label = ctk.CTkLabel(right_panel, text="EVENT LOG", font=self.fonts["log_title"], text_color=COLOR_TEXT_SECONDARY)
+        self.event_log_title_label.grid(row=row_idx, column=0, pady=(6,1), sticky="n"); row_idx+=1
+        self.event_log_console = ctk.CTkTextbox(right_panel, fg_color=CONSOLE_BG, text_color=CONSOLE_FG, font=self.fonts["event_log_console"], wrap="word", state="disabled", border_width=1, border_color="#333")
+        self.event_log_console.grid(row=row_idx, column=0, sticky="nsew", padx=10, pady=(0,10))
+        self._view_attrs|=self._new_view_attrs(before)
+        self._focus_history_version=-1;self._refresh_key=None;self._next_refresh_at=0.0
+        self._flush_log_messages()
+
+    def _flush_log_messages(self):
+        # Appends the queued lines and trims the oldest ones by line index, so the cost depends on the burst size
+        # and not on how many lines the console keeps (MAX_LOG_LINES).
+        self._log_flush_scheduled=False
+        console=getattr(self,'event_log_console',None)
+        if not self._log_pending or console is None:return
+        try:
+            if not console.winfo_exists():return
+            lines=[]
+            while self._log_pending:lines.append(self._log_pending.popleft())
+            _m_log_flush.observe(len(lines))
+            console.configure(state="normal")
+            console.insert("end",'\n'.join(lines)+'\n'); self._log_line_count+=len(lines)
+            excess=self._log_line_count-MAX_LOG_LINES
+            if excess>0:console.delete("1.0",f"{excess+1}.0"); self._log_line_count=MAX_LOG_LINES
+            console.see("end");console.configure(state="disabled")
+        except Exception as e:print(f"Error GUI log: {e}")
+
     def on_window_resize_debounced(self, event=None):
         if self._resize_debounce_timer: self.after_cancel(self._resize_debounce_timer)
         self._resize_debounce_timer = self.after(150, lambda e=event: self.on_window_resize(e))
 
     def on_window_resize(self, event=None):
         if event and hasattr(event, 'widget') and event.widget != self: return
+        if self._compact: return # the overlay has fixed fonts
         try:
             if not self.winfo_exists(): return
             current_width = self.winfo_width(); scale = current_width / BASE_WINDOW_WIDTH
             if current_width <= 0: return
-            def fs(base, min_s): return max(min_s, int(base * scale))
-
-            self.font_total_session_time_right = (APP_FONT_FAMILY, fs(BASE_FONT_SIZE_TOTAL_SESSION_TIME_RIGHT, MIN_FONT_SIZE_TOTAL_SESSION_TIME_RIGHT), "bold")
-            self.font_clock_right = (APP_FONT_FAMILY, fs(BASE_FONT_SIZE_CLOCK_RIGHT, MIN_FONT_SIZE_CLOCK_RIGHT), "bold")
-            self.font_prominent_current_stats = (APP_FONT_FAMILY, fs(BASE_FONT_SIZE_PROMINENT_CURRENT_STATS, MIN_FONT_SIZE_PROMINENT_CURRENT_STATS), "bold")
-            self.font_prominent_stats_subtitle = (APP_FONT_FAMILY, fs(BASE_FONT_SIZE_PROMINENT_STATS_SUBTITLE, MIN_FONT_SIZE_PROMINENT_STATS_SUBTITLE), "normal")
-            self.font_grid_counters=(APP_FONT_FAMILY,fs(BASE_FONT_SIZE_GRID_COUNTERS,MIN_FONT_SIZE_GRID_COUNTERS),"bold")
-            self.font_grid_subtitles=(APP_FONT_FAMILY,fs(BASE_FONT_SIZE_GRID_SUBTITLES,MIN_FONT_SIZE_GRID_SUBTITLES),"normal")
-            self.font_focus_break_timer_value=(APP_FONT_FAMILY,fs(BASE_FONT_SIZE_FOCUS_BREAK_TIMER,MIN_FONT_SIZE_FOCUS_BREAK_TIMER),"bold")
-            self.font_focus_break_status=(APP_FONT_FAMILY,fs(BASE_FONT_SIZE_FOCUS_BREAK_STATUS,MIN_FONT_SIZE_FOCUS_BREAK_STATUS),"bold")
-            self.font_section_titles=(APP_FONT_FAMILY,fs(BASE_FONT_SIZE_SECTION_TITLES,MIN_FONT_SIZE_SECTION_TITLES),"bold")
-            self.font_buttons=(APP_FONT_FAMILY,fs(BASE_FONT_SIZE_BUTTONS,MIN_FONT_SIZE_BUTTONS),"bold")
-            self.font_settings_labels=(APP_FONT_FAMILY,fs(BASE_FONT_SIZE_SETTINGS_LABELS,MIN_FONT_SIZE_SETTINGS_LABELS))
-            self.font_settings_entries=(APP_FONT_FAMILY,fs(BASE_FONT_SIZE_SETTINGS_ENTRIES,MIN_FONT_SIZE_SETTINGS_ENTRIES))
-            self.font_effectiveness_value=(APP_FONT_FAMILY,fs(BASE_FONT_SIZE_EFFECTIVENESS_VALUE,MIN_FONT_SIZE_EFFECTIVENESS_VALUE),"bold")
-            self.font_effectiveness_title=(APP_FONT_FAMILY,fs(BASE_FONT_SIZE_EFFECTIVENESS_TITLE,MIN_FONT_SIZE_SECTION_TITLES),"bold")
-            self.font_log_title = (APP_FONT_FAMILY, fs(BASE_FONT_SIZE_LOG_TITLE, 10), "bold")
-            self.font_focus_history_text = (APP_FONT_FAMILY, fs(BASE_FONT_SIZE_FOCUS_HISTORY_TEXT, MIN_FONT_SIZE_FOCUS_HISTORY_TEXT))
-            self.font_event_log_console = (APP_FONT_FAMILY, fs(CONSOLE_FONT_SIZE, 7))
-
-            if hasattr(self,'timed_break_status_label'): self.timed_break_status_label.configure(font=(APP_FONT_FAMILY, fs(BASE_FONT_SIZE_BUTTONS-1, MIN_FONT_SIZE_BUTTONS-1 if MIN_FONT_SIZE_BUTTONS > 7 else 7 ), "bold"))
-            # No longer have total_session_time_label at top
-            # No longer have current_time_label in the left panel
-
-            if hasattr(self,'effectiveness_title_label'):self.effectiveness_title_label.configure(font=self.font_effectiveness_title)
-            if hasattr(self,'effectiveness_value_label'):self.effectiveness_value_label.configure(font=self.font_effectiveness_value)
-            if hasattr(self,'current_active_title_label'): self.current_active_title_label.configure(font=self.font_prominent_stats_subtitle)
-            if hasattr(self,'current_active_val_label'): self.current_active_val_label.configure(font=self.font_prominent_current_stats)
-            if hasattr(self,'current_idle_title_label'): self.current_idle_title_label.configure(font=self.font_prominent_stats_subtitle)
-            if hasattr(self,'current_idle_val_label'): self.current_idle_val_label.configure(font=self.font_prominent_current_stats)
-            stats_attrs=["total_active_today","max_active_today","prev_active_spell", "total_idle_today","max_idle_today","prev_idle_spell", "mouse_dist","keystrokes", "mouse_clicks"]
-            for attr_base in stats_attrs:
-                attr_val = f"{attr_base}_grid_val"; attr_title = f"{attr_base}_grid_title"
-                if hasattr(self,attr_val)and getattr(self,attr_val).winfo_exists(): getattr(self,attr_val).configure(font=self.font_grid_counters)
-                if hasattr(self,attr_title)and getattr(self,attr_title).winfo_exists():getattr(self,attr_title).configure(font=self.font_grid_subtitles)
-            if hasattr(self,'focus_break_status_label'):self.focus_break_status_label.configure(font=self.font_focus_break_status)
-            if hasattr(self,'focus_break_time_label'):self.focus_break_time_label.configure(font=self.font_focus_break_timer_value)
-            
-            if hasattr(self,'focus_history_title_label'): self.focus_history_title_label.configure(font=self.font_log_title)
-            if hasattr(self,'focus_history_textbox'): self.focus_history_textbox.configure(font=self.font_focus_history_text)
-            if hasattr(self,'event_log_title_label'): self.event_log_title_label.configure(font=self.font_log_title)
-            if hasattr(self,'event_log_console'): self.event_log_console.configure(font=self.font_event_log_console)
-
-            if hasattr(self, 'total_session_time_label_right'): self.total_session_time_label_right.configure(font=self.font_total_session_time_right)
-            if hasattr(self, 'current_time_label_right'): self.current_time_label_right.configure(font=self.font_clock_right)
-
-
-            btn_s={"font":self.font_buttons}
-            buttons_to_scale = ['reset_activity_button', 'pause_session_button', 'continue_session_button',
-                                'add_five_min_break_button', 'pause_thirty_min_button', 'pause_one_hour_button',
-                                'apply_timer_settings_button','apply_inactivity_timeout_button']
-            for btn_n in buttons_to_scale:
-                if hasattr(self,btn_n)and getattr(self,btn_n).winfo_exists():getattr(self,btn_n).configure(**btn_s)
-            
-            entry_s={"font":self.font_settings_entries}
-            for entry_n in['focus_minutes_entry','break_minutes_entry','inactivity_timeout_entry']:
-                 if hasattr(self,entry_n)and getattr(self,entry_n).winfo_exists():getattr(self,entry_n).configure(**entry_s)
+            # Widgets share the registry's fonts, so this is the whole resize: a few font objects at most, none
+            # while the window stays within the current scale step.
+            resized = self.fonts.set_scale(scale)
+            if resized: _m_font_resize.inc(resized)
         except Exception as e:print(f"Resize error: {e}\n{traceback.format_exc()}")
 
-    def _update_pause_button_states(self):
-        is_manually_paused = self.session_globally_paused and not self.timed_break_active
-        is_on_timed_break = self.timed_break_active
-        is_running_normally = not self.session_globally_paused and not self.timed_break_active
+    def _update_pause_button_states(self, s: Optional[Dict[str, Any]] = None):
+        s = self._snapshot if s is None else s
+        is_manually_paused = s["session_globally_paused"] and not s["timed_break_active"]
+        is_on_timed_break = s["timed_break_active"]
+        is_running_normally = not s["session_globally_paused"] and not s["timed_break_active"]
 
         if hasattr(self, 'pause_session_button'):
             self.pause_session_button.configure(state="normal" if is_running_normally else "disabled")
@@ -526,353 +567,276 @@ class DominantBorderHubApp(ctk.CTk):
             if btn: btn.configure(state="normal" if is_running_normally else "disabled")
         
         if hasattr(self, 'reset_activity_button'): self.reset_activity_button.configure(state="normal")
-    
-    def manual_pause_session(self):
-        if self.timed_break_active or self.session_globally_paused: return
-        self.session_globally_paused = True
-        self.session_pause_start_time = time.time()
-        add_log_message(self, "Session Paused Manually.")
-        self._update_pause_button_states()
-
-    def manual_continue_session(self):
-        if self.timed_break_active:
-            add_log_message(self, f"Timed break of {self.timed_break_duration_seconds//60}m interrupted by Continue.")
-            self.end_timed_break() 
-        elif self.session_globally_paused and not self.timed_break_active: 
-            if self.session_pause_start_time:
-                self.total_session_time_actively_paused += (time.time() - self.session_pause_start_time)
-            self.session_globally_paused = False
-            self.session_pause_start_time = None
-            add_log_message(self, "Session Continued Manually.")
-            self._update_pause_button_states()
-
-    def add_or_start_5_min_break(self):
-        if self.session_globally_paused and not self.timed_break_active:
-            add_log_message(self, "Cannot add/start 5min break while session is manually paused.")
-            return
-
-        five_minutes = 5 * 60
-        if self.timed_break_active:
-            if self.timed_break_end_time: 
-                self.timed_break_end_time += five_minutes
-                self.timed_break_duration_seconds += five_minutes 
-                remaining = self.timed_break_end_time - time.time()
-                add_log_message(self, f"+5min added to break. New total: {self.timed_break_duration_seconds//60}m. Remaining: {format_ms_string(remaining)}")
-            else:
-                add_log_message(self, "Error: Tried to extend break with no end time. Starting new 5min break.")
-                self.start_timed_break(five_minutes, is_extendable=True) 
-        else:
-            self.start_timed_break(five_minutes, is_extendable=True)
-        
-        self._update_pause_button_states() 
-        self.update_gui_display()      
-
-    def start_timed_break(self, duration_seconds: int, is_extendable: bool = False):
-        if self.session_globally_paused and not self.timed_break_active:
-             add_log_message(self, "Cannot start timed break while session is manually paused.")
-             return
-        if self.timed_break_active and not is_extendable:
-            add_log_message(self, "Another timed break is already active. Cannot start a new fixed break.")
-            return
-        
-        self.timed_break_active = True
-        self.timed_break_duration_seconds = duration_seconds 
-        self.timed_break_end_time = time.time() + duration_seconds
-        
-        if not self.session_globally_paused:
-            self.session_globally_paused = True
-            self.session_pause_start_time = time.time()
-            self.timed_break_initiated_pause = True
-        else: 
-            self.timed_break_initiated_pause = False
-            
-        add_log_message(self, f"Timed break for {duration_seconds//60} minutes started.")
-        self._update_pause_button_states()
-        self.update_gui_display()
-
-    def end_timed_break(self):
-        if not self.timed_break_active: return
-        
-        break_duration_minutes = self.timed_break_duration_seconds // 60
-        
-        if self.timed_break_initiated_pause and self.session_pause_start_time:
-             self.total_session_time_actively_paused += (time.time() - self.session_pause_start_time)
-        
-        self.timed_break_active = False
-        self.timed_break_duration_seconds = 0
-        self.timed_break_end_time = None
-        
-        if self.timed_break_initiated_pause: 
-            self.session_globally_paused = False
-            self.session_pause_start_time = None 
-        
-        self.timed_break_initiated_pause = False
-        
-        self.timed_break_status_label.configure(text="")
-        add_log_message(self, f"Timed break ({break_duration_minutes}m) finished.")
-        self._update_pause_button_states()
-        self.update_gui_display()
-
-
-    def reset_daily_activity_counter(self):
-        now=time.time()
-        with state_lock:
-            app_state.update({
-                "total_active_seconds_today":0.0,"total_idle_seconds_today":0.0,
-                "max_idle_seconds_today":0.0,"max_active_seconds_today":0.0,
-                "mouse_total_distance_today":0.0,"keystrokes_today":0,"mouse_clicks_today":0,
-                "last_activity_duration":0.0, "last_inactivity_duration":0.0,
-                "current_idle_start_time":None,"current_activity_start_time":now,
-                "last_activity_time":now,"prev_overall_active_state":True,"mouse_last_pos_for_distance":None
-            })
-        add_log_message(self,"Daily stats reset.")
+
+    def _engine_command(self, command, *args, error_prefix: str = "Engine error"):
+        try: command(*args)
+        except Exception as e: add_log_message(self, f"{error_prefix}: {e}"); return False
+        self._refresh_display()
+        return True
+
+    def manual_pause_session(self): self._engine_command(self.engine.manual_pause_session)
+    def manual_continue_session(self): self._engine_command(self.engine.manual_continue_session)
+    def add_or_start_5_min_break(self): self._engine_command(self.engine.add_or_start_5_min_break)
+    def start_timed_break(self, duration_seconds: int, is_extendable: bool = False): self._engine_command(self.engine.start_timed_break, duration_seconds, is_extendable)
+    def reset_daily_activity_counter(self): self._engine_command(self.engine.reset_daily_activity_counter)
+
+    def _render(self, attr: str, **opts):
+        # Diff against what the widget currently shows; every configure() makes Tk re-measure and redraw it.
+        widget = getattr(self, attr, None)
+        if widget is None: return
+        shown = self._rendered.setdefault(attr, {})
+        changed = {k: v for k, v in opts.items() if k not in shown or shown[k] != v}
+        if changed: widget.configure(**changed); shown.update(changed)
+
+    def _on_effectiveness_bar_resize(self, event):
+        self._effectiveness_bar_width = event.width - 4
+        self._effectiveness_bar_shown_width = -1
 
     def update_gui_display(self):
-        if not self.winfo_exists():return
-        now=time.time();now_dt=datetime.datetime.now()
+        # Cheap probe every GUI_PROBE_INTERVAL; the full refresh only runs when it is due or the engine logged a
+        # state change (every transition, command and timer boundary produces an event). The probe is a local read
+        # either way: an EngineClient has the counter pushed to it (None until it is known). Nothing is scheduled
+        # while the window is iconified or withdrawn; <Map> restarts the chain.
+        self._refresh_job=None
+        if self._closing or not self.winfo_exists() or not self._window_visible:return
+        now=time.monotonic()
+        seq=self.engine.event_seq
+        changed=seq is not None and seq!=self._event_seq
+        if changed or now>=self._next_refresh_at:
+            t0=time.perf_counter();self._refresh_display();_m_gui_refresh.observe(time.perf_counter()-t0)
+            now=time.monotonic();self._next_refresh_at=now+self._refresh_delay(self._snapshot)
+        self._refresh_job=self.after(max(1,int(min(GUI_PROBE_INTERVAL,self._next_refresh_at-now)*1000)),self.update_gui_display)
+
+    def _refresh_delay(self, s: Dict[str, Any]) -> float:
+        now=s["snapshot_time"]
+        delay=GUI_REFRESH_INTERVAL-(now%GUI_REFRESH_INTERVAL)+0.005 # just past the next second of the clock labels
+        if s["timed_break_active"] and s["timed_break_end_time"]:countdown=s["timed_break_end_time"]-now
+        elif not s["session_globally_paused"]:
+            countdown=s["timer_seconds_remaining"]
+            until_idle=s["last_activity_time"]+s["inactivity_timeout"]-now
+            if 0<until_idle<GUI_REFRESH_INTERVAL:return GUI_FAST_REFRESH_INTERVAL
+        else:countdown=None
+        if countdown is not None and countdown<=GUI_FAST_COUNTDOWN_SECONDS:return GUI_FAST_REFRESH_INTERVAL
+        return delay
+
+    def _on_map(self, event):
+        if event.widget is not self or self._window_visible:return
+        self._window_visible=True
+        if self._refresh_job is None:self._next_refresh_at=0.0;self._refresh_job=self.after(0,self.update_gui_display)
+
+    def _on_unmap(self, event):
+        if event.widget is not self:return
+        self._window_visible=False
+        if self._refresh_job is not None:self.after_cancel(self._refresh_job);self._refresh_job=None
+
+    def _pull_engine_state(self) -> Optional[Dict[str, Any]]:
+        try:
+            s=self.engine.snapshot()
+            if s["event_seq"]!=self._event_seq:
+                seq,events=self.engine.events_since(self._event_seq)
+                for _,ts,msg in events:add_log_message(self,msg,ts)
+                self._event_seq=seq
+        except Exception as e:
+            if self._engine_error is None:add_log_message(self,f"Tracker engine unavailable: {e}")
+            self._engine_error=e;return None
+        if self._engine_error is not None:self._engine_error=None;add_log_message(self,"Tracker engine connection restored.")
+        self._snapshot=s
+        flags=(s["session_globally_paused"],s["timed_break_active"])
+        if flags!=self._session_flags:self._session_flags=flags;self._update_pause_button_states(s)
+        return s
+
+    def _refresh_display(self):
+        s=self._pull_engine_state()
+        if s is None:return
+        # Everything shown is a function of the published state, the engine's events (commands, pauses) and the clock
+        # second; with none of them changed there is nothing to redraw.
+        key=(s["state_version"],s["event_seq"],int(s["snapshot_time"]))
+        if key==self._refresh_key:return
+        self._refresh_key=key
+        if self._history_window is not None:
+            try:self._history_window.update_live(s)
+            except Exception as e:self._history_window=None;add_log_message(self,f"History charts stopped: {e}")
+        if self._compact:self._refresh_compact(s);return
+        now=s["snapshot_time"];now_dt=datetime.datetime.fromtimestamp(now)
+        render=self._render
 
         # Total Session Time (now displayed on the right)
-        if self.session_globally_paused and self.session_pause_start_time:
-            effective_running_time = (self.session_pause_start_time - self.app_launch_time) - self.total_session_time_actively_paused
+        if s["session_globally_paused"] and s["session_pause_start_time"]:
+            effective_running_time = (s["session_pause_start_time"] - s["app_launch_time"]) - s["total_session_time_actively_paused"]
         else:
-            effective_running_time = (now - self.app_launch_time) - self.total_session_time_actively_paused
-        if hasattr(self, 'total_session_time_label_right'): # Updated attribute name
-             self.total_session_time_label_right.configure(text=f"{format_hms_string(effective_running_time)}")
+            effective_running_time = (now - s["app_launch_time"]) - s["total_session_time_actively_paused"]
+        render('total_session_time_label_right', text=format_hms_string(effective_running_time))
 
         # Current Time (now displayed on the right)
-        if hasattr(self,'current_time_label_right'): # Updated attribute name
-            self.current_time_label_right.configure(text=now_dt.strftime('%H:%M:%S'))
+        render('current_time_label_right', text=now_dt.strftime('%H:%M:%S'))
 
 
-        if self.timed_break_active and self.timed_break_end_time:
-            remaining_break = self.timed_break_end_time - time.time() 
-            base_font_size = BASE_FONT_SIZE_TOTAL_SESSION_TIME_RIGHT * 1.2 # Example for slightly larger status
+        if s["timed_break_active"] and s["timed_break_end_time"]:
+            remaining_break = s["timed_break_end_time"] - now
             if remaining_break > 0: 
-                self.timed_break_status_label.configure(
-                    text=f"ON {self.timed_break_duration_seconds//60} MIN BREAK - {format_hms_string(remaining_break)} left",
-                    font=(APP_FONT_FAMILY, int(base_font_size), "bold")
-                )
+                render('timed_break_status_label',
+                       text=f"ON {s['timed_break_duration_seconds']//60} MIN BREAK - {format_hms_string(remaining_break)} left",
+                       font=self.fonts["timed_break_status_active"])
             else: 
-                self.timed_break_status_label.configure(
-                    text=f"{self.timed_break_duration_seconds//60} MIN BREAK ENDING...",
-                    font=(APP_FONT_FAMILY, int(base_font_size), "bold")
-                )
-        elif hasattr(self, 'timed_break_status_label'): self.timed_break_status_label.configure(text="")
+                render('timed_break_status_label',
+                       text=f"{s['timed_break_duration_seconds']//60} MIN BREAK ENDING...",
+                       font=self.fonts["timed_break_status_active"])
+        else: render('timed_break_status_label', text="", font=self.fonts["timed_break_status"])
 
-        with state_lock:s=app_state.copy()
-        is_manually_paused = self.session_globally_paused and not self.timed_break_active
+        focus_history_changed = s["focus_session_log_version"] != self._focus_history_version
+        inactivity_timeout = s["inactivity_timeout"]
+        is_manually_paused = s["session_globally_paused"] and not s["timed_break_active"]
 
         if is_manually_paused:
-            if hasattr(self,'current_active_val_label'): self.current_active_val_label.configure(text="PAUSED")
-            if hasattr(self,'current_idle_val_label'): self.current_idle_val_label.configure(text="PAUSED")
-            if hasattr(self,'focus_break_time_label'): self.focus_break_time_label.configure(text="PAUSED")
-            if hasattr(self,'focus_break_status_label'): self.focus_break_status_label.configure(text="SESSION PAUSED")
-        elif self.timed_break_active: 
-            if hasattr(self,'focus_break_time_label'): self.focus_break_time_label.configure(text="ON BREAK", font=(APP_FONT_FAMILY, int(BASE_FONT_SIZE_FOCUS_BREAK_TIMER * 1.2), "bold"))
-            if hasattr(self,'focus_break_status_label'): self.focus_break_status_label.configure(text=f"{self.timed_break_duration_seconds//60} MIN BREAK")
-            active_now=(now-s["last_activity_time"])< _current_inactivity_timeout
+            render('current_active_val_label', text="PAUSED")
+            render('current_idle_val_label', text="PAUSED")
+            render('focus_break_time_label', text="PAUSED", font=self.fonts["focus_break_timer_value"])
+            render('focus_break_status_label', text="SESSION PAUSED")
+        elif s["timed_break_active"]: 
+            render('focus_break_time_label', text="ON BREAK", font=self.fonts["focus_break_timer_on_break"])
+            render('focus_break_status_label', text=f"{s['timed_break_duration_seconds']//60} MIN BREAK")
+            active_now=(now-s["last_activity_time"])< inactivity_timeout
             current_idle_s=0.0; current_active_s=0.0
             if active_now:
                 if s["current_activity_start_time"]:current_active_s=now-s["current_activity_start_time"]
             else:
                 if s["current_idle_start_time"]:current_idle_s=now-s["current_idle_start_time"]
-            if hasattr(self,'current_active_val_label'):self.current_active_val_label.configure(text=format_hms_string(current_active_s))
-            if hasattr(self,'current_idle_val_label'):self.current_idle_val_label.configure(text=format_hms_string(current_idle_s))
+            render('current_active_val_label', text=format_hms_string(current_active_s))
+            render('current_idle_val_label', text=format_hms_string(current_idle_s))
         else: # Running normally
-            active_now=(now-s["last_activity_time"])< _current_inactivity_timeout
+            active_now=(now-s["last_activity_time"])< inactivity_timeout
             current_idle_s=0.0; current_active_s=0.0
             if active_now:
                 if s["current_activity_start_time"]:current_active_s=now-s["current_activity_start_time"]
             else:
                 if s["current_idle_start_time"]:current_idle_s=now-s["current_idle_start_time"]
-            if hasattr(self,'current_active_val_label'):self.current_active_val_label.configure(text=format_hms_string(current_active_s))
-            if hasattr(self,'current_active_title_label'):self.current_active_title_label.configure(text_color=COLOR_ACCENT_ACTIVE_MOUSE if active_now and current_active_s > 0.1 else COLOR_TEXT_SECONDARY)
-            if hasattr(self,'current_idle_val_label'):self.current_idle_val_label.configure(text=format_hms_string(current_idle_s))
-            if hasattr(self,'current_idle_title_label'):self.current_idle_title_label.configure(text_color=COLOR_TEXT_INACTIVE if not active_now and current_idle_s > 0.1 else COLOR_TEXT_SECONDARY)
+            render('current_active_val_label', text=format_hms_string(current_active_s))
+            render('current_active_title_label', text_color=COLOR_ACCENT_ACTIVE_MOUSE if active_now and current_active_s > 0.1 else COLOR_TEXT_SECONDARY)
+            render('current_idle_val_label', text=format_hms_string(current_idle_s))
+            render('current_idle_title_label', text_color=COLOR_TEXT_INACTIVE if not active_now and current_idle_s > 0.1 else COLOR_TEXT_SECONDARY)
             timer_mode = s["timer_mode"]; timer_rem = s["timer_seconds_remaining"]
             timer_status_text = timer_mode.upper(); timer_status_color = COLOR_TIMER_FOCUS if timer_mode == "focus" else COLOR_TIMER_BREAK
-            if hasattr(self,'focus_break_status_label'):self.focus_break_status_label.configure(text=timer_status_text,text_color=timer_status_color)
-            if hasattr(self,'focus_break_time_label'):self.focus_break_time_label.configure(text=format_ms_string(timer_rem))
+            render('focus_break_status_label', text=timer_status_text, text_color=timer_status_color)
+            render('focus_break_time_label', text=format_ms_string(timer_rem), font=self.fonts["focus_break_timer_value"])
 
         eff_p=(s["total_active_seconds_today"]/(s["total_active_seconds_today"]+s["total_idle_seconds_today"])*100)if(s["total_active_seconds_today"]+s["total_idle_seconds_today"])>0 else 0
         eff_c=COLOR_ACCENT_ACTIVE_MOUSE if eff_p >= 66.6 else COLOR_TEXT_INACTIVE
-        if hasattr(self,'effectiveness_value_label'):self.effectiveness_value_label.configure(text=f"{eff_p:.1f}%",text_color=eff_c)
-        if hasattr(self,'effectiveness_bar')and self.effectiveness_bar_bg.winfo_exists():
-            bar_w=self.effectiveness_bar_bg.winfo_width()-4
-            if bar_w>0:self.effectiveness_bar.place_configure(width=max(0, min(bar_w, bar_w*(eff_p/100.0))))
-            current_bar_color = COLOR_ACCENT_ACTIVE_MOUSE if eff_p >= 66.6 else EFFECTIVENESS_BAR_LOW_COLOR
-            self.effectiveness_bar.configure(fg_color=current_bar_color)
-
-        if hasattr(self,'total_active_today_grid_val'):self.total_active_today_grid_val.configure(text=format_hms_string(s["total_active_seconds_today"]))
-        # ... (other grid stats updates)
-        if hasattr(self,'max_active_today_grid_val'):self.max_active_today_grid_val.configure(text=format_hms_string(s["max_active_seconds_today"]))
-        if hasattr(self,'prev_active_spell_grid_val'):self.prev_active_spell_grid_val.configure(text=format_hms_string(s["last_activity_duration"])if s["last_activity_duration"]>0.1 else"N/A")
-        if hasattr(self,'prev_idle_spell_grid_val'):self.prev_idle_spell_grid_val.configure(text=format_hms_string(s["last_inactivity_duration"])if s["last_inactivity_duration"]>0.1 else"N/A")
-        if hasattr(self,'mouse_dist_grid_val'):self.mouse_dist_grid_val.configure(text=f"{s['mouse_total_distance_today']:,.0f}")
-        if hasattr(self,'keystrokes_grid_val'):self.keystrokes_grid_val.configure(text=f"{s['keystrokes_today']:,}")
-        if hasattr(self,'total_idle_today_grid_val'):self.total_idle_today_grid_val.configure(text=format_hms_string(s["total_idle_seconds_today"]))
-        if hasattr(self,'max_idle_today_grid_val'):self.max_idle_today_grid_val.configure(text=format_hms_string(s["max_idle_seconds_today"]))
-        if hasattr(self,'mouse_clicks_grid_val'):self.mouse_clicks_grid_val.configure(text=f"{s.get('mouse_clicks_today', 0):,}")
+        render('effectiveness_value_label', text=f"{eff_p:.1f}%", text_color=eff_c)
+        if hasattr(self,'effectiveness_bar'):
+            bar_w=self._effectiveness_bar_width
+            if bar_w>0:
+                # Whole pixels only, so sub-pixel changes in the percentage do not touch the widget.
+                width=int(max(0, min(bar_w, bar_w*(eff_p/100.0))))
+                if self._effectiveness_bar_shown_width!=width:
+                    self.effectiveness_bar.place_configure(width=width); self._effectiveness_bar_shown_width=width
+            render('effectiveness_bar', fg_color=COLOR_ACCENT_ACTIVE_MOUSE if eff_p >= 66.6 else EFFECTIVENESS_BAR_LOW_COLOR)
+
+        render('total_active_today_grid_val', text=format_hms_string(s["total_active_seconds_today"]))
+        render('max_active_today_grid_val', text=format_hms_string(s["max_active_seconds_today"]))
+        render('prev_active_spell_grid_val', text=format_hms_string(s["last_activity_duration"])if s["last_activity_duration"]>0.1 else"N/A")
+        render('prev_idle_spell_grid_val', text=format_hms_string(s["last_inactivity_duration"])if s["last_inactivity_duration"]>0.1 else"N/A")
+        render('mouse_dist_grid_val', text=f"{s['mouse_total_distance_today']:,.0f}")
+        render('keystrokes_grid_val', text=f"{s['keystrokes_today']:,}")
+        render('total_idle_today_grid_val', text=format_hms_string(s["total_idle_seconds_today"]))
+        render('max_idle_today_grid_val', text=format_hms_string(s["max_idle_seconds_today"]))
+        render('mouse_clicks_grid_val', text=f"{s.get('mouse_clicks_today', 0):,}")
+        rates = s.get("input_rates")
+        if rates:
+            for name, values in rates.items(): render(f'{name}_rate_grid_val', text=" · ".join(f"{v:,.0f}" for v in values))
         
-        if hasattr(self, 'focus_history_textbox') and self.focus_history_textbox.winfo_exists():
-            self.focus_history_textbox.configure(state="normal")
-            self.focus_history_textbox.delete("1.0", "end")
-            if not self._color_tags_defined:
-                self.focus_history_textbox.tag_config("eff_good", foreground=COLOR_ACCENT_ACTIVE_MOUSE)
-                self.focus_history_textbox.tag_config("eff_bad", foreground=COLOR_TEXT_INACTIVE)
-                self._color_tags_defined = True
-
-            for entry in list(s["focus_session_log"]):
-                eff = entry['effectiveness']
-                tag_to_use = "eff_good" if eff >= 66.6 else "eff_bad"
-                log_text = f"Focus ({entry['duration_minutes']}m) at {entry['end_time_str']} - {eff:.1f}% effective\n"
-                self.focus_history_textbox.insert("end", log_text, (tag_to_use,))
-            self.focus_history_textbox.configure(state="disabled")
-        
-        if app_state["running"]:self.after(int(ACTIVITY_CHECK_INTERVAL*1000),self.update_gui_display)
+        # The session history only changes when a focus period ends; rebuild the textbox then and not every frame.
+        if focus_history_changed and self._deferred_panels_built: self._render_focus_history(s["focus_session_log_version"])
+
+    def _refresh_compact(self, s: Dict[str, Any]):
+        now=s["snapshot_time"];render=self._render
+        if s["timed_break_active"] and s["timed_break_end_time"]:
+            render('compact_timer_label', text=format_ms_string(max(0, s["timed_break_end_time"]-now)), text_color=COLOR_TIMER_BREAK)
+            render('compact_state_label', text=f"ON {s['timed_break_duration_seconds']//60} MIN BREAK", text_color=COLOR_TEXT_SECONDARY)
+        elif s["session_globally_paused"]:
+            render('compact_timer_label', text="PAUSED", text_color=COLOR_TEXT_SECONDARY)
+            render('compact_state_label', text="SESSION PAUSED", text_color=COLOR_TEXT_SECONDARY)
+        else:
+            focus=s["timer_mode"]=="focus"
+            render('compact_timer_label', text=format_ms_string(s["timer_seconds_remaining"]), text_color=COLOR_TIMER_FOCUS if focus else COLOR_TIMER_BREAK)
+            if (now-s["last_activity_time"])<s["inactivity_timeout"]:
+                start=s["current_activity_start_time"]
+                render('compact_state_label', text=f"{s['timer_mode'].upper()} \u00b7 ACTIVE {format_hms_string(now-start) if start else ''}", text_color=COLOR_ACCENT_ACTIVE_MOUSE)
+            else:
+                start=s["current_idle_start_time"]
+                render('compact_state_label', text=f"{s['timer_mode'].upper()} \u00b7 IDLE {format_hms_string(now-start) if start else ''}", text_color=COLOR_TEXT_INACTIVE)
+
+    def _page_focus_history(self, step: int):
+        offset = self._focus_history_offset + step * FOCUS_HISTORY_PAGE_SIZE
+        if offset < 0 or offset >= self._focus_history_total: return
+        self._focus_history_offset = offset; self._render_focus_history(self._focus_history_version)
+
+    def _render_focus_history(self, version: int):
+        # One page of the history, newest first, fetched from the engine (over IPC for a --connect window).
+        textbox = getattr(self, 'focus_history_textbox', None)
+        if textbox is None or not textbox.winfo_exists(): return
+        try:
+            page = self.engine.focus_sessions(self._focus_history_offset, FOCUS_HISTORY_PAGE_SIZE)
+            if not page["sessions"] and self._focus_history_offset > 0: # the store shrank under us (e.g. a new file)
+                self._focus_history_offset = 0; page = self.engine.focus_sessions(0, FOCUS_HISTORY_PAGE_SIZE)
+        except Exception as e: add_log_message(self, f"Focus history unavailable: {e}"); return
+        total = self._focus_history_total = page["total"]; sessions = page["sessions"]; offset = self._focus_history_offset
+        textbox.configure(state="normal")
+        textbox.delete("1.0", "end")
+        today = datetime.date.today().isoformat()
+        for entry in sessions:
+            eff = entry['effectiveness']
+            tag_to_use = "eff_good" if eff >= 66.6 else "eff_bad"
+            end_dt = datetime.datetime.fromtimestamp(entry['end'])
+            when = end_dt.strftime('%H:%M:%S') if entry['day'] == today else end_dt.strftime('%b %d %H:%M')
+            log_text = f"Focus ({entry['planned_seconds'] // 60}m) at {when} - {eff:.1f}% effective"
+            if entry['interruptions']: log_text += f", {entry['interruptions']} pause{'s' if entry['interruptions'] > 1 else ''} ({format_ms_string(entry['paused_seconds'])})"
+            if not entry['completed']: log_text += " (cut short)"
+            textbox.insert("end", log_text + "\n", (tag_to_use,))
+        textbox.configure(state="disabled")
+        title = "FOCUS SESSION HISTORY" if total <= FOCUS_HISTORY_PAGE_SIZE else f"FOCUS SESSION HISTORY  {offset + 1:,}-{offset + len(sessions):,} of {total:,}"
+        self._render('focus_history_title_label', text=title)
+        self._render('focus_history_newer_button', state="normal" if offset > 0 else "disabled")
+        self._render('focus_history_older_button', state="normal" if offset + len(sessions) < total else "disabled")
+        self._focus_history_version = version
 
     def apply_timer_settings(self):
-        try:
-            f_m,b_m=int(self.focus_minutes_entry.get()),int(self.break_minutes_entry.get())
-            if not(0<f_m<1000 and 0<b_m<1000):raise ValueError("Durations out of range.")
-            with state_lock:
-                app_state.update({"focus_duration_seconds":f_m*60,"break_duration_seconds":b_m*60})
-                app_state["timer_mode"] = "focus"
-                app_state["timer_seconds_remaining"] = app_state["focus_duration_seconds"]
-                app_state["current_focus_active_seconds"] = 0.0
-            add_log_message(self,f"Timer Settings: Focus {f_m}m, Break {b_m}m. Timer reset to Focus.")
-        except Exception as e:add_log_message(self,f"Timer settings error: {e}")
+        try: f_m,b_m=int(self.focus_minutes_entry.get()),int(self.break_minutes_entry.get())
+        except Exception as e: add_log_message(self,f"Timer settings error: {e}"); return
+        self._engine_command(self.engine.apply_timer_settings,f_m,b_m,error_prefix="Timer settings error")
 
     def apply_inactivity_timeout_setting(self):
-        global _current_inactivity_timeout
-        try:
-            new_timeout=float(self.inactivity_timeout_entry.get())
-            if not(1.0<=new_timeout<=3600.0):raise ValueError("Timeout 1-3600s.")
-            _current_inactivity_timeout=new_timeout
-            add_log_message(self,f"Inactivity timeout: {_current_inactivity_timeout:.1f}s.")
-        except Exception as e:
-            add_log_message(self,f"Timeout error: {e}")
-            self.inactivity_timeout_entry.delete(0,"end");self.inactivity_timeout_entry.insert(0,str(int(_current_inactivity_timeout)))
-
-    def tracking_loop(self):
-        global _current_inactivity_timeout
-        last_save = time.time(); last_inactivity_log = 0; active_now_local = False
-        while True:
-            with state_lock: running = app_state["running"]
-            if not running: break
-            now = time.time()
-            if self.timed_break_active and self.timed_break_end_time and now >= self.timed_break_end_time:
-                self.after(0, self.end_timed_break)
-            if self.session_globally_paused: 
-                time.sleep(ACTIVITY_CHECK_INTERVAL); continue
-            today_iso = datetime.date.today().isoformat()
-            with state_lock: current_day_s = app_state["current_day_string"]
-            if current_day_s != today_iso:
-                add_log_message(self, f"Day change: {today_iso}. Resetting counters.")
-                save_daily_data()
-                with state_lock:
-                    app_state.update({
-                        "current_day_string": today_iso, "total_active_seconds_today": 0.0, "total_idle_seconds_today": 0.0,
-                        "max_idle_seconds_today": 0.0, "max_active_seconds_today": 0.0, "mouse_total_distance_today": 0.0, 
-                        "keystrokes_today": 0, "mouse_clicks_today": 0, "last_activity_duration": 0.0, 
-                        "last_inactivity_duration": 0.0, "current_idle_start_time": None, "current_activity_start_time": now,
-                        "last_activity_time": now, "prev_overall_active_state": True, "mouse_last_pos_for_distance": None,
-                        "current_focus_active_seconds": 0.0,
-                    })
-                load_daily_data()
-            with state_lock:
-                s_trk = app_state.copy(); last_act_time = s_trk["last_activity_time"]
-                was_active = s_trk["prev_overall_active_state"]; cur_idle_start_ts = s_trk["current_idle_start_time"]
-                cur_act_start_ts = s_trk["current_activity_start_time"]; cur_max_idle = s_trk["max_idle_seconds_today"]
-                cur_max_active = s_trk["max_active_seconds_today"]
-            active_now_local = (now - last_act_time) < _current_inactivity_timeout
-            updates = {}; log_msg_parts = []
-            if was_active and not active_now_local:
-                updates["current_idle_start_time"] = last_act_time
-                if cur_act_start_ts is not None:
-                    act_dur = last_act_time - cur_act_start_ts
-                    if act_dur > 0: updates["last_activity_duration"] = act_dur; updates["max_active_seconds_today"] = max(cur_max_active, act_dur)
-                updates["current_activity_start_time"] = None; log_msg_parts.append("Became inactive.")
-            elif not was_active and active_now_local:
-                updates["current_activity_start_time"] = now
-                if cur_idle_start_ts is not None:
-                    idle_dur = now - cur_idle_start_ts
-                    if idle_dur > 1.0: updates["last_inactivity_duration"] = idle_dur; updates["max_idle_seconds_today"] = max(cur_max_idle, idle_dur); log_msg_parts.append(f"Active after {format_hms_string(idle_dur)} idle.")
-                    else: log_msg_parts.append("Active (short idle).")
-                else: log_msg_parts.append("Became active.")
-                updates["current_idle_start_time"] = None
-            with state_lock:
-                app_state.update(updates)
-                if active_now_local: app_state["total_active_seconds_today"] += ACTIVITY_CHECK_INTERVAL
-                elif app_state["current_idle_start_time"] is not None: app_state["total_idle_seconds_today"] += ACTIVITY_CHECK_INTERVAL
-                app_state["prev_overall_active_state"] = active_now_local
-            current_inactive_seconds_for_log = 0 if active_now_local else (now - app_state.get("current_idle_start_time", now))
-            if not active_now_local and current_inactive_seconds_for_log >= LONG_INACTIVITY_THRESHOLD and (now - last_inactivity_log >= LONG_INACTIVITY_THRESHOLD):
-                log_msg_parts.append(f"Still inactive ({round(current_inactive_seconds_for_log / 60)}m)")
-                last_inactivity_log = now
-            elif active_now_local: last_inactivity_log = 0
-            with state_lock:
-                timer_mode = app_state["timer_mode"]; focus_duration_for_log = app_state["focus_duration_seconds"]
-                if timer_mode == "focus" and active_now_local: app_state["current_focus_active_seconds"] += ACTIVITY_CHECK_INTERVAL
-                current_timer_remaining = app_state["timer_seconds_remaining"] - ACTIVITY_CHECK_INTERVAL
-                app_state["timer_seconds_remaining"] = current_timer_remaining
-                if current_timer_remaining <= 0:
-                    break_duration = app_state["break_duration_seconds"]
-                    if timer_mode == "focus":
-                        active_in_focus = app_state["current_focus_active_seconds"]; effectiveness = 0.0
-                        if focus_duration_for_log > 0: effectiveness = (active_in_focus / focus_duration_for_log) * 100
-                        
-                        timestamp_str = datetime.datetime.now().strftime('%H:%M:%S')
-                        log_focus_session(effectiveness, int(focus_duration_for_log / 60), timestamp_str)
-                        
-                        log_entry = {'effectiveness': effectiveness, 'end_time_str': timestamp_str, 'duration_minutes': int(focus_duration_for_log / 60)}
-                        app_state["focus_session_log"].appendleft(log_entry)
-                        
-                        log_msg_parts.append(f"Focus ({log_entry['duration_minutes']}m) ended. Eff: {effectiveness:.1f}%.")
-                        app_state["timer_mode"] = "break"; app_state["timer_seconds_remaining"] = break_duration
-                        app_state["current_focus_active_seconds"] = 0.0
-                        log_msg_parts.append(f"Starting Break ({int(break_duration/60)}m).")
-                    elif timer_mode == "break":
-                        focus_duration_next = app_state["focus_duration_seconds"]
-                        app_state["timer_mode"] = "focus"; app_state["timer_seconds_remaining"] = focus_duration_next
-                        app_state["current_focus_active_seconds"] = 0.0
-                        log_msg_parts.append(f"Break ({int(break_duration/60)}m) ended. Starting Focus ({int(focus_duration_next/60)}m).")
-            if log_msg_parts:
-                final_log_msg = " ".join(log_msg_parts)
-                self.after(0, lambda msg=final_log_msg: add_log_message(self, msg))
-            if now - last_save > 60: save_daily_data(); last_save = now
-            time.sleep(max(0, ACTIVITY_CHECK_INTERVAL - (time.time() - now)))
-        print("Tracking loop finished.")
-
-    def start_mouse_listener(self):
-        try: threading.Thread(target=pynput.mouse.Listener(on_move=on_move, on_click=on_click).start, daemon=True, name="MouseListener").start()
-        except Exception as e: add_log_message(self,f"Mouse listener error: {e}")
-    def start_keyboard_listener(self):
-        try: threading.Thread(target=pynput.keyboard.Listener(on_press=on_key_press).start,daemon=True,name="KeyboardListener").start()
-        except Exception as e: add_log_message(self,f"Keyboard listener error: {e}")
-    def start_tracking_loop(self):
-        try: self.tracking_thread=threading.Thread(target=self.tracking_loop,daemon=True,name="TrackingLoop");self.tracking_thread.start()
-        except Exception as e: add_log_message(self,f"Tracking loop error: {e}")
+        try: new_timeout=float(self.inactivity_timeout_entry.get())
+        except Exception as e: add_log_message(self,f"Timeout error: {e}"); ok=False
+        else: ok=self._engine_command(self.engine.apply_inactivity_timeout_setting,new_timeout,error_prefix="Timeout error")
+        if not ok:
+            self.inactivity_timeout_entry.delete(0,"end");self.inactivity_timeout_entry.insert(0,str(int(self._snapshot["inactivity_timeout"])))
+
     def on_closing(self):
         add_log_message(self,"Shutdown initiated...")
-        with state_lock:app_state["running"]=False
-        if hasattr(self,'tracking_thread')and self.tracking_thread.is_alive():
-            add_log_message(self,"Waiting for tracking loop...");self.tracking_thread.join(timeout=0.5)
-        add_log_message(self,"Final save...");save_daily_data();add_log_message(self,"Exiting.");print("App closed.")
+        self._closing=True
+        if self._owns_engine:self.engine.stop()
+        else:self.engine.close()
+        add_log_message(self,"Exiting.");print("App closed.")
         self.destroy()
 
-def log_focus_session(effectiveness: float, duration_minutes: int, timestamp: str):
-    try:
-        with open("focus_session_log.txt", "a", encoding="utf-8") as f:
-            status = "EFFECTIVE" if effectiveness >= 66.6 else "NEEDS IMPROVEMENT"
-            f.write(f"[{timestamp}] {duration_minutes}min Focus Session - {effectiveness:.1f}% ({status})\n")
-    except Exception as e:
-        print(f"Error writing to focus log: {e}")
+def main(argv=None):
+    if argv is None and _early_args is not None:args=_early_args # already parsed and started above
+    else:
+        args=parse_args(argv);enter_app_dir()
+        if args.no_metrics:activity_metrics.set_enabled(False)
+    if args.connect:
+        engine=tracker_engine.EngineClient(args.connect)
+        try:engine.snapshot()
+        except Exception as e:print(f"Cannot reach tracker engine at {args.connect}: {e}");return 1
+    elif _early_engine is not None and args is _early_args:engine=_early_engine
+    else:engine=tracker_engine.TrackerEngine();engine.start()
+    if args.connect:metrics=activity_metrics.MetricsServer(GUI_METRICS_PORT if args.metrics_port is None else args.metrics_port,GUI_METRICS_DUMP_FILE)
+    else:metrics=activity_metrics.MetricsServer(tracker_engine.METRICS_PORT if args.metrics_port is None else args.metrics_port,tracker_engine.METRICS_DUMP_FILE)
+    metrics.start()
+    app=DominantBorderHubApp(engine,compact=args.compact)
+    try:app.mainloop()
+    finally:metrics.stop()
+    return 0
 
 if __name__=="__main__":
-    try:
-        if hasattr(sys,'_MEIPASS'):os.chdir(sys._MEIPASS)
-        elif"__file__"in locals()or"__file__"in globals():os.chdir(os.path.dirname(os.path.abspath(__file__)))
-    except Exception as e:print(f"CWD Error: {e}")
-    app=DominantBorderHubApp()
-    app.mainloop()
+    sys.exit(main())
@@ -0,0 +1,91 @@
+# Times the vectorised history reports against the dict-of-dicts loops they replace, on synthetic multi-year data.
+# Run from the repo root:  python benchmarks/bench_analytics.py --years 10
+import argparse
+import datetime
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import activity_analytics as analytics
+
+
+def synthetic_history(years: int, seed: int = 1) -> dict:
+    rng = random.Random(seed); start = datetime.date.today() - datetime.timedelta(days=365 * years)
+    history = {}
+    for i in range(365 * years):
+        day = start + datetime.timedelta(days=i)
+        if day.weekday() >= 5 and rng.random() < 0.7: continue
+        active = rng.uniform(1, 8) * 3600
+        history[day.isoformat()] = {
+            "total_active_seconds_today": round(active, 2), "total_idle_seconds_today": round(rng.uniform(0.5, 4) * 3600, 2),
+            "max_idle_seconds_today": round(rng.uniform(60, 5400), 2), "max_active_seconds_today": round(rng.uniform(300, 7200), 2),
+            "mouse_total_distance_today": round(active * rng.uniform(20, 90), 2),
+            "keystrokes_today": int(active * rng.uniform(0.5, 3)), "mouse_clicks_today": int(active * rng.uniform(0.05, 0.4)),
+            "last_activity_duration": 0.0, "last_inactivity_duration": 0.0,
+        }
+    return history
+
+# --- The reports as plain Python loops over the parsed JSON ---
+def legacy_reports(history: dict):
+    weekly, monthly, weekday_sum, weekday_n, daily_eff, actives = {}, {}, [0.0] * 7, [0] * 7, [], []
+    for day_s, rec in sorted(history.items()):
+        day = datetime.date.fromisoformat(day_s)
+        a = rec["total_active_seconds_today"]; i = rec["total_idle_seconds_today"]
+        for bucket, key in ((weekly, day - datetime.timedelta(days=day.weekday())), (monthly, day_s[:7])):
+            b = bucket.setdefault(key, {"active": 0.0, "idle": 0.0, "keystrokes": 0, "clicks": 0, "distance": 0.0})
+            b["active"] += a; b["idle"] += i; b["keystrokes"] += rec["keystrokes_today"]
+            b["clicks"] += rec["mouse_clicks_today"]; b["distance"] += rec["mouse_total_distance_today"]
+        daily_eff.append(a / (a + i) * 100 if a + i > 0 else 0)
+        weekday_sum[day.weekday()] += a; weekday_n[day.weekday()] += 1; actives.append(a)
+    for b in list(weekly.values()) + list(monthly.values()):
+        b["effectiveness"] = b["active"] / (b["active"] + b["idle"]) * 100 if b["active"] + b["idle"] > 0 else 0
+    actives.sort(); p = {q: actives[min(len(actives) - 1, int(q / 100 * len(actives)))] for q in (50, 90, 99)}
+    return weekly, monthly, [s / max(n, 1) for s, n in zip(weekday_sum, weekday_n)], daily_eff, p
+
+def vectorised_reports(history: dict):
+    cols = analytics.DayColumns.from_records(history.items())
+    return (cols, analytics.rollup(cols, "week"), analytics.rollup(cols, "month"),
+            analytics.weekday_profile(cols, "active"), analytics.effectiveness_trend(cols), analytics.percentiles(cols, "active", (50, 90, 99)))
+
+def timed(fn, repeats: int):
+    samples = []
+    for _ in range(repeats):
+        t0 = time.perf_counter(); result = fn(); samples.append((time.perf_counter() - t0) * 1000)
+    return result, samples
+
+def report(label: str, samples):
+    print(f"{label:<28} median {statistics.median(samples):8.2f} ms   min {min(samples):8.2f} ms")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--repeats", type=int, default=15)
+    args = parser.parse_args()
+
+    text = json.dumps(synthetic_history(args.years), indent=4)
+    history, parse = timed(lambda: json.loads(text), args.repeats)
+    print(f"{len(history)} days over {args.years} years, snapshot {len(text) / 1e6:.1f} MB")
+    report("json parse (shared)", parse)
+    (weekly, monthly, wd_legacy, eff_legacy, _), legacy = timed(lambda: legacy_reports(history), args.repeats)
+    report("dict-of-dicts loops", legacy)
+    cols = analytics.DayColumns.from_records(history.items())
+    _, load = timed(lambda: analytics.DayColumns.from_records(history.items()), args.repeats)
+    report("columnar load", load)
+    (_, (wk_keys, wk), (mo_keys, mo), wd, (_, eff, _), _), vec = timed(lambda: vectorised_reports(history), args.repeats)
+    _, compute = timed(lambda: (analytics.rollup(cols, "week"), analytics.rollup(cols, "month"), analytics.weekday_profile(cols, "active"),
+                                analytics.effectiveness_trend(cols), analytics.percentiles(cols, "active", (50, 90, 99))), args.repeats)
+    report("vectorised (load+reports)", vec)
+    report("vectorised reports only", compute)
+
+    # Same answers both ways.
+    assert len(wk_keys) == len(weekly) and len(mo_keys) == len(monthly)
+    assert abs(sum(b["active"] for b in weekly.values()) - wk["active"].sum()) < 1e-3 * len(history)
+    assert all(abs(a - b) < 1e-6 for a, b in zip(wd_legacy, wd)) and all(abs(a - b) < 1e-9 for a, b in zip(eff_legacy, eff))
+    print(f"speed-up (load+reports vs loops): {statistics.median(legacy) / statistics.median(vec):.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# Compares the old lock-per-event input callbacks with the lock-free accumulators.
+# Run from the repo root:  python benchmarks/bench_input_ingestion.py --events 200000
+import argparse
+import math
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tracker_engine as tracker
+
+
+# --- Previous implementation, kept verbatim so the comparison stays honest ---
+_legacy_state = {"mouse_last_pos_for_distance": None, "mouse_total_distance_today": 0.0, "keystrokes_today": 0,
+                 "mouse_clicks_today": 0, "last_mouse_position": None, "last_movement_time": 0.0,
+                 "last_keyboard_activity_time": 0.0, "last_activity_time": 0.0}
+_legacy_lock = threading.Lock()
+
+def legacy_on_move(x, y):
+    with _legacy_lock:
+        now=time.time();pos=(x,y)
+        if _legacy_state["mouse_last_pos_for_distance"] is not None:
+            px,py=_legacy_state["mouse_last_pos_for_distance"];_legacy_state["mouse_total_distance_today"]+=math.sqrt((x-px)**2+(y-py)**2)
+        _legacy_state["mouse_last_pos_for_distance"]=pos
+        _legacy_state.update({"last_mouse_position":pos,"last_movement_time":now,"last_activity_time":now})
+
+def legacy_on_key_press(key):
+    with _legacy_lock:
+        _legacy_state["keystrokes_today"]+=1
+        _legacy_state.update({"last_keyboard_activity_time":time.time(),"last_activity_time":time.time()})
+
+def legacy_on_click(x, y, button, pressed):
+    if pressed:
+        with _legacy_lock:
+            _legacy_state["mouse_clicks_today"] += 1
+            _legacy_state.update({"last_activity_time": time.time()})
+
+
+def _contender(lock, state, stop, hz):
+    # Stands in for tracking_loop/update_gui_display copying the state under the lock.
+    period = 1.0 / hz
+    while not stop.is_set():
+        with lock: state.copy()
+        time.sleep(period)
+
+def _percentile(sorted_ns, q):
+    return sorted_ns[min(len(sorted_ns) - 1, int(q * len(sorted_ns)))]
+
+def run(label, move, key, click, lock, state, events, contend_hz, drain=None):
+    stop = threading.Event()
+    contender = threading.Thread(target=_contender, args=(lock, state, stop, contend_hz), daemon=True)
+    contender.start()
+    samples = []; clock = time.perf_counter_ns
+    start = time.perf_counter()
+    for i in range(events):
+        t0 = clock()
+        r = i % 10
+        if r < 8: move(i % 1920, (i * 7) % 1080)
+        elif r == 8: key(None)
+        else: click(0, 0, None, True)
+        samples.append(clock() - t0)
+    elapsed = time.perf_counter() - start
+    stop.set(); contender.join()
+    if drain: drain()
+    samples.sort()
+    print(f"{label:<12} {events / elapsed:>14,.0f} ev/s   p50 {_percentile(samples, 0.50):>6} ns   "
+          f"p99 {_percentile(samples, 0.99):>7} ns   mean {statistics.fmean(samples):>8.0f} ns")
+
+def main():
+    parser = argparse.ArgumentParser(description="Input callback latency, old vs new")
+    parser.add_argument("--events", type=int, default=200_000)
+    parser.add_argument("--contend-hz", type=float, default=20.0, help="state copies per second from a competing thread")
+    args = parser.parse_args()
+
+    run("before", legacy_on_move, legacy_on_key_press, legacy_on_click, _legacy_lock, _legacy_state,
+        args.events, args.contend_hz)
+
+    # During a burst the tracker is active, so the callbacks have no reason to wake tracking_loop.
+    tracker.app_state["prev_overall_active_state"] = True
+    def drain():
+        with tracker.state_lock: tracker.drain_input_locked()
+    run("after", tracker.on_move, tracker.on_key_press, tracker.on_click, tracker.state_lock, tracker.app_state,
+        args.events, args.contend_hz, drain)
+
+    legacy = (_legacy_state["mouse_total_distance_today"], _legacy_state["keystrokes_today"], _legacy_state["mouse_clicks_today"])
+    new = (tracker.app_state["mouse_total_distance_today"], tracker.app_state["keystrokes_today"], tracker.app_state["mouse_clicks_today"])
+    print(f"totals before: dist={legacy[0]:.3f} keys={legacy[1]} clicks={legacy[2]}")
+    print(f"totals after:  dist={new[0]:.3f} keys={new[1]} clicks={new[2]}")
+
+if __name__ == "__main__":
+    main()
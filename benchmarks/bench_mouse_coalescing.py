@@ -0,0 +1,94 @@
+# Replays a mouse motion trace through on_move and on_move_coalesced and reports the listener thread's CPU time.
+# Run from the repo root:
+#   python benchmarks/bench_mouse_coalescing.py                      # synthetic 1000 Hz trace
+#   python benchmarks/bench_mouse_coalescing.py --record trace.csv   # record your own mouse for --seconds (needs pynput)
+#   python benchmarks/bench_mouse_coalescing.py --trace trace.csv
+import argparse
+import math
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tracker_engine as tracker
+
+
+def synthetic_trace(seconds: float, rate: int, seed: int = 7):
+    # Strokes between random targets with hand jitter, separated by short pauses, sampled at `rate` Hz.
+    rng = random.Random(seed); t = 0.0; x, y = 960.0, 540.0; trace = []
+    while t < seconds:
+        tx, ty = rng.uniform(0, 2560), rng.uniform(0, 1440); steps = int(rng.uniform(0.15, 0.8) * rate)
+        for i in range(1, steps + 1):
+            f = 0.5 - 0.5 * math.cos(math.pi * i / steps)
+            trace.append((t, int(x + (tx - x) * f + rng.gauss(0, 0.6)), int(y + (ty - y) * f + rng.gauss(0, 0.6))))
+            t += 1.0 / rate
+        x, y = tx, ty; t += rng.uniform(0.05, 0.6)
+    return trace
+
+def load_trace(path: str):
+    with open(path, "r", encoding="utf-8") as f:
+        return [(float(t), int(float(x)), int(float(y))) for t, x, y in (line.strip().split(",") for line in f if line.strip())]
+
+def record_trace(path: str, seconds: float):
+    import pynput.mouse
+    t0 = time.perf_counter(); events = []
+    listener = pynput.mouse.Listener(on_move=lambda x, y: events.append((time.perf_counter() - t0, x, y)))
+    listener.start(); print(f"Recording mouse motion for {seconds:.0f}s..."); time.sleep(seconds); listener.stop()
+    with open(path, "w", encoding="utf-8") as f: f.writelines(f"{t:.6f},{x},{y}\n" for t, x, y in events)
+    print(f"{len(events)} events ({len(events) / seconds:.0f}/s) written to {path}")
+
+class _TraceClock:
+    # Stands in for the time module inside tracker_engine so the handlers see the trace's own timestamps.
+    now = 0.0
+    @classmethod
+    def time(cls): return cls.now
+
+def replay(handler, trace):
+    tracker._mouse_input = tracker.InputAccumulator()
+    tracker.app_state["prev_overall_active_state"] = True # as while the user is active: no wakeups
+    result = {}
+    def run():
+        clock = _TraceClock; cpu0 = time.thread_time()
+        for t, x, y in trace: clock.now = t; handler(x, y)
+        result["cpu"] = time.thread_time() - cpu0
+    real_time = tracker.time; tracker.time = _TraceClock
+    try:
+        th = threading.Thread(target=run, name="MouseListener"); th.start(); th.join()
+    finally:
+        tracker.time = real_time
+    acc = tracker._mouse_input
+    pending = sum(map(math.dist, acc.path, acc.path[1:])) + (math.dist(acc.last_pos, acc.path[0]) if acc.path and acc.last_pos else 0.0)
+    result.update(distance=acc.distance, pending=pending, last_activity=acc.last_activity_time, processed=acc.events)
+    return result
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trace"); parser.add_argument("--record"); parser.add_argument("--seconds", type=float, default=60.0)
+    parser.add_argument("--rate", type=int, default=1000, help="synthetic trace rate in Hz")
+    parser.add_argument("--windows", default="0.02,0.05,0.1")
+    args = parser.parse_args()
+    if args.record: record_trace(args.record, args.seconds); return
+    trace = load_trace(args.trace) if args.trace else synthetic_trace(args.seconds, args.rate)
+    duration = trace[-1][0] - trace[0][0]
+    print(f"trace: {len(trace)} events over {duration:.1f}s ({len(trace) / max(duration, 1e-9):.0f} ev/s)")
+
+    replay(tracker.on_move, trace[:5000]); replay(tracker.on_move_coalesced, trace[:5000]) # warm-up
+    exact = replay(tracker.on_move, trace)
+    def line(label, r):
+        err = (r["distance"] - exact["distance"]) / exact["distance"] * 100 if exact["distance"] else 0.0
+        print(f"{label:<22} cpu {r['cpu'] * 1000:8.1f} ms  {r['cpu'] / len(trace) * 1e6:6.2f} us/ev  "
+              f"listener {r['cpu'] / duration * 100:5.2f}% of a core  distance err {err:+.4f}% "
+              f"(tail pending {r['pending']:.0f}px)  last_activity lag {(trace[-1][0] - r['last_activity']) * 1000:.0f} ms")
+    line("exact (on_move)", exact)
+    saved = tracker.MOUSE_COALESCE_WINDOW
+    try:
+        for w in (float(v) for v in args.windows.split(",")):
+            tracker.MOUSE_COALESCE_WINDOW = w
+            line(f"coalesced {w * 1000:.0f} ms", replay(tracker.on_move_coalesced, trace))
+    finally:
+        tracker.MOUSE_COALESCE_WINDOW = saved
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# Cold-start budget: time from spawning a fresh interpreter until the engine (and its input listeners) runs, for
+# histories from 1 day to 10 years, plus the GUI's first frame when customtkinter and a display are available.
+# Run from the repo root:  python benchmarks/bench_startup.py        (exit status 1 if a budget is missed)
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT); sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import activity_storage
+from suite import HISTORY_SIZES, _write_history
+
+# Budgets, measured from just before the child process is spawned (so interpreter startup is included).
+ENGINE_READY_BUDGET = 0.25 # engine.start() returned: history loaded, listeners and tracking loop started
+GUI_FIRST_FRAME_BUDGET = 1.5 # window drawn with live numbers; the text panels follow right after
+
+# The child reports wall-clock times; the parent compares them with its own time.time() taken before spawning.
+_ENGINE_CHILD = """
+import sys, time, json; sys.path.insert(0, %(root)r)
+import tracker_engine
+t_import = time.time()
+engine = tracker_engine.TrackerEngine(); engine.start(); t_ready = time.time()
+print(json.dumps({"import": t_import, "ready": t_ready}), flush=True)
+engine.stop()
+"""
+
+_GUI_CHILD = """
+import sys, time, json; sys.path.insert(0, %(root)r)
+import tracker_engine
+engine = tracker_engine.TrackerEngine(); engine.start(); t_ready = time.time()
+import activitytracker3000 as gui
+t_import = time.time()
+app = gui.DominantBorderHubApp(engine); app.update(); t_frame = time.time()
+app._create_deferred_panels(); app.update(); t_panels = time.time()
+print(json.dumps({"ready": t_ready, "gui_import": t_import, "first_frame": t_frame, "panels": t_panels}), flush=True)
+app._closing = True; app.destroy(); engine.stop()
+"""
+
+def run_child(code: str, workdir: str) -> dict:
+    t0 = time.time()
+    out = subprocess.run([sys.executable, "-c", code % {"root": ROOT}], cwd=workdir, capture_output=True, text=True, timeout=120)
+    for line in out.stdout.splitlines():
+        if line.startswith("{"): return {k: v - t0 for k, v in json.loads(line).items()}
+    raise RuntimeError(out.stderr.strip().splitlines()[-1] if out.stderr.strip() else "child printed no timings")
+
+def prepare(workdir: str, days: int, journal: bool):
+    # journal=True is every start after the first; False is the first start on a pre-journal history file.
+    data_file = os.path.join(workdir, "mouse_activity_log.json")
+    _write_history(data_file, days)
+    if journal: activity_storage.JournalStore(data_file).compact()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--max-days", type=int, default=0, help="skip history sizes above this many days")
+    args = parser.parse_args()
+    failed = False; root = tempfile.mkdtemp(prefix="at3k-startup-")
+    try:
+        print(f"{'engine cold start':<42}{'import ms':>11}{'ready ms':>11}   budget {ENGINE_READY_BUDGET * 1000:.0f} ms")
+        for label, days in HISTORY_SIZES.items():
+            if args.max_days and days > args.max_days: continue
+            for journal in (True, False):
+                samples = []
+                for i in range(args.repeats):
+                    workdir = os.path.join(root, f"{label}-{journal}-{i}"); os.makedirs(workdir); prepare(workdir, days, journal)
+                    samples.append(run_child(_ENGINE_CHILD, workdir))
+                imp = statistics.median(s["import"] for s in samples); ready = statistics.median(s["ready"] for s in samples)
+                # The first start on a pre-journal file folds the history once; that one is reported, not budgeted.
+                ok = ready <= ENGINE_READY_BUDGET or not journal; failed |= not ok
+                name = f"{label} history" + ("" if journal else " (first run, one-off fold)")
+                print(f"{name:<42}{imp * 1000:>11.1f}{ready * 1000:>11.1f}   {'ok' if ok else 'OVER BUDGET'}")
+
+        workdir = os.path.join(root, "gui"); os.makedirs(workdir); prepare(workdir, 365, True)
+        try: gui = [run_child(_GUI_CHILD, workdir) for _ in range(args.repeats)]
+        except Exception as e: print(f"GUI first frame skipped (needs customtkinter and a display): {e}")
+        else:
+            frame = statistics.median(g["first_frame"] for g in gui); ok = frame <= GUI_FIRST_FRAME_BUDGET; failed |= not ok
+            print(f"GUI: engine ready {statistics.median(g['ready'] for g in gui) * 1000:.0f} ms, toolkit imported "
+                  f"{statistics.median(g['gui_import'] for g in gui) * 1000:.0f} ms, first frame {frame * 1000:.0f} ms "
+                  f"(budget {GUI_FIRST_FRAME_BUDGET * 1000:.0f} ms, {'ok' if ok else 'OVER BUDGET'}), "
+                  f"text panels {statistics.median(g['panels'] for g in gui) * 1000:.0f} ms")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
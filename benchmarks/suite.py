@@ -0,0 +1,193 @@
+# Load-test suite for the tracking hot paths. Drives the real functions with synthetic input; no display or pynput
+# needed (the event log case runs only when a Tk display is available).
+# Run from the repo root:
+#   python benchmarks/suite.py                                   # all cases, saved under benchmarks/results/
+#   python benchmarks/suite.py --only callbacks --rate 1000      # paced at 1000 events/s instead of flat out
+#   python benchmarks/suite.py --compare benchmarks/results/<earlier>.json
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import activity_storage
+import tracker_engine as tracker
+
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+HISTORY_SIZES = {"1d": 1, "30d": 30, "1y": 365, "10y": 3650}
+
+
+def measure(fn, n: int, rate: float = 0.0, alloc_calls: int = 5000):
+    # Per-call latency with perf_counter_ns, optionally paced to `rate` calls/s, then a separate tracemalloc pass
+    # (tracing slows everything down, so it never overlaps the timed pass).
+    lat = [0] * n; interval = 1e9 / rate if rate else 0; clock = time.perf_counter_ns
+    start = clock()
+    for i in range(n):
+        if interval:
+            due = start + i * interval
+            while clock() < due: pass
+        t0 = clock(); fn(); lat[i] = clock() - t0
+    busy = sum(lat); lat.sort()
+    calls = min(n, alloc_calls)
+    tracemalloc.start(); base, _ = tracemalloc.get_traced_memory(); tracemalloc.reset_peak()
+    for _ in range(calls): fn()
+    current, peak = tracemalloc.get_traced_memory(); tracemalloc.stop()
+    return {
+        "calls": n, "offered_rate": rate or None, "ops_per_s": n / (busy / 1e9) if busy else float("inf"),
+        "p50_us": lat[n // 2] / 1000, "p99_us": lat[min(n - 1, int(n * 0.99))] / 1000, "max_us": lat[-1] / 1000,
+        "alloc_peak_kib": (peak - base) / 1024, "alloc_retained_b_per_op": (current - base) / calls,
+    }
+
+def isolate(workdir: str):
+    # Point every file the engine writes into a scratch directory and reset module state to a fresh day.
+    tracker.DATA_FILE = os.path.join(workdir, "history.json"); tracker.FOCUS_STORE_FILE = os.path.join(workdir, "focus.afs")
+    tracker.HISTORY_DB_FILE = os.path.join(workdir, "history.db"); tracker.TIMELINE_DIR = os.path.join(workdir, "timeline")
+    tracker.history_store = activity_storage.JournalStore(tracker.DATA_FILE)
+    if tracker._history_db is not None: tracker._history_db.close()
+    tracker._history_db = None; tracker._history_db_failed = False; tracker._timeline = None
+    if tracker._focus_store is not None: tracker._focus_store.close()
+    tracker._focus_store = None
+    tracker._mouse_input = tracker.InputAccumulator(); tracker._keyboard_input = tracker.InputAccumulator()
+    tracker._active_engine = None
+    tracker.load_daily_data()
+
+# --- Cases ---
+def case_callbacks(args, workdir):
+    isolate(workdir); rng = random.Random(1); results = {}
+    # Active user: the callbacks never need to wake the tracking loop, as during real typing and pointing.
+    tracker.app_state["prev_overall_active_state"] = True
+    points = [(rng.randrange(2560), rng.randrange(1440)) for _ in range(4096)]
+    it = iter(range(1 << 62))
+    results["on_move"] = measure(lambda: tracker.on_move(*points[next(it) & 4095]), args.events, args.rate)
+    results["on_move_coalesced"] = measure(lambda: tracker.on_move_coalesced(*points[next(it) & 4095]), args.events, args.rate)
+    results["on_click"] = measure(lambda: tracker.on_click(10, 10, "left", True), args.events, args.rate)
+    results["on_key_press"] = measure(lambda: tracker.on_key_press("a"), args.events, args.rate)
+    return results
+
+def case_tracking_pass(args, workdir):
+    isolate(workdir); tracker.SAVE_INTERVAL = 1e9 # saving is measured on its own below
+    engine = tracker.TrackerEngine(); tracker._active_engine = engine; rng = random.Random(2); results = {}
+    def active_pass():
+        tracker.on_key_press("a"); engine.tracking_pass()
+    def mixed_pass():
+        # Alternates input and silence longer than the timeout, so transitions and their log lines are included.
+        if rng.random() < 0.5: tracker.on_key_press("a")
+        else:
+            stale = time.time() - tracker._current_inactivity_timeout - 1; tracker._keyboard_input.last_activity_time = stale
+            with tracker.state_lock: tracker.app_state["last_activity_time"] = stale
+        engine.tracking_pass()
+    results["tracking_pass_active"] = measure(active_pass, args.passes)
+    results["tracking_pass_transitions"] = measure(mixed_pass, args.passes)
+    results["tracking_pass_transitions"]["events_logged"] = engine.event_seq
+    return results
+
+def _write_history(path: str, days: int):
+    rng = random.Random(days); today = datetime.date.today(); data = {}
+    for i in range(days, 0, -1):
+        data[(today - datetime.timedelta(days=i)).isoformat()] = {
+            f: (rng.randrange(50000) if f in activity_storage.INT_DAY_FIELDS else round(rng.uniform(0, 30000), 2))
+            for f in activity_storage.DAY_RECORD_FIELDS}
+    activity_storage.atomic_write_text(path, json.dumps(data, indent=4))
+
+def case_persistence(args, workdir):
+    results = {}
+    for label, days in HISTORY_SIZES.items():
+        if args.max_days and days > args.max_days: continue
+        sub = os.path.join(workdir, f"persist-{label}"); os.makedirs(sub)
+        isolate(sub); _write_history(tracker.DATA_FILE, days)
+        # Drop the journal so the first load and the compactions work against the full snapshot.
+        if os.path.exists(tracker.history_store.journal_file): os.unlink(tracker.history_store.journal_file)
+        tracker.history_store = activity_storage.JournalStore(tracker.DATA_FILE)
+        # Enough checkpoints to start background compactions; the p99 and max columns show whether saves wait on them.
+        results[f"save_daily_data_{label}"] = measure(tracker.save_daily_data, args.saves, alloc_calls=50)
+        tracker.history_store.join_compaction()
+        results[f"load_daily_data_{label}"] = measure(tracker.load_daily_data, args.loads, alloc_calls=50)
+    return results
+
+def case_event_log(args, workdir):
+    try:
+        import activitytracker3000 as gui
+        isolate(workdir); app = gui.DominantBorderHubApp(tracker.TrackerEngine())
+    except Exception as e:
+        return {"skipped": f"no Tk display or customtkinter ({e.__class__.__name__}: {e})"}
+    try:
+        app.withdraw(); app._create_deferred_panels() # never exposed while withdrawn
+        for i in range(gui.MAX_LOG_LINES): gui.add_log_message(app, f"prefill {i}")
+        app._flush_log_messages(); app.update()
+        def burst():
+            for i in range(10): gui.add_log_message(app, f"Active after 00:00:{i:02d} idle.")
+            app._flush_log_messages()
+        return {"add_log_message_x10_full_console": measure(burst, args.log_bursts, alloc_calls=200)}
+    finally:
+        app._closing = True; app.destroy()
+
+CASES = {"callbacks": case_callbacks, "tracking": case_tracking_pass, "persistence": case_persistence, "event_log": case_event_log}
+
+# --- Results ---
+def git_revision() -> str:
+    try: return subprocess.run(["git", "-C", ROOT, "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except Exception: return "unknown"
+
+def print_results(results, baseline=None):
+    print(f"{'case':<40}{'ops/s':>12}{'p50 us':>10}{'p99 us':>10}{'max us':>11}{'peak KiB':>10}{'B/op kept':>11}")
+    for name, r in results.items():
+        if "skipped" in r: print(f"{name:<40}skipped: {r['skipped']}"); continue
+        line = (f"{name:<40}{r['ops_per_s']:>12,.0f}{r['p50_us']:>10.2f}{r['p99_us']:>10.2f}{r['max_us']:>11.1f}"
+                f"{r['alloc_peak_kib']:>10.1f}{r['alloc_retained_b_per_op']:>11.1f}")
+        old = (baseline or {}).get(name)
+        if old and "ops_per_s" in old:
+            line += f"   ops/s {(r['ops_per_s'] / old['ops_per_s'] - 1) * 100:+6.1f}%  p99 {(r['p99_us'] / old['p99_us'] - 1) * 100:+6.1f}%"
+        print(line)
+
+def main():
+    parser = argparse.ArgumentParser(description="activitytracker3000 hot-path benchmarks")
+    parser.add_argument("--only", action="append", choices=sorted(CASES), help="run only these cases (repeatable)")
+    parser.add_argument("--rate", type=float, default=0.0, help="offered input rate in events/s for the callbacks (0 = flat out)")
+    parser.add_argument("--events", type=int, default=200000)
+    parser.add_argument("--passes", type=int, default=20000)
+    parser.add_argument("--saves", type=int, default=2 * activity_storage.JOURNAL_COMPACT_RECORDS)
+    parser.add_argument("--loads", type=int, default=200)
+    parser.add_argument("--log-bursts", type=int, default=500)
+    parser.add_argument("--max-days", type=int, default=0, help="skip history sizes above this many days")
+    parser.add_argument("--compare", help="earlier results file to diff against")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<time>-<rev>.json)")
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="at3k-bench-"); results = {}
+    saved_config = {k: getattr(tracker, k) for k in ("DATA_FILE", "FOCUS_STORE_FILE", "HISTORY_DB_FILE", "TIMELINE_DIR", "SAVE_INTERVAL")}
+    try:
+        for name in args.only or list(CASES):
+            sub = os.path.join(workdir, name); os.makedirs(sub)
+            print(f"running {name}...", flush=True)
+            case = CASES[name](args, sub)
+            results.update(case if "skipped" not in case else {name: case})
+    finally:
+        for k, v in saved_config.items(): setattr(tracker, k, v)
+        if tracker._history_db is not None: tracker._history_db.close(); tracker._history_db = None
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f: baseline = json.load(f)["results"]
+    print_results(results, baseline)
+    if not args.no_save:
+        rev = git_revision()
+        path = args.output or os.path.join(RESULTS_DIR, f"{datetime.datetime.now():%Y%m%d-%H%M%S}-{rev}.json")
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        meta = {"revision": rev, "time": datetime.datetime.now().isoformat(timespec="seconds"), "python": platform.python_version(),
+                "platform": platform.platform(), "args": {k: v for k, v in vars(args).items() if k not in ("compare", "output")}}
+        with open(path, "w", encoding="utf-8") as f: json.dump({"meta": meta, "results": results}, f, indent=2)
+        print(f"saved {path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+import argparse
+import bisect
+import datetime
+import os
+import struct
+import sys
+import threading
+from array import array
+from typing import Optional, Dict, Any, List, Iterator
+
+# --- Configuration ---
+DEFAULT_FOCUS_STORE_FILE = "focus_sessions.afs"
+WRITE_BEHIND_SESSIONS = 8 # sessions held in memory before they are written without waiting for the next save
+# --- End Configuration ---
+
+# Every completed (or cut-short) focus period as one fixed 48-byte little-endian record after a 16-byte header:
+#   start, end        f64  time.time() when the period began and ended
+#   active_seconds    f64  active time inside the period (what effectiveness is computed from)
+#   effectiveness     f32  percent of the planned duration that was active
+#   paused_seconds    f32  time spent paused or on a timed break during the period
+#   planned_seconds   u32  the focus duration the period was started with
+#   interruptions     u16  pauses and timed breaks taken during the period
+#   flags             u16  FLAG_COMPLETED when the period ran its full length
+#   (8 bytes reserved)
+# Records are only ever appended, in end-time order, so the n-th newest session is at a computable offset and a
+# page of the history is one read however long the file gets.
+FLAG_COMPLETED = 1
+_RECORD = struct.Struct("<dddffIHH8x")
+RECORD_SIZE = _RECORD.size
+_FILE_HEADER = b"AT3KFOC1" + bytes(8)
+
+def _day_of(t: float) -> str:
+    return datetime.date.fromtimestamp(t).isoformat()
+
+def _unpack(index: int, data: bytes) -> Dict[str, Any]:
+    start, end, active, eff, paused, planned, interruptions, flags = _RECORD.unpack(data)
+    return {"index": index, "start": start, "end": end, "day": _day_of(end), "planned_seconds": planned,
+            "active_seconds": active, "effectiveness": eff, "paused_seconds": paused,
+            "interruptions": interruptions, "completed": bool(flags & FLAG_COMPLETED)}
+
+class FocusStore:
+    # The append handle stays open for the life of the store. append() only packs the record into memory; the
+    # pending records are written in one go by flush() (the engine calls it on every periodic save and on exit),
+    # or once WRITE_BEHIND_SESSIONS are waiting. Reads see pending records too. The in-memory index is the end time
+    # of every record plus the record numbers of each day, built with one pass over the file when it is opened.
+    # writable=False opens an existing store for reading only (exports, the CLI), next to a running tracker.
+    def __init__(self, path: str = DEFAULT_FOCUS_STORE_FILE, writable: bool = True):
+        self.path = path; self._lock = threading.Lock(); self.writable = writable
+        self._ends = array("d"); self._ends_sorted = True; self._by_day: Dict[str, array] = {}; self._pending: List[bytes] = []
+        self._file = open(path, "a+b" if writable else "rb")
+        self._file.seek(0); data = self._file.read()
+        if not data and writable: self._file.write(_FILE_HEADER); self._file.flush()
+        elif data and data[:8] != _FILE_HEADER[:8]: self._file.close(); raise ValueError(f"{path} is not a focus session store")
+        body = memoryview(data)[len(_FILE_HEADER):]
+        whole = len(body) - len(body) % RECORD_SIZE
+        if whole != len(body) and writable:
+            # A torn last record from a crash: cut it off so the next append lands on a record boundary.
+            self._file.truncate(len(_FILE_HEADER) + whole)
+        self._flushed = whole // RECORD_SIZE
+        for i, rec in enumerate(_RECORD.iter_unpack(body[:whole])): self._index(i, rec[1])
+
+    def _index(self, i: int, end: float):
+        if self._ends and end < self._ends[-1]: self._ends_sorted = False # the clock was set back
+        self._ends.append(end)
+        day = _day_of(end); rows = self._by_day.get(day)
+        if rows is None: rows = self._by_day[day] = array("I")
+        rows.append(i)
+
+    def __len__(self) -> int:
+        return len(self._ends)
+
+    def iter_range(self, start: Optional[float] = None, end: Optional[float] = None, chunk: int = 1024) -> Iterator[Dict[str, Any]]:
+        # Sessions that ended in [start, end), in file order, read `chunk` records at a time. While end times only
+        # grow, the end-time index finds the first and last record with two bisections. Once the clock has been set
+        # back they are out of order, so the index is scanned for the first and last match instead and the records
+        # in between are filtered. The lock is only held while the index is searched and while a chunk is read.
+        lo_end = float("-inf") if start is None else start; hi_end = float("inf") if end is None else end
+        with self._lock:
+            ends = self._ends; in_order = self._ends_sorted
+            if in_order: lo = bisect.bisect_left(ends, lo_end); hi = bisect.bisect_left(ends, hi_end)
+            else:
+                hits = [i for i, e in enumerate(ends) if lo_end <= e < hi_end]
+                lo, hi = (hits[0], hits[-1] + 1) if hits else (0, 0)
+        for i in range(lo, hi, chunk):
+            with self._lock:
+                if self._file is None: return
+                rows = self._read_locked(i, min(hi, i + chunk))
+            yield from rows if in_order else (r for r in rows if lo_end <= r["end"] < hi_end)
+
+    def append(self, start: float, end: float, planned_seconds: float, active_seconds: float, effectiveness: float,
+               paused_seconds: float = 0.0, interruptions: int = 0, completed: bool = True) -> int:
+        rec = _RECORD.pack(start, end, active_seconds, effectiveness, paused_seconds, max(0, int(round(planned_seconds))),
+                           min(65535, max(0, int(interruptions))), FLAG_COMPLETED if completed else 0)
+        with self._lock:
+            i = len(self._ends); self._pending.append(rec); self._index(i, end)
+            if len(self._pending) >= WRITE_BEHIND_SESSIONS: self._flush_locked()
+        return i
+
+    def flush(self):
+        with self._lock: self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._pending or self._file is None: return
+        self._file.write(b"".join(self._pending)); self._file.flush()
+        self._flushed += len(self._pending); self._pending.clear()
+
+    def _read_locked(self, lo: int, hi: int) -> List[Dict[str, Any]]:
+        # Records lo..hi-1, oldest first: one read for the part on disk, the rest from the pending batch. The handle
+        # is in append mode, so moving the read position never affects where the next batch is written.
+        out = []
+        if lo < self._flushed:
+            n = min(hi, self._flushed) - lo
+            self._file.seek(len(_FILE_HEADER) + lo * RECORD_SIZE); data = self._file.read(n * RECORD_SIZE)
+            out += [_unpack(lo + k, data[k * RECORD_SIZE:(k + 1) * RECORD_SIZE]) for k in range(len(data) // RECORD_SIZE)]
+        for i in range(max(lo, self._flushed), hi): out.append(_unpack(i, self._pending[i - self._flushed]))
+        return out
+
+    def page(self, offset: int = 0, count: int = 20) -> List[Dict[str, Any]]:
+        # Newest first: offset 0 is the latest session.
+        with self._lock:
+            total = len(self._ends); hi = max(0, total - max(0, offset)); lo = max(0, hi - max(0, count))
+            if lo >= hi or self._file is None: return []
+            return self._read_locked(lo, hi)[::-1]
+
+    def day(self, day: str) -> List[Dict[str, Any]]:
+        # One date's sessions, oldest first. Contiguous in the file unless the clock was set back across midnight.
+        with self._lock:
+            rows = self._by_day.get(day)
+            if not rows or self._file is None: return []
+            if rows[-1] - rows[0] == len(rows) - 1: return self._read_locked(rows[0], rows[-1] + 1)
+            return [self._read_locked(i, i + 1)[0] for i in rows]
+
+    def days(self) -> List[str]:
+        with self._lock: return sorted(self._by_day)
+
+    def day_counts(self, start: str, end: str) -> Dict[str, int]:
+        # Sessions per date in [start, end] (ISO dates), from the index alone.
+        with self._lock: return {d: len(rows) for d, rows in self._by_day.items() if start <= d <= end}
+
+    def close(self):
+        with self._lock:
+            self._flush_locked()
+            if self._file is not None: self._file.close(); self._file = None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="List focus sessions from the activitytracker3000 session store")
+    parser.add_argument("--file", default=DEFAULT_FOCUS_STORE_FILE)
+    parser.add_argument("--day", help="only this date (YYYY-MM-DD)")
+    parser.add_argument("--offset", type=int, default=0, help="skip this many of the newest sessions")
+    parser.add_argument("--count", type=int, default=20)
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.file): print(f"{args.file} does not exist"); return 1
+    store = FocusStore(args.file, writable=False)
+    try:
+        sessions = store.day(args.day)[::-1] if args.day else store.page(args.offset, args.count)
+        print(f"{len(store)} sessions on {len(store.days())} days")
+        for s in sessions:
+            end = datetime.datetime.fromtimestamp(s["end"])
+            print(f"{end:%Y-%m-%d %H:%M}  {s['planned_seconds'] // 60:>3}m planned  {s['active_seconds'] / 60:>5.1f}m active  "
+                  f"{s['effectiveness']:>5.1f}%  {s['interruptions']} interruptions ({s['paused_seconds'] / 60:.1f}m paused)"
+                  + ("" if s["completed"] else "  (cut short)"))
+    finally: store.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,309 @@
+import datetime
+import math
+import time
+from typing import Optional, Dict, Any, List, Tuple
+
+import numpy as np
+import customtkinter as ctk
+
+# --- Configuration ---
+HISTORY_WINDOW_SIZE = "900x640"
+HISTORY_DEFAULT_SPAN_DAYS = 90
+HISTORY_MIN_SPAN_DAYS = 7
+HISTORY_MAX_SPAN_DAYS = 5 * 366 + 30 # zooming out stops here, or at the whole history if it is longer
+HISTORY_ZOOM_STEP = 1.25 # span factor per mouse-wheel notch
+HISTORY_LIVE_UPDATE_SECONDS = 60.0 # how often today's point follows the live totals
+HISTORY_PRESETS = (("1W", 7), ("1M", 31), ("3M", 92), ("1Y", 366), ("5Y", 5 * 366), ("ALL", None))
+HISTORY_BG = "#1D1D1D"; HISTORY_GRID = "#333333"; HISTORY_TEXT = "#A9A9A9"; HISTORY_FONT = ("helvetica", 9)
+HISTORY_MARGIN_LEFT = 56; HISTORY_MARGIN_RIGHT = 12; HISTORY_MARGIN_TOP = 8; HISTORY_AXIS_HEIGHT = 20; HISTORY_ROW_GAP = 10
+# --- End Configuration ---
+
+# Charts top to bottom: title, unit, fixed y maximum (None: fitted to the visible data), and the series drawn in it
+# as (name, band colour, mean-line colour). Band = min..max of the days under each pixel column, line = their mean.
+CHARTS = [
+    ("ACTIVE / IDLE", "h", None, [("active", "#1f6f3a", "#30D158"), ("idle", "#6f2a26", "#FF3B30")]),
+    ("EFFECTIVENESS", "%", 100.0, [("effectiveness", "#5a5426", "#E8D85C")]),
+    ("KEYSTROKES", "", None, [("keystrokes", "#1d4a6b", "#00A9FF")]),
+    ("CLICKS", "", None, [("clicks", "#4b3a6b", "#B48CFF")]),
+]
+# Series computed from the day records: field and scale (seconds are charted in hours).
+SERIES_FIELDS = {"active": ("total_active_seconds_today", 1 / 3600), "idle": ("total_idle_seconds_today", 1 / 3600),
+                 "keystrokes": ("keystrokes_today", 1.0), "clicks": ("mouse_clicks_today", 1.0)}
+
+class MinMaxPyramid:
+    # Level k holds the min and max of each run of 2**k days, plus a prefix sum for means. A pixel column that
+    # covers w days reads the level whose runs are just narrower than w, so one reduceat per view costs O(columns)
+    # whether the view is a week or five years. Columns snap to run boundaries of that level: less than one column.
+    def __init__(self, values: np.ndarray):
+        values = np.asarray(values, dtype=np.float64); self.n = len(values)
+        self.mins = [values.copy()]; self.maxs = [values.copy()]
+        while len(self.mins[-1]) > 1:
+            lo = self.mins[-1]; hi = self.maxs[-1]
+            if len(lo) % 2: lo = np.append(lo, np.inf); hi = np.append(hi, -np.inf)
+            self.mins.append(np.minimum(lo[0::2], lo[1::2])); self.maxs.append(np.maximum(hi[0::2], hi[1::2]))
+        self.csum = np.concatenate(([0.0], np.cumsum(values)))
+
+    def set_last(self, value: float):
+        # Today's value changed: one leaf and its ancestors, O(log n).
+        i = self.n - 1; self.mins[0][i] = self.maxs[0][i] = value
+        for k in range(1, len(self.mins)):
+            j = i >> k; a = 2 * j; below_lo = self.mins[k - 1]; below_hi = self.maxs[k - 1]
+            if a + 1 < len(below_lo): self.mins[k][j] = min(below_lo[a], below_lo[a + 1]); self.maxs[k][j] = max(below_hi[a], below_hi[a + 1])
+            else: self.mins[k][j] = below_lo[a]; self.maxs[k][j] = below_hi[a]
+        self.csum[-1] = self.csum[-2] + value
+
+    def envelope(self, t0: float, t1: float, columns: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        # Min, max and mean per pixel column of the view [t0, t1) (days from the first day), and which columns have data.
+        w = (t1 - t0) / columns
+        level = min(len(self.mins) - 1, int(math.log2(w))) if w >= 2 else 0
+        lo_arr = self.mins[level]; hi_arr = self.maxs[level]; m = len(lo_arr)
+        edges = t0 + w * np.arange(columns + 1)
+        day_edges = np.clip(np.floor(edges), 0, self.n).astype(np.int64)
+        starts = day_edges[:-1] >> level; k = int(np.searchsorted(day_edges[:-1], self.n)) # columns that start inside the data
+        mins = np.zeros(columns); maxs = np.zeros(columns)
+        if k:
+            last = day_edges[-1] >> level if day_edges[-1] < self.n else m # a view reaching today takes the partial last run
+            end = int(min(m, max(starts[k - 1] + 1, last)))
+            mins[:k] = np.minimum.reduceat(lo_arr[:end], starts[:k]); maxs[:k] = np.maximum.reduceat(hi_arr[:end], starts[:k])
+        lo_d = np.minimum(day_edges[:-1], self.n - 1); hi_d = np.minimum(np.maximum(day_edges[1:], lo_d + 1), self.n)
+        means = (self.csum[hi_d] - self.csum[lo_d]) / (hi_d - lo_d)
+        return mins, maxs, means, (edges[1:] > 0) & (edges[:-1] < self.n)
+
+class DayHistory:
+    # Dense per-day series from the first saved day to today (days without a record are zero), loaded once from
+    # the engine. Later the engine is only asked for the days after the newest one, when the date changes, and
+    # today's point follows the live snapshot. `version` changes whenever any series does.
+    def __init__(self, engine):
+        self.engine = engine; self.version = 0; self._live_at = 0.0
+        h = engine.day_history(); today = datetime.date.today()
+        days = [datetime.date.fromisoformat(d) for d in h["days"]]
+        self.first = min(days[0], today) if days else today; self.last = max(days[-1], today) if days else today
+        n = (self.last - self.first).days + 1
+        self.values = {name: np.zeros(n) for name in SERIES_FIELDS}
+        self._fill(h, days)
+        self.pyramids = {name: MinMaxPyramid(v) for name, v in self._series().items()}
+
+    def __len__(self) -> int:
+        return (self.last - self.first).days + 1
+
+    def _fill(self, h: Dict[str, Any], days: List[datetime.date]):
+        if not days: return
+        idx = np.array([(d - self.first).days for d in days]); rows = np.array(h["rows"], dtype=np.float64)
+        for name, (field, scale) in SERIES_FIELDS.items(): self.values[name][idx] = rows[:, h["fields"].index(field)] * scale
+
+    def _series(self) -> Dict[str, np.ndarray]:
+        v = self.values; total = v["active"] + v["idle"]
+        eff = np.divide(v["active"] * 100.0, total, out=np.zeros_like(total), where=total > 0)
+        return {**v, "effectiveness": eff}
+
+    def update_live(self, s: Dict[str, Any]) -> bool:
+        # Called with every GUI snapshot; returns True when a series changed.
+        today = datetime.date.fromisoformat(s["current_day_string"])
+        if today > self.last:
+            # Day rollover: fetch the finished days, extend the arrays and rebuild the pyramids (O(days), once a day).
+            h = self.engine.day_history(self.last.isoformat())
+            grow = (today - self.last).days; self.last = today
+            for name in self.values: self.values[name] = np.concatenate((self.values[name], np.zeros(grow)))
+            self._fill(h, [datetime.date.fromisoformat(d) for d in h["days"]])
+            self.pyramids = {name: MinMaxPyramid(v) for name, v in self._series().items()}
+            self._live_at = 0.0
+        elif today < self.last or time.monotonic() - self._live_at < HISTORY_LIVE_UPDATE_SECONDS: return False
+        self._live_at = time.monotonic(); i = len(self) - 1
+        for name, (field, scale) in SERIES_FIELDS.items(): self.values[name][i] = s[field] * scale
+        active = self.values["active"][i]; total = active + self.values["idle"][i]
+        live = {name: self.values[name][i] for name in SERIES_FIELDS}; live["effectiveness"] = active * 100.0 / total if total > 0 else 0.0
+        for name, value in live.items(): self.pyramids[name].set_last(value)
+        self.version += 1
+        return True
+
+def _nice_ceiling(v: float) -> float:
+    if v <= 0: return 1.0
+    mag = 10 ** math.floor(math.log10(v))
+    return next(m * mag for m in (1, 2, 2.5, 5, 10) if m * mag >= v)
+
+def _format_value(v: float, unit: str) -> str:
+    if unit == "h": return f"{v:g}h"
+    if unit == "%": return f"{v:.0f}%"
+    return f"{v / 1000:g}k" if v >= 10000 else f"{v:,.0f}"
+
+def _date_ticks(d0: datetime.date, d1: datetime.date) -> List[Tuple[datetime.date, str]]:
+    # Tick dates in [d0, d1] at a spacing that gives a handful of labels for the span.
+    span = (d1 - d0).days
+    if span <= 14: step, fmt = "day", "%b %d"
+    elif span <= 70: step, fmt = "week", "%b %d"
+    elif span <= 400: step, fmt = "month", "%b"
+    elif span <= 1500: step, fmt = "quarter", "%b %Y"
+    else: step, fmt = "year", "%Y"
+    if step == "day": d = d0
+    elif step == "week": d = d0 + datetime.timedelta(days=(7 - d0.weekday()) % 7)
+    else:
+        d = datetime.date(d0.year, d0.month, 1) if step != "year" else datetime.date(d0.year, 1, 1)
+        if step == "quarter": d = datetime.date(d.year, d.month - (d.month - 1) % 3, 1)
+        if d < d0: d = _next_tick(d, step)
+    ticks = []
+    while d <= d1 and len(ticks) < 40: ticks.append((d, d.strftime(fmt))); d = _next_tick(d, step)
+    return ticks
+
+def _next_tick(d: datetime.date, step: str) -> datetime.date:
+    if step == "day": return d + datetime.timedelta(days=1)
+    if step == "week": return d + datetime.timedelta(days=7)
+    months = {"month": 1, "quarter": 3}.get(step, 12); m = d.month - 1 + months
+    return datetime.date(d.year + m // 12, m % 12 + 1, 1)
+
+class HistoryCanvas:
+    # The charts on one Tk canvas. Every item (frames, titles, bands, mean lines, grid lines, labels) is created once
+    # and then only moved or relabelled with coords()/itemconfigure(), so a zoom or pan step redraws what changed
+    # instead of rebuilding the scene. render() returns at once when neither the view, the canvas size nor the data
+    # changed, and requests are coalesced to one render per idle cycle however fast wheel events arrive.
+    def __init__(self, canvas, data: DayHistory, on_render=None):
+        self.canvas = canvas; self.data = data; self.on_render = on_render
+        self._render_job = None; self._drawn = None; self._size = None
+        n = len(data); span = min(n, HISTORY_DEFAULT_SPAN_DAYS) if n >= HISTORY_MIN_SPAN_DAYS else HISTORY_MIN_SPAN_DAYS
+        self.t1 = float(n); self.t0 = self.t1 - span
+        self._drag: Optional[Tuple[int, float, float]] = None
+        c = canvas; self._rows = []
+        for title, unit, fixed_max, series in CHARTS:
+            row = {"unit": unit, "fixed_max": fixed_max,
+                   "frame": c.create_rectangle(0, 0, 0, 0, outline=HISTORY_GRID),
+                   "title": c.create_text(0, 0, anchor="nw", text=title, fill=HISTORY_TEXT, font=HISTORY_FONT),
+                   "ymax": c.create_text(0, 0, anchor="ne", text="", fill=HISTORY_TEXT, font=HISTORY_FONT),
+                   "series": [(name, c.create_polygon(0, 0, 0, 0, 0, 0, fill=band, outline=band, state="hidden"),
+                               c.create_line(0, 0, 0, 0, fill=line, width=1, state="hidden")) for name, band, line in series]}
+            self._rows.append(row)
+        self._ticks: List[Tuple[int, int]] = [] # pooled (grid line, label) pairs
+        c.bind("<Configure>", lambda e: self.request_render())
+        c.bind("<MouseWheel>", lambda e: self.zoom(e.x, -1 if e.delta > 0 else 1))
+        c.bind("<Button-4>", lambda e: self.zoom(e.x, -1)); c.bind("<Button-5>", lambda e: self.zoom(e.x, 1))
+        c.bind("<ButtonPress-1>", self._on_press); c.bind("<B1-Motion>", self._on_drag)
+        self.request_render()
+
+    # --- View ---
+    def _plot_width(self) -> int:
+        return max(1, int(self.canvas.winfo_width()) - HISTORY_MARGIN_LEFT - HISTORY_MARGIN_RIGHT)
+
+    def _max_span(self) -> float:
+        return float(max(HISTORY_MAX_SPAN_DAYS, len(self.data)))
+
+    def set_view(self, t0: float, t1: float):
+        # Keeps the view inside the data; a view wider than the whole history ends at today.
+        span = min(self._max_span(), max(HISTORY_MIN_SPAN_DAYS, t1 - t0)); n = len(self.data)
+        self.t0 = n - span if span >= n else min(max(t0, 0.0), n - span); self.t1 = self.t0 + span
+        self.request_render()
+
+    def show_last(self, days: Optional[int]):
+        n = len(self.data); span = float(days) if days else float(max(n, HISTORY_MIN_SPAN_DAYS))
+        self.set_view(n - span, float(n))
+
+    def zoom(self, x: int, direction: int):
+        # Zooms about the day under the pointer.
+        frac = min(1.0, max(0.0, (x - HISTORY_MARGIN_LEFT) / self._plot_width())); span = self.t1 - self.t0
+        anchor = self.t0 + frac * span; new_span = min(self._max_span(), max(HISTORY_MIN_SPAN_DAYS, span * HISTORY_ZOOM_STEP ** direction))
+        self.set_view(anchor - frac * new_span, anchor - frac * new_span + new_span)
+
+    def _on_press(self, event):
+        self._drag = (event.x, self.t0, self.t1)
+
+    def _on_drag(self, event):
+        if self._drag is None: return
+        x0, t0, t1 = self._drag; shift = (x0 - event.x) / self._plot_width() * (t1 - t0)
+        self.set_view(t0 + shift, t1 + shift)
+
+    def follow_today(self, previous_len: int):
+        # After a day rollover a view that ended at today moves along with it.
+        if self.t1 >= previous_len: shift = len(self.data) - previous_len; self.set_view(self.t0 + shift, self.t1 + shift)
+        else: self.request_render()
+
+    # --- Drawing ---
+    def request_render(self):
+        if self._render_job is None: self._render_job = self.canvas.after_idle(self.render)
+
+    def render(self):
+        self._render_job = None; c = self.canvas
+        try:
+            if not c.winfo_exists(): return
+        except Exception: return
+        w = int(c.winfo_width()); h = int(c.winfo_height())
+        if w < HISTORY_MARGIN_LEFT + HISTORY_MARGIN_RIGHT + 10 or h < 60: return
+        key = (self.t0, self.t1, w, h, self.data.version, len(self.data))
+        if key == self._drawn: return
+        self._drawn = key
+        left = HISTORY_MARGIN_LEFT; cols = self._plot_width(); right = left + cols
+        row_h = (h - HISTORY_MARGIN_TOP - HISTORY_AXIS_HEIGHT - HISTORY_ROW_GAP * (len(self._rows) - 1)) / len(self._rows)
+        xs = left + np.arange(cols) + 0.5
+        for r, row in enumerate(self._rows):
+            top = HISTORY_MARGIN_TOP + r * (row_h + HISTORY_ROW_GAP); bottom = top + row_h
+            if self._size != (w, h):
+                c.coords(row["frame"], left, top, right, bottom); c.coords(row["title"], left + 4, top + 2); c.coords(row["ymax"], left - 4, top)
+            envelopes = [(item, self.data.pyramids[name].envelope(self.t0, self.t1, cols)) for name, *item in row["series"]]
+            ymax = row["fixed_max"]
+            if ymax is None:
+                peaks = [env[1][env[3]].max() for _, env in envelopes if env[3].any()]
+                ymax = _nice_ceiling(max(peaks) if peaks else 0.0)
+            c.itemconfigure(row["ymax"], text=_format_value(ymax, row["unit"]))
+            scale = (row_h - 2) / ymax
+            for (poly, line), (mins, maxs, means, in_range) in envelopes:
+                idx = np.flatnonzero(in_range)
+                if not len(idx): c.itemconfigure(poly, state="hidden"); c.itemconfigure(line, state="hidden"); continue
+                sl = slice(idx[0], idx[-1] + 1); x = xs[sl]
+                top_y = bottom - np.minimum(maxs[sl], ymax) * scale; low_y = bottom - np.minimum(mins[sl], ymax) * scale
+                mean_y = bottom - np.minimum(means[sl], ymax) * scale
+                if len(x) == 1: x = np.append(x, x + 1); top_y = np.repeat(top_y, 2); low_y = np.repeat(low_y, 2); mean_y = np.repeat(mean_y, 2)
+                keep = _runs(top_y, low_y)
+                band = np.concatenate((np.column_stack((x[keep], top_y[keep])).ravel(), np.column_stack((x[keep][::-1], low_y[keep][::-1])).ravel()))
+                keep = _runs(mean_y)
+                c.coords(poly, *band.tolist()); c.coords(line, *np.column_stack((x[keep], mean_y[keep])).ravel().tolist())
+                c.itemconfigure(poly, state="normal"); c.itemconfigure(line, state="normal")
+        self._render_ticks(left, cols, h)
+        self._size = (w, h)
+        if self.on_render: self.on_render()
+
+    def _render_ticks(self, left: int, cols: int, h: int):
+        c = self.canvas; first = self.data.first; per_day = cols / (self.t1 - self.t0)
+        d0 = first + datetime.timedelta(days=math.ceil(self.t0)); d1 = first + datetime.timedelta(days=math.floor(self.t1 - 1e-9))
+        ticks = _date_ticks(d0, d1); label_y = h - HISTORY_AXIS_HEIGHT + 4
+        while len(self._ticks) < len(ticks):
+            self._ticks.append((c.create_line(0, 0, 0, 0, fill=HISTORY_GRID, dash=(2, 4)),
+                                c.create_text(0, 0, anchor="n", fill=HISTORY_TEXT, font=HISTORY_FONT)))
+            c.tag_lower(self._ticks[-1][0])
+        for i, (line, label) in enumerate(self._ticks):
+            if i >= len(ticks): c.itemconfigure(line, state="hidden"); c.itemconfigure(label, state="hidden"); continue
+            d, text = ticks[i]; x = left + ((d - first).days - self.t0) * per_day
+            c.coords(line, x, HISTORY_MARGIN_TOP, x, h - HISTORY_AXIS_HEIGHT); c.coords(label, x, label_y)
+            c.itemconfigure(label, text=text, state="normal"); c.itemconfigure(line, state="normal")
+
+def _runs(*ys: np.ndarray) -> np.ndarray:
+    # Indices that keep the shape of the polyline(s): the ends of every run of equal values. At high zoom many
+    # columns share one day, so this keeps the point count near the number of days shown rather than of pixels.
+    n = len(ys[0])
+    if n <= 2: return np.arange(n)
+    change = np.zeros(n, dtype=bool); change[0] = change[-1] = True
+    for y in ys: diff = y[1:] != y[:-1]; change[1:] |= diff; change[:-1] |= diff
+    return np.flatnonzero(change)
+
+class HistoryWindow(ctk.CTkToplevel):
+    # A separate window, opened from the dashboard's HISTORY button; numpy and this module are only imported then.
+    def __init__(self, master, engine):
+        super().__init__(master)
+        self.title("Activity history"); self.geometry(HISTORY_WINDOW_SIZE); self.configure(fg_color=HISTORY_BG)
+        self.data = DayHistory(engine)
+        bar = ctk.CTkFrame(self, fg_color="transparent"); bar.pack(fill="x", padx=10, pady=(8, 0))
+        self.range_label = ctk.CTkLabel(bar, text="", text_color=HISTORY_TEXT); self.range_label.pack(side="left")
+        for text, days in reversed(HISTORY_PRESETS):
+            ctk.CTkButton(bar, text=text, width=36, height=22, fg_color="#2E2E2E", hover_color="#3F3F3F",
+                          command=lambda d=days: self.chart.show_last(d)).pack(side="right", padx=2)
+        canvas = ctk.CTkCanvas(self, bg=HISTORY_BG, highlightthickness=0); canvas.pack(fill="both", expand=True, padx=10, pady=10)
+        self.chart = HistoryCanvas(canvas, self.data, on_render=self._update_range_label)
+        self.protocol("WM_DELETE_WINDOW", self.destroy)
+
+    def _update_range_label(self):
+        first = self.data.first; c = self.chart
+        d0 = first + datetime.timedelta(days=max(0, math.floor(c.t0))); d1 = first + datetime.timedelta(days=max(0, math.ceil(c.t1) - 1))
+        self.range_label.configure(text=f"{d0:%Y-%m-%d} – {d1:%Y-%m-%d}  ({round(c.t1 - c.t0)} days; wheel to zoom, drag to pan)")
+
+    def update_live(self, s: Dict[str, Any]):
+        # Fed every snapshot by the dashboard; only a new day or the periodic live point touches the charts.
+        if not self.winfo_exists(): return
+        previous_len = len(self.data)
+        if self.data.update_live(s):
+            if len(self.data) != previous_len: self.chart.follow_today(previous_len)
+            else: self.chart.request_render()
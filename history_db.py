@@ -0,0 +1,165 @@
+import argparse
+import datetime
+import os
+import re
+import sqlite3
+import sys
+import threading
+from typing import Optional, List, Dict, Any, Tuple
+
+import activity_storage
+
+# --- Configuration ---
+DEFAULT_DB_FILE = "activity_history.db"
+DEFAULT_FOCUS_LOG_FILE = "focus_session_log.txt"
+# --- End Configuration ---
+
+DAY_FIELDS = activity_storage.DAY_RECORD_FIELDS
+AGGREGATES = {"avg": "AVG", "sum": "SUM", "min": "MIN", "max": "MAX", "count": "COUNT"}
+WEEKDAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS day_stats (
+    day TEXT PRIMARY KEY,
+    weekday INTEGER NOT NULL,
+    {", ".join(f"{f} {'INTEGER' if f in activity_storage.INT_DAY_FIELDS else 'REAL'} NOT NULL DEFAULT 0" for f in DAY_FIELDS)}
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS day_stats_weekday ON day_stats (weekday, day);
+CREATE TABLE IF NOT EXISTS focus_sessions (
+    id INTEGER PRIMARY KEY,
+    day TEXT,
+    end_time TEXT NOT NULL,
+    duration_minutes INTEGER NOT NULL,
+    effectiveness REAL NOT NULL,
+    source TEXT UNIQUE
+);
+CREATE INDEX IF NOT EXISTS focus_sessions_day ON focus_sessions (day, end_time);
+"""
+
+# "[HH:MM:SS] 25min Focus Session - 81.3% (EFFECTIVE)", optionally with a date in front of the time.
+_FOCUS_LINE = re.compile(r"^\[(?:(\d{4}-\d{2}-\d{2}) )?(\d{2}:\d{2}:\d{2})\] (\d+)min Focus Session - ([\d.]+)%")
+
+def _weekday(day: str) -> int:
+    return datetime.date.fromisoformat(day).weekday()
+
+def _check_field(field: str) -> str:
+    if field not in DAY_FIELDS: raise ValueError(f"Unknown field {field!r}; expected one of {', '.join(DAY_FIELDS)}")
+    return field
+
+class HistoryDB:
+    # Indexed copy of the day records (one row per ISO date, clustered by date) and of the focus sessions.
+    # Safe to share between the tracking thread and the Tk thread.
+    def __init__(self, path: str = DEFAULT_DB_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL"); self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        with self._lock: self._conn.close()
+
+    # --- Writes ---
+    def upsert_day(self, day: str, record: Dict[str, Any]):
+        self.upsert_days([(day, record)])
+
+    def upsert_days(self, items) -> int:
+        cols = ", ".join(DAY_FIELDS); marks = ", ".join("?" for _ in DAY_FIELDS)
+        updates = ", ".join(f"{f}=excluded.{f}" for f in DAY_FIELDS)
+        sql = (f"INSERT INTO day_stats (day, weekday, {cols}) VALUES (?, ?, {marks}) "
+               f"ON CONFLICT(day) DO UPDATE SET {updates}")
+        rows = []
+        for day, record in items:
+            if isinstance(record, (int, float)): record = {"total_active_seconds_today": float(record)}
+            if not isinstance(record, dict): continue
+            rows.append((day, _weekday(day), *[record.get(f, 0) or 0 for f in DAY_FIELDS]))
+        with self._lock, self._conn: self._conn.executemany(sql, rows)
+        return len(rows)
+
+    def add_focus_session(self, day: Optional[str], end_time: str, duration_minutes: int, effectiveness: float,
+                          source: Optional[str] = None) -> bool:
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                "INSERT OR IGNORE INTO focus_sessions (day, end_time, duration_minutes, effectiveness, source) VALUES (?, ?, ?, ?, ?)",
+                (day, end_time, int(duration_minutes), float(effectiveness), source))
+        return cur.rowcount > 0
+
+    # --- Queries ---
+    def days(self, start: str, end: str, fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        cols = ", ".join(_check_field(f) for f in (fields or DAY_FIELDS))
+        with self._lock:
+            rows = self._conn.execute(f"SELECT day, {cols} FROM day_stats WHERE day BETWEEN ? AND ? ORDER BY day",
+                                      (start, end)).fetchall()
+        return [dict(r) for r in rows]
+
+    def aggregate(self, field: str, start: str, end: str, func: str = "avg", weekday: Optional[int] = None) -> Optional[float]:
+        sql_func = AGGREGATES[func]
+        sql = f"SELECT {sql_func}({_check_field(field)}) FROM day_stats WHERE day BETWEEN ? AND ?"; params: Tuple = (start, end)
+        if weekday is not None: sql += " AND weekday = ?"; params += (weekday,)
+        with self._lock: return self._conn.execute(sql, params).fetchone()[0]
+
+    def weekday_profile(self, field: str, start: str, end: str, func: str = "avg") -> Dict[int, float]:
+        sql = (f"SELECT weekday, {AGGREGATES[func]}({_check_field(field)}) FROM day_stats "
+               f"WHERE day BETWEEN ? AND ? GROUP BY weekday ORDER BY weekday")
+        with self._lock: return {wd: val for wd, val in self._conn.execute(sql, (start, end))}
+
+    def focus_sessions(self, start: str, end: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT day, end_time, duration_minutes, effectiveness FROM focus_sessions "
+                "WHERE day BETWEEN ? AND ? ORDER BY day, end_time", (start, end)).fetchall()
+        return [dict(r) for r in rows]
+
+    def focus_summary(self, start: str, end: str) -> Dict[str, Any]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*), AVG(effectiveness), SUM(duration_minutes), SUM(effectiveness >= 66.6) "
+                "FROM focus_sessions WHERE day BETWEEN ? AND ?", (start, end)).fetchone()
+        return {"sessions": row[0], "avg_effectiveness": row[1], "focus_minutes": row[2] or 0, "effective_sessions": row[3] or 0}
+
+# --- One-shot migration from the JSON history and the text focus log ---
+def migrate(db: HistoryDB, data_file: str = activity_storage.DEFAULT_DATA_FILE,
+            focus_log_file: str = DEFAULT_FOCUS_LOG_FILE) -> Tuple[int, int]:
+    # Re-running is harmless: days are upserted and every focus log line is keyed by its line number.
+    days = db.upsert_days(activity_storage.JournalStore(data_file).iter_days())
+    sessions = 0
+    if os.path.exists(focus_log_file):
+        with open(focus_log_file, "r", encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                m = _FOCUS_LINE.match(line)
+                if not m: continue
+                # Lines written before the log carried dates cannot be placed on a day; they are kept with day NULL.
+                day, end_time, minutes, eff = m.groups()
+                if db.add_focus_session(day, end_time, int(minutes), float(eff), source=f"{os.path.basename(focus_log_file)}:{line_no}"):
+                    sessions += 1
+    return days, sessions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SQLite history store for activitytracker3000")
+    parser.add_argument("--db", default=DEFAULT_DB_FILE)
+    sub = parser.add_subparsers(dest="command", required=True)
+    mig = sub.add_parser("migrate", help="import mouse_activity_log.json and focus_session_log.txt")
+    mig.add_argument("--data-file", default=activity_storage.DEFAULT_DATA_FILE)
+    mig.add_argument("--focus-log", default=DEFAULT_FOCUS_LOG_FILE)
+    q = sub.add_parser("query", help="aggregate a day field over a date range")
+    q.add_argument("--from", dest="start", required=True); q.add_argument("--to", dest="end", required=True)
+    q.add_argument("--field", default="total_active_seconds_today", choices=DAY_FIELDS)
+    q.add_argument("--agg", default="avg", choices=sorted(AGGREGATES))
+    q.add_argument("--weekday", choices=WEEKDAYS)
+    args = parser.parse_args(argv)
+
+    db = HistoryDB(args.db)
+    try:
+        if args.command == "migrate":
+            days, sessions = migrate(db, args.data_file, args.focus_log)
+            print(f"Imported {days} days and {sessions} focus sessions into {args.db}")
+        else:
+            weekday = WEEKDAYS.index(args.weekday) if args.weekday else None
+            print(db.aggregate(args.field, args.start, args.end, args.agg, weekday))
+    finally:
+        db.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,226 @@
+import argparse
+import glob
+import json
+import os
+import re
+import socket
+import sys
+import threading
+import time
+import uuid
+from typing import Optional, Dict, Any, List, Tuple, Iterable
+
+import activity_storage
+
+# --- Configuration ---
+DEFAULT_DEVICE_ID_FILE = "device_id"
+DEFAULT_MERGE_STATE_FILE = "merge_state.json"
+DEFAULT_MERGED_DATA_FILE = "merged_activity_log.json" # same layout as mouse_activity_log.json (+ .journal), all devices combined
+DEVICE_LOG_SUFFIX = ".devlog"
+DEVICE_LOG_COMPACT_FACTOR = 4 # a device log is rewritten once it holds this many lines per day it covers
+# --- End Configuration ---
+
+# Multi-workstation history. Every device appends its day records to its own log in a shared folder (any folder a
+# sync tool keeps in step between machines): <sync dir>/<device id>.devlog, one JSON line per changed day,
+#   {"day": "2026-10-01", "v": 17, "t": <publish time>, ...DAY_RECORD_FIELDS}
+# where v counts up in that device's log. Only that device writes its log, so for each (device, day) the record with
+# the highest v is the current one, and taking it is a last-writer-wins register per device: merging the same lines
+# again, in any order, or from a rewritten log gives the same result. A day's combined record is then derived from
+# the current record of every device: counters add up, the longest spells are the maximum over devices, and the
+# "previous spell" fields come from the device that reported last.
+SUM_FIELDS = ("total_active_seconds_today", "total_idle_seconds_today", "mouse_total_distance_today", "keystrokes_today", "mouse_clicks_today")
+MAX_FIELDS = ("max_active_seconds_today", "max_idle_seconds_today")
+LATEST_FIELDS = ("last_activity_duration", "last_inactivity_duration")
+FIELDS = activity_storage.DAY_RECORD_FIELDS
+_DEVICE_ID = re.compile(r"[^A-Za-z0-9_.-]+")
+
+def device_id(path: str = DEFAULT_DEVICE_ID_FILE) -> str:
+    # This machine's ID: read from `path`, or made up from the host name and a random suffix on first use.
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f: existing = f.read().strip()
+        if existing: return existing
+    new_id = f"{_DEVICE_ID.sub('-', socket.gethostname()).strip('-') or 'device'}-{uuid.uuid4().hex[:8]}"
+    activity_storage.atomic_write_text(path, new_id + "\n")
+    return new_id
+
+def device_log_path(sync_dir: str, device: str) -> str:
+    return os.path.join(sync_dir, _DEVICE_ID.sub("-", device) + DEVICE_LOG_SUFFIX)
+
+def _record_values(record: Any) -> List[Any]:
+    # A stored day record in FIELDS order; pre-dict histories stored only the active seconds.
+    if isinstance(record, (int, float)): record = {"total_active_seconds_today": record}
+    return [record.get(f, 0 if f in activity_storage.INT_DAY_FIELDS else 0.0) for f in FIELDS]
+
+class DevicePublisher:
+    # Appends this device's changed day records to its log. publish() compares each record with what the log
+    # already holds for that day, so re-publishing the whole history only writes the days that differ.
+    def __init__(self, sync_dir: str, device: str):
+        self.path = device_log_path(sync_dir, device); self.device = device
+        self._lock = threading.Lock(); self._published: Optional[Dict[str, Tuple[int, List[Any]]]] = None
+        self._lines = 0; self._version = 0
+        os.makedirs(sync_dir, exist_ok=True)
+
+    def _load_locked(self):
+        published = {}; lines = 0; version = 0
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try: entry = json.loads(line); day = entry["day"]; v = int(entry["v"])
+                    except (ValueError, KeyError, TypeError): continue # torn tail from a crash mid-append
+                    lines += 1; version = max(version, v)
+                    if v >= published.get(day, (0,))[0]: published[day] = (v, _record_values(entry))
+        self._published = published; self._lines = lines; self._version = version
+
+    def publish(self, days: Iterable[Tuple[str, Any]]) -> int:
+        # Returns the number of days written.
+        with self._lock:
+            if self._published is None: self._load_locked()
+            now = round(time.time(), 3); out = []
+            for day, record in days:
+                values = _record_values(record); current = self._published.get(day)
+                if current is not None and current[1] == values: continue
+                self._version += 1; self._published[day] = (self._version, values)
+                out.append(json.dumps({"day": day, "v": self._version, "t": now, **dict(zip(FIELDS, values))}, separators=(",", ":")))
+            if not out: return 0
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("\n".join(out) + "\n"); f.flush(); os.fsync(f.fileno())
+            self._lines += len(out)
+            if self._lines > 64 and self._lines > DEVICE_LOG_COMPACT_FACTOR * len(self._published): self._compact_locked(now)
+            return len(out)
+
+    def _compact_locked(self, now: float):
+        # Today's record is re-published at every save; keep only the current line per day. Readers notice the
+        # replaced file and read it again from the start, which the versions make harmless.
+        lines = [json.dumps({"day": day, "v": v, "t": now, **dict(zip(FIELDS, values))}, separators=(",", ":"))
+                 for day, (v, values) in sorted(self._published.items(), key=lambda kv: kv[1][0])]
+        activity_storage.atomic_write_text(self.path, "\n".join(lines) + "\n")
+        self._lines = len(lines)
+
+class HistoryMerger:
+    # Folds every device log in sync_dir into merged_file. The state file remembers how far each log has been read
+    # and each device's current record per day, so a run reads only lines appended since the previous run and
+    # recomputes only the days they touch. The merged history is a JournalStore like the local one: the changed
+    # days are appended to its journal, and the snapshot is only rewritten when the journal is compacted. The read
+    # positions are also kept in a small sidecar file, written after the state, so a run with nothing new only stats
+    # the logs and never parses the state.
+    def __init__(self, sync_dir: str, state_file: str = DEFAULT_MERGE_STATE_FILE, merged_file: str = DEFAULT_MERGED_DATA_FILE):
+        self.sync_dir = sync_dir; self.state_file = state_file; self.merged_file = merged_file
+        self.sources_file = state_file + ".sources"
+        self._state: Optional[Dict[str, Any]] = None
+
+    def _saved_sources(self) -> Dict[str, Any]:
+        if self._state is not None: return self._state["sources"]
+        if not os.path.exists(self.state_file): return {}
+        try:
+            with open(self.sources_file, "r", encoding="utf-8") as f: return json.load(f)
+        except (OSError, ValueError): return {}
+
+    def _load_state(self) -> Dict[str, Any]:
+        if self._state is None:
+            state = {}
+            if os.path.exists(self.state_file):
+                try:
+                    with open(self.state_file, "r", encoding="utf-8") as f: state = json.load(f)
+                except ValueError as e: print(f"Warning: {self.state_file} unreadable ({e}); merging from scratch.")
+            if state.get("fields") != FIELDS: state = {} # written by a version with other day fields
+            state.setdefault("fields", FIELDS); state.setdefault("sources", {}); state.setdefault("devices", {}); state.setdefault("merged", {})
+            self._state = state
+        return self._state
+
+    def _read_log(self, path: str, source: Dict[str, Any], st: os.stat_result, devices: Dict[str, Dict[str, list]], changed: set) -> int:
+        # Reads the part of one log not seen yet. A log that was replaced (compacted, or re-synced by another tool)
+        # or shrank is read again from the start.
+        offset = source.get("offset", 0)
+        if source.get("ino") != st.st_ino or st.st_size < offset: offset = 0
+        device = os.path.basename(path)[:-len(DEVICE_LOG_SUFFIX)]
+        records = devices.setdefault(device, {}); lines = 0
+        with open(path, "rb") as f:
+            f.seek(offset); data = f.read()
+        end = data.rfind(b"\n") + 1 # a line still being appended is left for the next run
+        for line in data[:end].splitlines():
+            try: entry = json.loads(line); day = entry["day"]; v = int(entry["v"])
+            except (ValueError, KeyError, TypeError): continue
+            lines += 1; current = records.get(day)
+            if current is not None and current[0] >= v: continue
+            records[day] = [v, float(entry.get("t", 0.0))] + _record_values(entry); changed.add(day)
+        source.update({"ino": st.st_ino, "size": st.st_size, "mtime_ns": st.st_mtime_ns, "offset": offset + end})
+        return lines
+
+    def merge(self) -> Dict[str, Any]:
+        t0 = time.perf_counter(); paths = sorted(glob.glob(os.path.join(self.sync_dir, "*" + DEVICE_LOG_SUFFIX)))
+        saved = self._saved_sources(); changed: set = set(); read = 0; lines = 0
+        for path in paths:
+            name = os.path.basename(path); st = os.stat(path); source = saved.get(name, {})
+            if source.get("ino") == st.st_ino and source.get("size") == st.st_size and source.get("mtime_ns") == st.st_mtime_ns: continue
+            state = self._load_state(); source = state["sources"].setdefault(name, {})
+            lines += self._read_log(path, source, st, state["devices"], changed); read += 1
+        if changed:
+            # Devices in name order, so a tie in publish time picks the same "latest" device whatever the read order.
+            state = self._load_state(); merged = state["merged"]; devices = [r for _, r in sorted(state["devices"].items())]
+            for day in changed: merged[day] = self._merge_day([r[day] for r in devices if day in r])
+            store = activity_storage.JournalStore(self.merged_file)
+            store.append_checkpoints((day, merged[day]) for day in sorted(changed)); store.join_compaction()
+        if read:
+            activity_storage.atomic_write_text(self.state_file, json.dumps(state, separators=(",", ":")))
+            activity_storage.atomic_write_text(self.sources_file, json.dumps(state["sources"]))
+        return {"devices": len(paths), "logs_read": read, "lines_read": lines, "days_changed": len(changed),
+                "changed_days": sorted(changed), "seconds": time.perf_counter() - t0}
+
+    @staticmethod
+    def _merge_day(records: List[list]) -> Dict[str, Any]:
+        # records: [v, t, *FIELDS values] per device.
+        by_field = dict(zip(FIELDS, zip(*(r[2:] for r in records))))
+        latest = max(records, key=lambda r: r[1])[2:]
+        out = {}
+        for i, f in enumerate(FIELDS):
+            if f in SUM_FIELDS: v = sum(by_field[f])
+            elif f in MAX_FIELDS: v = max(by_field[f])
+            else: v = latest[i]
+            out[f] = v if f in activity_storage.INT_DAY_FIELDS else round(v, 2)
+        return out
+
+    def merged(self) -> Dict[str, Dict[str, Any]]:
+        return self._load_state()["merged"]
+
+    def day_breakdown(self, day: str) -> Dict[str, Dict[str, Any]]:
+        # Each device's current record for a day, as last merged.
+        return {dev: dict(zip(FIELDS, r[day][2:])) for dev, r in self._load_state()["devices"].items() if day in r}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Merge activitytracker3000 histories from several machines through a shared folder")
+    parser.add_argument("--sync-dir", required=True, help="folder shared between the machines")
+    sub = parser.add_subparsers(dest="command", required=True)
+    pub = sub.add_parser("publish", help="append a history file's changed days to this (or the given) device's log")
+    pub.add_argument("--data-file", default=activity_storage.DEFAULT_DATA_FILE)
+    pub.add_argument("--device", help=f"device ID (default: the one in {DEFAULT_DEVICE_ID_FILE})")
+    mg = sub.add_parser("merge", help="fold new lines from every device log into the merged history")
+    mg.add_argument("--state-file", default=DEFAULT_MERGE_STATE_FILE); mg.add_argument("--output", default=DEFAULT_MERGED_DATA_FILE)
+    mg.add_argument("--db", help="also upsert the changed days into this SQLite history (history_db.py)")
+    show = sub.add_parser("show", help="per-device records and the merged record of one day")
+    show.add_argument("day"); show.add_argument("--state-file", default=DEFAULT_MERGE_STATE_FILE)
+    args = parser.parse_args(argv)
+
+    if args.command == "publish":
+        device = args.device or device_id()
+        n = DevicePublisher(args.sync_dir, device).publish(activity_storage.JournalStore(args.data_file).iter_days())
+        print(f"Published {n} changed days of {args.data_file} as {device}")
+    elif args.command == "merge":
+        merger = HistoryMerger(args.sync_dir, args.state_file, args.output); r = merger.merge()
+        print(f"{r['devices']} devices, {r['logs_read']} logs with new lines ({r['lines_read']} lines), "
+              f"{r['days_changed']} days changed in {r['seconds'] * 1000:.0f} ms")
+        if args.db and r["changed_days"]:
+            import history_db
+            db = history_db.HistoryDB(args.db); merged = merger.merged()
+            try: db.upsert_days((d, merged[d]) for d in r["changed_days"])
+            finally: db.close()
+    else:
+        merger = HistoryMerger(args.sync_dir, args.state_file); per_device = merger.day_breakdown(args.day)
+        if not per_device: print(f"No device has {args.day}"); return 1
+        for dev, rec in sorted(per_device.items()):
+            print(f"{dev:<32} active {rec['total_active_seconds_today'] / 3600:6.2f} h  keys {rec['keystrokes_today']:>7}")
+        merged = merger.merged()[args.day]
+        print(f"{'merged':<32} active {merged['total_active_seconds_today'] / 3600:6.2f} h  keys {merged['keystrokes_today']:>7}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
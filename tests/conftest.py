@@ -0,0 +1,6 @@
+# The modules live flat in the repo root; run the tests from there with `python -m pytest tests`.
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path: sys.path.insert(0, ROOT)
@@ -0,0 +1,60 @@
+import io
+import json
+
+import pytest
+
+import activity_export
+import activity_storage
+import focus_store
+
+def read_all(data: bytes):
+    blocks = list(activity_export.read_columnar(io.BytesIO(data)))
+    return {k: [v for b in blocks for v in b[k]] for k in (blocks[0] if blocks else {})}, len(blocks)
+
+def test_columnar_round_trip_every_type(monkeypatch):
+    monkeypatch.setattr(activity_export, "BLOCK_ROWS", 3) # several blocks, the last one short
+    columns = [("day", "date"), ("f", "f8"), ("i", "i8"), ("b", "bool"), ("s", "str")]
+    rows = [["1969-12-31", -1.5, -(2 ** 40), True, ""], ["1970-01-01", 0.0, 0, False, "é 😀"],
+            ["2024-02-29", 1e300, 2 ** 62, True, "a,b\n\"c\""], ["2100-01-01", 3.25, 7, False, "x" * 1000]]
+    out = io.BytesIO()
+    n = activity_export.write_columnar(activity_export.chunked(rows, 3), columns, out)
+    values, blocks = read_all(out.getvalue())
+    assert n == 4 and blocks == 2
+    assert [list(r) for r in zip(*(values[c] for c, _ in columns))] == rows
+
+def test_columnar_empty():
+    out = io.BytesIO()
+    assert activity_export.write_columnar(iter(()), activity_export.DAY_COLUMNS, out) == 0
+    assert read_all(out.getvalue()) == ({}, 0)
+
+def test_columnar_rejects_other_files():
+    with pytest.raises(ValueError): list(activity_export.read_columnar(io.BytesIO(b"not a columnar export")))
+
+def test_export_days_round_trip_through_columnar(tmp_path):
+    data_file = str(tmp_path / "log.json")
+    history = {"2024-01-01": {"total_active_seconds_today": 10.5, "keystrokes_today": 3}, "2024-01-02": 42.0}
+    (tmp_path / "log.json").write_text(json.dumps(history, indent=4), encoding="utf-8")
+    store = activity_storage.JournalStore(data_file)
+    store.append_checkpoint("2024-01-03", {"total_active_seconds_today": 1.0, "mouse_clicks_today": 9})
+    out = io.BytesIO()
+    assert activity_export.export("days", "columnar", out, data_file, start="2024-01-02", fields=["keystrokes_today", "total_active_seconds_today"], user="me") == 2
+    values, _ = read_all(out.getvalue())
+    assert values == {"user": ["me", "me"], "keystrokes_today": [0, 0], "total_active_seconds_today": [42.0, 1.0]}
+
+@pytest.mark.parametrize("fmt", activity_export.FORMATS)
+def test_export_empty_history(tmp_path, fmt):
+    out = io.BytesIO()
+    assert activity_export.export("days", fmt, out, str(tmp_path / "missing.json")) == 0
+    assert activity_export.export("focus", fmt, io.BytesIO(), str(tmp_path / "missing.afs")) == 0
+    if fmt == "columnar": assert read_all(out.getvalue()) == ({}, 0)
+    elif fmt == "csv": assert out.getvalue().decode().splitlines() == [",".join(c for c, _ in activity_export.DAY_COLUMNS)]
+    else: assert out.getvalue() == b""
+
+def test_export_focus_sessions_columnar(tmp_path):
+    path = str(tmp_path / "f.afs"); store = focus_store.FocusStore(path)
+    store.append(1000.0, 2500.0, 1500, 1200.0, 80.0, 30.0, 2, True); store.append(3000.0, 3600.0, 1500, 60.0, 4.0, 0.0, 0, False)
+    store.close()
+    out = io.BytesIO()
+    assert activity_export.export("focus", "columnar", out, path) == 2
+    values, _ = read_all(out.getvalue())
+    assert values["start"] == [1000.0, 3000.0] and values["interruptions"] == [2, 0] and values["completed"] == [True, False]
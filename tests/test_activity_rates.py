@@ -0,0 +1,58 @@
+import random
+
+import pytest
+
+from activity_rates import RATE_WINDOWS, RING_SECONDS, RollingCounter
+
+def feed(counter, events, total=0.0):
+    # Drives the counter the way a listener does: advance() just before each event is added to the total.
+    for t, amount in events: counter.advance(t, total); total += amount
+    return total
+
+def brute_count(events, now, window):
+    # Everything after the end of second int(now) - window, up to now.
+    return sum(a for t, a in events if int(now) - window < int(t) and t <= now)
+
+def test_window_edges_are_whole_seconds():
+    c = RollingCounter(); events = [(1000.0, 1), (1000.999, 1), (1001.0, 1), (1030.5, 1), (1059.999, 1)]
+    total = feed(c, events)
+    # At 1060.0 the 60 s window opens at the end of second 1000: both events in that second have dropped out.
+    assert c.count(1060.0, total, 60) == 3
+    assert c.count(1059.999, total, 60) == 5
+    assert c.count(1061.0, total, 60) == 2
+    assert c.count(1091.0, total, 60) == 1
+    assert c.count(1120.0, total, 60) == 0
+
+def test_matches_brute_force_over_random_stream():
+    rng = random.Random(20); c = RollingCounter(); events = []; total = 0.0; t = 50_000.0
+    for _ in range(3000):
+        # Mostly bursts, now and then a gap longer than a window or than the whole ring.
+        t += rng.choice([rng.uniform(0, 0.3), rng.uniform(0.5, 3), rng.uniform(61, 400), rng.uniform(RING_SECONDS, 3 * RING_SECONDS)]
+                        if rng.random() < 0.05 else [rng.uniform(0, 0.3)])
+        amount = rng.choice([1, 1, 1, rng.uniform(0, 40)])
+        c.advance(t, total); total += amount; events.append((t, amount))
+        if rng.random() < 0.2:
+            now = t + rng.choice([0.0, rng.uniform(0, 2), rng.uniform(0, 1000)])
+            for w in RATE_WINDOWS: assert c.count(now, total, w) == pytest.approx(brute_count(events, now, w)), (now, w)
+
+def test_gap_longer_than_window_and_ring():
+    c = RollingCounter(); total = feed(c, [(100.0 + k * 0.1, 1) for k in range(10)])
+    assert c.count(100.5, total, 60) == 10
+    assert c.count(161.0, total, 60) == 0 and c.count(161.0, total, 900) == 10
+    later = 100.0 + 5 * RING_SECONDS
+    total = feed(c, [(later, 1), (later + 0.5, 1)], total)
+    # The slots written before the gap have all been overwritten or skipped; none is read as part of a window.
+    assert [c.count(later + 1, total, w) for w in RATE_WINDOWS] == [2, 2, 2]
+    assert c.per_minute(later + 1, total) == pytest.approx((2.0, 2 * 60 / 300, 2 * 60 / 900))
+
+def test_clock_that_does_not_advance():
+    c = RollingCounter(); total = feed(c, [(500.25, 1)] * 1000)
+    assert [c.count(500.25, total, w) for w in RATE_WINDOWS] == [1000, 1000, 1000]
+    assert c.count(559.9, total, 60) == 1000 and c.count(560.0, total, 60) == 0
+
+def test_clock_set_back_starts_over():
+    c = RollingCounter(); total = feed(c, [(10_000.0 + k, 1) for k in range(120)])
+    assert c.count(10_119.5, total, 60) == 60
+    total = feed(c, [(9_000.0 + k, 1) for k in range(5)], total)
+    # Only what was counted since the jump: nothing from the old timeline leaks into the windows.
+    assert [c.count(9_004.5, total, w) for w in RATE_WINDOWS] == [5, 5, 5]
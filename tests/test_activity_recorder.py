@@ -0,0 +1,76 @@
+import datetime
+import random
+
+import pytest
+
+import activity_recorder
+import activity_state
+from activity_recorder import START, STOP, PAUSE, RESUME
+
+TIMEOUT = 5.0  # the engine's default inactivity timeout
+FOCUS, BREAK = 25 * 60, 5 * 60
+DAY = "2026-03-02"
+NINE = datetime.datetime(2026, 3, 2, 9).timestamp()
+TOTALS = ("total_active_seconds_today", "total_idle_seconds_today", "max_active_seconds_today",
+          "max_idle_seconds_today", "last_activity_duration", "last_inactivity_duration")
+
+def record(directory, marks, inputs):
+    mouse = activity_recorder.MouseRecorder(str(directory)); keys = activity_recorder.KeyRecorder(str(directory))
+    session = activity_recorder.SessionRecorder(str(directory))
+    for t, kind in marks: session.mark(kind, t)
+    for i, (t, is_key) in enumerate(inputs):
+        if is_key: keys.key(t)
+        else: mouse.move(t, i % 50, i % 30)
+    for r in (mouse, keys, session): r.close()
+    return activity_recorder.DayRecording(DAY, str(directory))
+
+def live_run(marks, inputs):
+    # What the engine does with the same input: a tracking pass every second, at every input (the listeners wake
+    # the loop), at each timer deadline and at the marks. A launch seeds the state as _INITIAL_STATE and
+    # load_daily_data do: the launch is the last input and a spell starts there; the day's totals carry over.
+    st = {k: 0.0 for k in TOTALS}; tick = None; sessions = []
+    def tracking_pass(t):
+        nonlocal tick
+        elapsed = 0.0 if tick is None else t - tick
+        active_part, _, _ = activity_state.advance_activity(st, t, elapsed, TIMEOUT)
+        ended = activity_state.advance_timer(st, elapsed, active_part)
+        if ended is not None and ended["ended"] == "focus": sessions.append(ended["effectiveness"])
+        tick = t
+    def run_to(t):
+        while tick is not None and t > tick:
+            tracking_pass(min(t, tick + 1.0, tick + st["timer_seconds_remaining"]))
+    for t, kind in sorted(marks + [(t, 0) for t, _ in inputs]):
+        if kind == START:
+            st.update({"last_activity_time": t, "prev_overall_active_state": False, "current_activity_start_time": t,
+                       "current_idle_start_time": None, "focus_duration_seconds": FOCUS, "break_duration_seconds": BREAK,
+                       "timer_mode": "focus", "timer_seconds_remaining": FOCUS, "current_focus_active_seconds": 0.0})
+            tracking_pass(t)
+        elif kind in (PAUSE, STOP): run_to(t); tick = None
+        elif kind == RESUME: tracking_pass(t)
+        elif tick is not None: run_to(t); st["last_activity_time"] = t; tracking_pass(t)
+    return st, sessions
+
+def synthetic_day():
+    # Bursts of typing and mouse moves with gaps around the timeout, a few long breaks, a pause and a restart.
+    rng = random.Random(14); inputs = []; t = NINE + 2.0
+    while t < NINE + 7200:
+        for _ in range(rng.randint(1, 40)):
+            inputs.append((t, rng.random() < 0.5)); t += rng.uniform(0.05, 1.5)
+        t += rng.choice([rng.uniform(1, 4.9), rng.uniform(5.1, 30), rng.uniform(60, 600)])
+    marks = [(NINE, START), (NINE + 1500.5, PAUSE), (NINE + 2100.25, RESUME), (NINE + 4000.0, STOP),
+             (NINE + 4300.0, START), (NINE + 7300.0, STOP)]
+    return marks, inputs
+
+def test_replay_at_default_timeout_matches_live_run(tmp_path):
+    marks, inputs = synthetic_day()
+    r = activity_recorder.replay(record(tmp_path, marks, inputs), TIMEOUT)
+    live, sessions = live_run(marks, inputs)
+    for k in TOTALS: assert r[k] == pytest.approx(live[k], abs=1e-6), k
+    assert [s["effectiveness"] for s in r["focus_sessions"]] == pytest.approx(sessions, abs=1e-6)
+    assert len(sessions) >= 3
+
+def test_replay_starts_active_like_a_fresh_tracker(tmp_path):
+    # No input at all: the launch still counts as input, so the first TIMEOUT seconds are active.
+    r = activity_recorder.replay(record(tmp_path, [(NINE, START), (NINE + 60, STOP)], []), TIMEOUT)
+    assert r["total_active_seconds_today"] == pytest.approx(TIMEOUT)
+    assert r["total_idle_seconds_today"] == pytest.approx(60 - TIMEOUT)
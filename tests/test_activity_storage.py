@@ -0,0 +1,93 @@
+import json
+
+import pytest
+
+import activity_storage
+
+def write(path, text):
+    path.write_text(text, encoding="utf-8"); return str(path)
+
+def stream(path, chunk_size):
+    return list(activity_storage.iter_snapshot(path, chunk_size=chunk_size))
+
+# --- iter_snapshot ---
+HISTORY = {
+    "2024-01-01": {"total_active_seconds_today": 12.5, "keystrokes_today": 1200, "mouse_total_distance_today": 1.25e6},
+    "2024-01-02": {"total_active_seconds_today": -0.0, "keystrokes_today": 0, "note": "tab\t \"quoted\" \\ backé 😀"},
+    "2024-01-03": 3600.75, # legacy record: a bare number
+    "2024-01-04": {"nested": [1, 2.5, {"x": None, "y": True}], "big": 123456789012345678},
+}
+
+@pytest.mark.parametrize("indent", [None, 4])
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 7, 16, 1 << 16])
+def test_iter_snapshot_matches_json_load_at_any_chunk_boundary(tmp_path, indent, chunk_size):
+    # Small chunks split every number, string and escape sequence somewhere across a refill.
+    path = write(tmp_path / "h.json", json.dumps(HISTORY, indent=indent))
+    assert stream(path, chunk_size) == list(HISTORY.items())
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 4])
+def test_iter_snapshot_numbers_cut_at_the_buffer_end(tmp_path, chunk_size):
+    # Top-level numbers end the buffer exactly where "12", "12." or "12.5e" could still continue.
+    history = {"a": 12.5, "b": 1e-7, "c": 99, "d": -3.25E+10}
+    path = write(tmp_path / "h.json", json.dumps(history, separators=(",", ":")))
+    assert stream(path, chunk_size) == list(history.items())
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 6])
+def test_iter_snapshot_escapes(tmp_path, chunk_size):
+    text = r'{"k\"ey\\": "a\nbA😀\/", "2024-01-01": {"s": "\\\"", "t": "\t"}}'
+    path = write(tmp_path / "h.json", text)
+    assert stream(path, chunk_size) == list(json.loads(text).items())
+
+@pytest.mark.parametrize("text", ["", "{}", "  {\n }  \n", "\n"])
+def test_iter_snapshot_empty_history(tmp_path, text):
+    assert stream(write(tmp_path / "h.json", text), 2) == []
+
+def test_iter_snapshot_missing_file(tmp_path):
+    assert stream(str(tmp_path / "missing.json"), 2) == []
+
+@pytest.mark.parametrize("text", ["[1, 2]", '{"a": 1', '{"a" 1}'])
+def test_iter_snapshot_rejects_malformed_input(tmp_path, text):
+    with pytest.raises(ValueError): stream(write(tmp_path / "h.json", text), 3)
+
+# --- JournalStore ---
+def day_record(i):
+    return {"total_active_seconds_today": float(i), "keystrokes_today": i}
+
+def test_journal_replay_skips_a_torn_last_line(tmp_path):
+    data_file = str(tmp_path / "log.json"); store = activity_storage.JournalStore(data_file)
+    store.append_checkpoint("2024-01-01", day_record(1)); store.append_checkpoint("2024-01-02", day_record(2))
+    with open(store.journal_file, "a", encoding="utf-8") as f: f.write('{"day":"2024-01-02","total_active_sec') # crash mid-append
+    reopened = activity_storage.JournalStore(data_file)
+    assert reopened.read_day("2024-01-02") == day_record(2)
+    assert reopened.load_all() == {"2024-01-01": day_record(1), "2024-01-02": day_record(2)}
+    # The next checkpoint starts on a line of its own instead of being glued to the torn one.
+    reopened.append_checkpoint("2024-01-02", day_record(3))
+    assert activity_storage.JournalStore(data_file).load_all()["2024-01-02"] == day_record(3)
+
+def test_compaction_preserves_every_day(tmp_path):
+    data_file = str(tmp_path / "log.json")
+    old = {f"2023-12-{d:02d}": day_record(d) for d in range(1, 32)}; old["2023-11-30"] = 4.5 # legacy bare number
+    (tmp_path / "log.json").write_text(json.dumps(old, indent=4), encoding="utf-8")
+    store = activity_storage.JournalStore(data_file, compact_every=1000)
+    expected = dict(old)
+    for i in range(50):
+        day = f"2024-01-{i % 10 + 1:02d}"; store.append_checkpoint(day, day_record(i)); expected[day] = day_record(i)
+    expected["2023-12-31"] = day_record(99); store.append_checkpoint("2023-12-31", day_record(99))
+    assert store.compact() > 0
+    assert activity_storage.read_snapshot(data_file) == expected
+    assert activity_storage.JournalStore(data_file).load_all() == expected
+    assert dict(activity_storage.JournalStore(data_file).stream_days()) == expected
+    assert activity_storage.JournalStore(data_file).read_day("2024-01-10") == expected["2024-01-10"]
+    assert "\n" not in open(data_file, encoding="utf-8").read() # compact JSON, not indented
+    assert store.compact() == 0 # nothing new to fold
+
+def test_compaction_runs_in_the_background_and_keeps_later_checkpoints(tmp_path):
+    data_file = str(tmp_path / "log.json"); store = activity_storage.JournalStore(data_file, compact_every=10)
+    expected = {}
+    for i in range(35):
+        day = f"2024-02-{i + 1:02d}" if i < 28 else f"2024-03-{i - 27:02d}"
+        store.append_checkpoint(day, day_record(i)); expected[day] = day_record(i)
+    store.join_compaction()
+    assert activity_storage.JournalStore(data_file).load_all() == expected
+    with open(store.journal_file, encoding="utf-8") as f: lines = f.read().splitlines()
+    assert json.loads(lines[0])["snapshot_through"] is not None and len(lines) < 35
@@ -0,0 +1,24 @@
+import tkinter
+
+import pytest
+
+pytest.importorskip("customtkinter")
+import activitytracker3000
+import tracker_engine
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    try: window = activitytracker3000.DominantBorderHubApp(tracker_engine.TrackerEngine())
+    except tkinter.TclError as e: pytest.skip(f"no display: {e}")
+    yield window
+    window.destroy()
+
+def test_focus_history_keeps_its_colours_after_compact_mode(app):
+    app._create_deferred_panels(); app._render_focus_history(0)
+    assert app.focus_history_textbox.tag_cget("eff_good", "foreground") == activitytracker3000.COLOR_ACCENT_ACTIVE_MOUSE
+    app.enter_compact_mode(); app.exit_compact_mode()
+    app._create_deferred_panels(); app._render_focus_history(0)
+    # The rebuilt textbox is a new widget; the tags must have been configured on it, not only on the old one.
+    assert app.focus_history_textbox.tag_cget("eff_good", "foreground") == activitytracker3000.COLOR_ACCENT_ACTIVE_MOUSE
+    assert app.focus_history_textbox.tag_cget("eff_bad", "foreground") == activitytracker3000.COLOR_TEXT_INACTIVE
@@ -0,0 +1,27 @@
+import focus_store
+
+def ends(rows):
+    return [r["end"] for r in rows]
+
+def test_iter_range_bisects_monotonic_ends(tmp_path):
+    store = focus_store.FocusStore(str(tmp_path / "f.afs"))
+    for k in range(20): store.append(k * 100.0, k * 100.0 + 50, 1500, 1200, 80.0)
+    assert ends(store.iter_range(450, 850, chunk=3)) == [450, 550, 650, 750]
+    assert ends(store.iter_range(None, 250)) == [50, 150]
+    assert len(list(store.iter_range())) == 20
+    store.close()
+
+def test_iter_range_after_clock_set_back(tmp_path):
+    # The wall clock went back an hour after the fifth session, so end times are no longer sorted.
+    path = str(tmp_path / "f.afs"); store = focus_store.FocusStore(path)
+    end_times = [1000.0, 2000.0, 3000.0, 4000.0, 5000.0, 1600.0, 2600.0, 3600.0, 6000.0]
+    for e in end_times: store.append(e - 1500, e, 1500, 1000, 66.7)
+    expected = [e for e in end_times if 1500 <= e < 3500]
+    assert ends(store.iter_range(1500, 3500, chunk=2)) == expected
+    assert ends(store.iter_range(5500, None)) == [6000.0]
+    assert ends(store.iter_range(7000, None)) == []
+    # The same from a reopened store, where the index is rebuilt from the file.
+    store.close(); reopened = focus_store.FocusStore(path, writable=False)
+    assert ends(reopened.iter_range(1500, 3500)) == expected
+    assert ends(reopened.iter_range()) == end_times
+    reopened.close()
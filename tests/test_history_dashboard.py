@@ -0,0 +1,47 @@
+import math
+
+import pytest
+
+np = pytest.importorskip("numpy")
+history_dashboard = pytest.importorskip("history_dashboard") # needs numpy and customtkinter
+
+SIZES = (1, 2, 3, 7, 64, 100, 1000, 1827)
+
+def snapped_days(n, t0, t1, columns, c):
+    # The days column c covers once its edges are snapped to the runs of the pyramid level it reads: from the run
+    # holding its first day up to the run holding the next column's first day (the partial last run at the end of
+    # the data), and at least one run.
+    w = (t1 - t0) / columns; level = min(max(0, math.ceil(math.log2(n))), int(math.log2(w))) if w >= 2 else 0
+    runs = -(-n // (1 << level)); edge = lambda x: min(n, max(0, math.floor(x)))
+    first = edge(t0 + w * c) >> level; nxt = edge(t0 + w * (c + 1))
+    last = max(first + 1, runs if nxt >= n else nxt >> level)
+    return first << level, min(n, last << level), level
+
+def test_envelope_matches_brute_force_over_snapped_ranges():
+    rng = np.random.default_rng(25)
+    for n in SIZES:
+        values = rng.random(n) * 10; p = history_dashboard.MinMaxPyramid(values)
+        for _ in range(100):
+            columns = int(rng.integers(1, 900)); t0 = float(rng.uniform(-n * 0.5, n)); t1 = t0 + float(rng.uniform(1, n * 1.5 + 7))
+            mins, maxs, means, in_range = p.envelope(t0, t1, columns)
+            assert len(mins) == len(maxs) == len(means) == len(in_range) == columns
+            w = (t1 - t0) / columns
+            for c in np.flatnonzero(in_range):
+                a, b, level = snapped_days(n, t0, t1, columns, c)
+                # Snapping moves either end of the column's own days by less than one run.
+                day_a = min(n - 1, max(0, math.floor(t0 + w * c))); day_b = min(n, max(day_a + 1, math.floor(t0 + w * (c + 1))))
+                assert 0 <= day_a - a < (1 << level) and abs(b - day_b) < (1 << level)
+                assert mins[c] == values[a:b].min() and maxs[c] == values[a:b].max(), (n, t0, t1, columns, c)
+                assert means[c] == pytest.approx(values[day_a:day_b].mean())
+
+def test_set_last_matches_a_rebuild():
+    rng = np.random.default_rng(26)
+    for n in SIZES:
+        values = rng.random(n) * 10; p = history_dashboard.MinMaxPyramid(values)
+        # Today's value going up past every other day, down below them and back in between.
+        for v in (99.0, -5.0, 3.5, float(values[-1])):
+            values[-1] = v; p.set_last(v); q = history_dashboard.MinMaxPyramid(values)
+            assert len(p.mins) == len(q.mins)
+            for a, b in zip(p.mins + p.maxs, q.mins + q.maxs): assert np.array_equal(a, b), (n, v)
+            assert np.allclose(p.csum, q.csum)
+            for got, want in zip(p.envelope(0, n, 37), q.envelope(0, n, 37)): assert np.allclose(got, want)
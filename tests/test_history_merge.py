@@ -0,0 +1,88 @@
+import itertools
+import os
+import shutil
+
+import pytest
+
+import activity_storage
+import history_merge
+
+def record(active, keys, longest=0.0, last=0.0):
+    return {"total_active_seconds_today": float(active), "keystrokes_today": keys, "max_active_seconds_today": float(longest),
+            "last_activity_duration": float(last)}
+
+@pytest.fixture
+def device_logs(tmp_path, monkeypatch):
+    # Three devices, each publishing some days more than once (a later save of the same day), at distinct times.
+    clock = itertools.count(1_700_000_000)
+    monkeypatch.setattr(history_merge.time, "time", lambda: float(next(clock)))
+    src = tmp_path / "devices"
+    for device, rounds in {
+        "laptop": [[("2024-01-01", record(100, 10, 50, 5)), ("2024-01-02", record(10, 1))], [("2024-01-02", record(20, 2, 20, 7))]],
+        "desktop": [[("2024-01-02", record(300, 30, 90, 3))], [("2024-01-03", record(5, 0))], [("2024-01-02", record(400, 40, 95, 4))]],
+        "work-pc": [[("2024-01-01", record(7, 70, 70, 1)), ("2024-01-03", record(1, 1))]],
+    }.items():
+        pub = history_merge.DevicePublisher(str(src), device)
+        for days in rounds: pub.publish(days)
+    return src
+
+def merge_into(sync_dir, out_dir):
+    os.makedirs(out_dir, exist_ok=True)
+    merger = history_merge.HistoryMerger(str(sync_dir), os.path.join(out_dir, "state.json"), os.path.join(out_dir, "merged.json"))
+    return merger, merger.merge()
+
+def merged_file(out_dir):
+    return activity_storage.JournalStore(os.path.join(out_dir, "merged.json")).load_all()
+
+def test_merge_combines_devices(device_logs, tmp_path):
+    merger, result = merge_into(device_logs, tmp_path / "out")
+    day = merger.merged()["2024-01-02"]
+    assert day["total_active_seconds_today"] == 420.0 and day["keystrokes_today"] == 42 # the laptop's and desktop's latest
+    assert day["max_active_seconds_today"] == 95.0 and day["last_activity_duration"] == 4.0 # the desktop reported last
+    assert result["changed_days"] == ["2024-01-01", "2024-01-02", "2024-01-03"]
+    assert merged_file(tmp_path / "out") == merger.merged()
+
+def test_rerunning_a_merge_changes_nothing(device_logs, tmp_path):
+    out = tmp_path / "out"; merger, _ = merge_into(device_logs, out); first = merged_file(out)
+    journal = os.path.join(out, "merged.journal"); size = os.path.getsize(journal)
+    _, again = merge_into(device_logs, out)
+    assert again["logs_read"] == 0 and again["days_changed"] == 0
+    assert os.path.getsize(journal) == size and merged_file(out) == first
+    # Forgetting the read positions re-reads every line; the per-device versions make that harmless.
+    os.unlink(os.path.join(out, "state.json")); os.unlink(os.path.join(out, "state.json.sources"))
+    _, redo = merge_into(device_logs, out)
+    assert redo["logs_read"] == 3 and merged_file(out) == first
+
+def test_merge_only_appends_changed_days(device_logs, tmp_path):
+    out = tmp_path / "out"; merge_into(device_logs, out)
+    snapshot = os.path.join(out, "merged.json")
+    before = os.path.getmtime(snapshot) if os.path.exists(snapshot) else None
+    history_merge.DevicePublisher(str(device_logs), "laptop").publish([("2024-01-03", record(9, 9))])
+    _, result = merge_into(device_logs, out)
+    assert result["changed_days"] == ["2024-01-03"]
+    assert (os.path.getmtime(snapshot) if os.path.exists(snapshot) else None) == before # the snapshot was not rewritten
+    assert merged_file(out)["2024-01-03"]["total_active_seconds_today"] == 15.0
+
+@pytest.mark.parametrize("order", list(itertools.permutations(["laptop", "desktop", "work-pc"])))
+def test_merge_result_does_not_depend_on_the_order_logs_arrive(device_logs, tmp_path, order):
+    # Reference: everything merged at once. Then the logs arrive one at a time in every order, merged after each.
+    ref, _ = merge_into(device_logs, tmp_path / "ref")
+    sync = tmp_path / "sync"; sync.mkdir(); out = tmp_path / "out"
+    for device in order:
+        shutil.copy(history_merge.device_log_path(str(device_logs), device), sync)
+        merger, _ = merge_into(sync, out)
+    assert merger.merged() == ref.merged()
+    assert merged_file(out) == merged_file(tmp_path / "ref")
+
+def test_merge_with_a_tie_in_publish_time_does_not_depend_on_the_order(tmp_path, monkeypatch):
+    monkeypatch.setattr(history_merge.time, "time", lambda: 1_700_000_000.0)
+    src = tmp_path / "devices"
+    history_merge.DevicePublisher(str(src), "a").publish([("2024-01-01", record(1, 1, 1, 11))])
+    history_merge.DevicePublisher(str(src), "b").publish([("2024-01-01", record(2, 2, 2, 22))])
+    results = []
+    for name, order in (("ab", ["a", "b"]), ("ba", ["b", "a"])):
+        sync = tmp_path / f"sync-{name}"; sync.mkdir()
+        for device in order:
+            shutil.copy(history_merge.device_log_path(str(src), device), sync); merger, _ = merge_into(sync, tmp_path / f"out-{name}")
+        results.append(merger.merged())
+    assert results[0] == results[1]
@@ -0,0 +1,936 @@
+import argparse
+import collections
+import datetime
+import itertools
+import json
+import math
+import operator
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import time
+import types
+from typing import Optional, List, Dict, Any, Tuple, Mapping, TYPE_CHECKING
+from activity_state import format_hms_string
+import activity_metrics
+import activity_rates
+import activity_recorder
+import activity_scheduler
+import activity_state
+import activity_storage
+import activity_timeline
+import focus_store
+if TYPE_CHECKING: import history_db
+
+# --- Configuration ---
+DATA_FILE = "mouse_activity_log.json"
+HISTORY_DB_FILE = "activity_history.db" # Indexed SQLite copy of the history; None disables it
+FOCUS_STORE_FILE = "focus_sessions.afs" # Every focus session, pageable by the GUI (focus_store.py); None disables it
+TIMELINE_DIR = "timeline" # Per-second activity timelines (activity_timeline.py); None disables them
+SYNC_DIR = None # Shared folder for merging several machines' histories (history_merge.py); None disables publishing
+DEVICE_ID_FILE = "device_id" # This machine's ID in SYNC_DIR, created on first use
+RECORD_INPUT_DIR = None # Raw input recordings for re-processing (activity_recorder.py), e.g. "recordings"; None disables them
+SAVE_INTERVAL = 60.0
+INITIAL_INACTIVITY_TIMEOUT = 5.0
+LONG_INACTIVITY_THRESHOLD = 600.0
+INITIAL_FOCUS_MINUTES = 25
+INITIAL_BREAK_MINUTES = 5
+IPC_SOCKET_PATH = "activitytracker3000.sock"
+IPC_WATCH_KEEPALIVE = 5.0 # seconds between repeated event counters on a "watch" connection, so a gone client is noticed
+# Mouse motion coalescing. 0 handles every motion event; >0 buffers raw points and integrates the path once per
+# window (or every MOUSE_COALESCE_MAX_POINTS points). See on_move_coalesced for the error bound.
+MOUSE_COALESCE_WINDOW = 0.05
+MOUSE_COALESCE_MAX_POINTS = 64
+EVENT_BACKLOG = 500 # Engine log messages kept for clients that poll with events_since()
+# Longest the tracking loop sleeps between passes. Totals are exact at any rate (they are accounted from elapsed
+# monotonic time); the heartbeat only bounds how late midnight or a timed-break end can be noticed after a clock change.
+WALL_CLOCK_RECHECK = 60.0
+WALL_DEADLINE_TOLERANCE = 0.25 # wall vs monotonic drift after which wall-clock deadlines are re-anchored
+CLOCK_GAP_TOLERANCE = 5.0 # wall vs monotonic drift over one span that is reported as a suspend or clock change
+METRICS_ENABLED = True # False (or --no-metrics) turns every metric update into a no-op and serves nothing
+METRICS_PORT = 9478 # Prometheus text format on http://127.0.0.1:<port>/metrics; None disables the endpoint
+METRICS_DUMP_FILE = "metrics.prom" # Final metrics written on exit; None disables
+# --- End Configuration ---
+
+_current_inactivity_timeout = INITIAL_INACTIVITY_TIMEOUT
+
+_INITIAL_STATE = {
+    "last_mouse_position": None, "mouse_last_pos_for_distance": None,
+    "mouse_total_distance_today": 0.0, "keystrokes_today": 0,
+    "last_movement_time": time.time(), "last_keyboard_activity_time": time.time(),
+    "total_active_seconds_today": 0.0, "total_idle_seconds_today": 0.0,
+    "max_idle_seconds_today": 0.0, "max_active_seconds_today": 0.0,
+    "current_activity_start_time": time.time(),
+    "current_idle_start_time": None,
+    "last_activity_duration": 0.0,
+    "last_inactivity_duration": 0.0,
+    "current_day_string": datetime.date.today().isoformat(),
+    "running": True, "prev_overall_active_state": False,
+    "last_activity_time": time.time(),
+    "focus_duration_seconds": INITIAL_FOCUS_MINUTES * 60,
+    "break_duration_seconds": INITIAL_BREAK_MINUTES * 60,
+    "timer_mode": "focus",
+    "timer_seconds_remaining": INITIAL_FOCUS_MINUTES * 60,
+    "mouse_clicks_today": 0,
+    "current_focus_active_seconds": 0.0,
+    "current_focus_start_time": time.time(), "current_focus_interruptions": 0, "current_focus_paused_seconds": 0.0,
+    "focus_session_log_version": 0,
+    "last_tick_time": None, "last_tick_monotonic": None,
+}
+
+class EngineState:
+    # The engine's counters and timers, one slot per field of _INITIAL_STATE; written under state_lock. Item access
+    # and update() are kept because activity_state runs the same transitions on plain dicts for replay.
+    __slots__ = tuple(_INITIAL_STATE) + ("version",)
+    __setitem__ = object.__setattr__
+    def __init__(self, values: Dict[str, Any]):
+        self.update(values); self.version = 0
+
+    def __getitem__(self, key: str) -> Any:
+        try: return getattr(self, key)
+        except AttributeError: raise KeyError(key) from None
+
+    def update(self, values: Dict[str, Any]):
+        for k, v in values.items(): setattr(self, k, v)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return dict(zip(_INITIAL_STATE, _get_state_fields(self)))
+
+_get_state_fields = operator.attrgetter(*_INITIAL_STATE)
+
+app_state = EngineState(_INITIAL_STATE)
+activity_metrics.set_enabled(METRICS_ENABLED)
+state_lock = activity_metrics.TimedLock("state_lock")
+history_store = activity_storage.JournalStore(DATA_FILE)
+_history_db = None; _history_db_failed = False
+_db_focus_sessions: List[Tuple[str, str, int, float]] = [] # completed focus periods waiting for the next save to reach the history DB
+_timeline: Optional[activity_timeline.DayTimeline] = None
+_mouse_recorder: Optional[activity_recorder.MouseRecorder] = None
+_key_recorder: Optional[activity_recorder.KeyRecorder] = None
+_session_recorder: Optional[activity_recorder.SessionRecorder] = None
+_focus_store: Optional[focus_store.FocusStore] = None
+_publisher = None; _publisher_seeded = False
+_tracking_wakeup = threading.Event()
+_m_tracking_pass = activity_metrics.histogram("activitytracker_tracking_pass_seconds", "Duration of one tracking loop pass")
+_m_tracking_overrun = activity_metrics.histogram("activitytracker_tracking_overrun_seconds", "How late the tracking loop woke after its deadline")
+_m_save = activity_metrics.histogram("activitytracker_save_seconds", "save_daily_data latency")
+_m_save_bytes = activity_metrics.counter("activitytracker_save_bytes", "Bytes written to the history journal and snapshot")
+_m_input_rate = {name: activity_metrics.gauge("activitytracker_input_events_per_second", "Input events per second over the last tracking pass", listener=name)
+                 for name in ("mouse", "keyboard")}
+
+def format_ms_string(s: float) -> str:
+    s=max(0,s); m=s//60; s%=60; return f"{int(m):02d}:{int(s):02d}"
+
+_active_engine: Optional["TrackerEngine"] = None
+
+def wake_tracking_loop():
+    _tracking_wakeup.set()
+
+def _next_midnight_timestamp(now: float) -> float:
+    next_day = datetime.date.fromtimestamp(now) + datetime.timedelta(days=1)
+    return datetime.datetime.combine(next_day, datetime.time()).timestamp()
+
+def project_live_state(s: Dict[str, Any], now: float, mono_now: Optional[float] = None) -> Dict[str, Any]:
+    # The tracking loop only accounts time when it wakes up; extend a state copy's totals up to `now` for display.
+    last_tick = s.get("last_tick_time")
+    if last_tick is None: return s
+    mono_tick = s.get("last_tick_monotonic")
+    elapsed = mono_now - mono_tick if mono_now is not None and mono_tick is not None else now - last_tick
+    if elapsed <= 0: return s
+    was_active = s["prev_overall_active_state"]
+    active_part = activity_state.split_active_interval(was_active, s["last_activity_time"], now - elapsed, now, _current_inactivity_timeout)
+    idle_part = elapsed - active_part
+    s["total_active_seconds_today"] += active_part
+    if s["current_idle_start_time"] is not None or (was_active and idle_part > 0): s["total_idle_seconds_today"] += idle_part
+    if s["timer_mode"] == "focus": s["current_focus_active_seconds"] += active_part
+    s["timer_seconds_remaining"] -= elapsed
+    return s
+
+class InputAccumulator:
+    # Counter block owned by one listener thread. Only that thread writes the running totals; readers drain them
+    # under state_lock by remembering what they already folded into app_state, so the callbacks never take a lock.
+    __slots__ = ("events", "clicks", "keystrokes", "distance", "last_pos", "last_activity_time", "last_movement_time",
+                 "last_keyboard_activity_time", "anchor_generation", "drained_clicks", "drained_keystrokes", "drained_distance",
+                 "path", "window_start")
+    def __init__(self):
+        self.events = 0; self.clicks = 0; self.keystrokes = 0; self.distance = 0.0; self.last_pos = None
+        self.path = []; self.window_start = 0.0
+        self.last_activity_time = 0.0; self.last_movement_time = 0.0; self.last_keyboard_activity_time = 0.0
+        self.anchor_generation = 0
+        self.drained_clicks = 0; self.drained_keystrokes = 0; self.drained_distance = 0.0
+
+_mouse_input = InputAccumulator()
+_keyboard_input = InputAccumulator()
+_mouse_anchor_generation = 0
+# 1/5/15-minute rates; each ring is advanced only by the listener thread that owns the total it samples.
+_key_rate = activity_rates.RollingCounter(); _click_rate = activity_rates.RollingCounter(); _distance_rate = activity_rates.RollingCounter()
+# Read from the accumulators at scrape time, so the listener callbacks pay nothing for them.
+activity_metrics.counter("activitytracker_input_events", "Input events handled by the listener", fn=lambda: _mouse_input.events, listener="mouse")
+activity_metrics.counter("activitytracker_input_events", "Input events handled by the listener", fn=lambda: _keyboard_input.events, listener="keyboard")
+
+def input_rates(now: float) -> Dict[str, Tuple[float, ...]]:
+    # Keys, clicks and pixels per minute over each of activity_rates.RATE_WINDOWS, ending at `now`.
+    return {"keys": _key_rate.per_minute(now, _keyboard_input.keystrokes), "clicks": _click_rate.per_minute(now, _mouse_input.clicks),
+            "pixels": _distance_rate.per_minute(now, _mouse_input.distance)}
+
+def reset_mouse_distance_anchor():
+    # The next move after a reset must not add the jump from the pre-reset position; the mouse thread drops its anchor.
+    global _mouse_anchor_generation
+    _mouse_anchor_generation += 1
+    app_state.mouse_last_pos_for_distance = None
+
+def latest_input_time() -> float:
+    return max(_mouse_input.last_activity_time, _keyboard_input.last_activity_time)
+
+def drain_input_locked():
+    # Caller holds state_lock. Folds everything the listeners recorded since the previous drain into app_state.
+    m = _mouse_input; k = _keyboard_input
+    d = m.distance; app_state.mouse_total_distance_today += d - m.drained_distance; m.drained_distance = d
+    c = m.clicks; app_state.mouse_clicks_today += c - m.drained_clicks; m.drained_clicks = c
+    ks = k.keystrokes; app_state.keystrokes_today += ks - k.drained_keystrokes; k.drained_keystrokes = ks
+    pos = m.last_pos
+    if pos is not None: app_state.last_mouse_position = pos; app_state.mouse_last_pos_for_distance = pos
+    if m.last_movement_time > app_state.last_movement_time: app_state.last_movement_time = m.last_movement_time
+    if k.last_keyboard_activity_time > app_state.last_keyboard_activity_time: app_state.last_keyboard_activity_time = k.last_keyboard_activity_time
+    last = max(m.last_activity_time, k.last_activity_time)
+    if last > app_state.last_activity_time: app_state.last_activity_time = last
+
+# The state readers see: (version, read-only copy of app_state, what had been drained from the accumulators when it
+# was taken). Writers replace the whole tuple with one assignment when they finish a change, so readers take it
+# without state_lock and never see half of a pass; the input recorded since is added from the accumulators.
+# The copy is the only one made per version: snapshot() hands it out as is, under a small dict of live fields.
+_published: Tuple[int, Any, Tuple[float, int, int]] = (0, types.MappingProxyType(app_state.as_dict()), (0.0, 0, 0))
+
+def publish_state_locked():
+    # Caller holds state_lock and has finished changing app_state.
+    global _published
+    m = _mouse_input; k = _keyboard_input; app_state.version += 1
+    _published = (app_state.version, types.MappingProxyType(app_state.as_dict()), (m.drained_distance, m.drained_clicks, k.drained_keystrokes))
+
+def published_state() -> Tuple[int, Any]:
+    # The latest published state and its version, without copying; a reader holding an equal version can skip its work.
+    version, state, _ = _published
+    return version, state
+
+def add_pending_input(s: Dict[str, Any], drained: Tuple[float, int, int]):
+    # drain_input_locked for a reader's copy: adds what the listeners recorded after the copy was published.
+    m = _mouse_input; k = _keyboard_input
+    s["mouse_total_distance_today"] += max(0.0, m.distance - drained[0])
+    s["mouse_clicks_today"] += max(0, m.clicks - drained[1]); s["keystrokes_today"] += max(0, k.keystrokes - drained[2])
+    if m.last_pos is not None: s["last_mouse_position"] = m.last_pos
+    s["last_movement_time"] = max(s["last_movement_time"], m.last_movement_time)
+    s["last_keyboard_activity_time"] = max(s["last_keyboard_activity_time"], k.last_keyboard_activity_time)
+    s["last_activity_time"] = max(s["last_activity_time"], m.last_activity_time, k.last_activity_time)
+
+def on_move(x,y):
+    eng=_active_engine
+    if eng and (eng.session_globally_paused or eng.timed_break_active): return
+    acc=_mouse_input; now=time.time()
+    rec=_mouse_recorder
+    if rec is not None: rec.move(now,x,y)
+    if acc.anchor_generation != _mouse_anchor_generation: acc.last_pos=None; acc.anchor_generation=_mouse_anchor_generation
+    last_pos=acc.last_pos
+    if last_pos is not None:
+        _distance_rate.advance(now,acc.distance); px,py=last_pos; acc.distance+=math.sqrt((x-px)**2+(y-py)**2)
+    acc.last_pos=(x,y); acc.last_movement_time=now; acc.last_activity_time=now; acc.events+=1
+    # Written before reading the flag; tracking_loop does the mirror image, so one of us always notices the other.
+    if not app_state.prev_overall_active_state and not _tracking_wakeup.is_set(): _tracking_wakeup.set()
+
+def on_move_coalesced(x,y):
+    # Motion events only append the point; the path is integrated when the window or the buffer fills. The first
+    # move after a quiet spell flushes at once, so becoming active is never delayed.
+    # Error bound: every buffered segment is still summed exactly, so mouse_total_distance_today is only ever short
+    # by the points buffered since the last flush (< MOUSE_COALESCE_WINDOW s or MOUSE_COALESCE_MAX_POINTS points of
+    # motion), and those are credited by the next motion event. Only when that next event falls after a day change
+    # or a reset is the tail booked there instead of here. last_activity_time/last_movement_time lag the real last
+    # move by the same window, so inactivity can begin at most MOUSE_COALESCE_WINDOW seconds early.
+    eng=_active_engine
+    if eng and (eng.session_globally_paused or eng.timed_break_active): return
+    acc=_mouse_input; path=acc.path; path.append((x,y)); now=time.time()
+    rec=_mouse_recorder
+    if rec is not None: rec.move(now,x,y)
+    if now-acc.window_start<MOUSE_COALESCE_WINDOW and len(path)<MOUSE_COALESCE_MAX_POINTS: return
+    if acc.anchor_generation != _mouse_anchor_generation: acc.last_pos=None; acc.anchor_generation=_mouse_anchor_generation
+    last_pos=acc.last_pos
+    d=sum(map(math.dist, path, itertools.islice(path, 1, None)))
+    if last_pos is not None: d+=math.dist(last_pos, path[0])
+    _distance_rate.advance(now,acc.distance); acc.distance+=d; acc.last_pos=path[-1]; acc.events+=len(path); path.clear()
+    acc.window_start=now; acc.last_movement_time=now; acc.last_activity_time=now
+    if not app_state.prev_overall_active_state and not _tracking_wakeup.is_set(): _tracking_wakeup.set()
+
+def on_key_press(key):
+    eng=_active_engine
+    if eng and (eng.session_globally_paused or eng.timed_break_active): return
+    acc=_keyboard_input; now=time.time(); _key_rate.advance(now,acc.keystrokes)
+    acc.last_keyboard_activity_time=now; acc.last_activity_time=now; acc.keystrokes+=1; acc.events+=1
+    tl=_timeline
+    if tl is not None: tl.add_key(now)
+    rec=_key_recorder
+    if rec is not None: rec.key(now)
+    if not app_state.prev_overall_active_state and not _tracking_wakeup.is_set(): _tracking_wakeup.set()
+
+def on_click(x, y, button, pressed):
+    eng=_active_engine
+    if eng and (eng.session_globally_paused or eng.timed_break_active): return
+    if pressed:
+        acc=_mouse_input; now=time.time(); _click_rate.advance(now,acc.clicks)
+        acc.last_activity_time=now; acc.clicks+=1; acc.events+=1
+        tl=_timeline
+        if tl is not None: tl.add_click(now)
+        rec=_mouse_recorder
+        if rec is not None: rec.click(now)
+        if not app_state.prev_overall_active_state and not _tracking_wakeup.is_set(): _tracking_wakeup.set()
+
+def load_daily_data():
+    today_str = datetime.date.today().isoformat()
+    data_today = {k: (0 if k in activity_storage.INT_DAY_FIELDS else 0.0) for k in activity_storage.DAY_RECORD_FIELDS}
+    try: raw_today = history_store.read_day(today_str)
+    except Exception as e: print(f"Warning loading {DATA_FILE}: {e}"); raw_today = None
+    if isinstance(raw_today, dict):
+        for key_ in data_today:
+            if key_ in activity_storage.INT_DAY_FIELDS: data_today[key_] = int(raw_today.get(key_,0))
+            else: data_today[key_] = float(raw_today.get(key_,0.0))
+    elif isinstance(raw_today,(float,int)): data_today["total_active_seconds_today"]=float(raw_today)
+    with state_lock:
+        app_state.update(data_today)
+        app_state.update({"current_day_string":today_str,"current_activity_start_time":time.time(),"current_idle_start_time": None})
+        publish_state_locked()
+    open_day_timeline(today_str)
+
+def open_day_timeline(day: str):
+    # The previous day's timeline is flushed but not closed: a listener may still hold it for one more event.
+    global _timeline
+    previous = _timeline
+    if previous is not None and previous.day == day: return
+    if previous is not None:
+        try: previous.flush()
+        except Exception as e: print(f"Error flushing timeline {previous.path}: {e}")
+    if not TIMELINE_DIR: _timeline = None; return
+    try: _timeline = activity_timeline.DayTimeline.open_for_day(day, TIMELINE_DIR, writable=True)
+    except Exception as e: _timeline = None; print(f"Timeline unavailable ({TIMELINE_DIR}): {e}")
+
+def open_input_recorders():
+    # Listener-owned streams: each recorder is appended to only by its own listener thread.
+    global _mouse_recorder, _key_recorder, _session_recorder
+    if not RECORD_INPUT_DIR or _session_recorder is not None: return
+    try:
+        _mouse_recorder = activity_recorder.MouseRecorder(RECORD_INPUT_DIR); _key_recorder = activity_recorder.KeyRecorder(RECORD_INPUT_DIR)
+        _session_recorder = activity_recorder.SessionRecorder(RECORD_INPUT_DIR)
+    except Exception as e: _mouse_recorder = _key_recorder = _session_recorder = None; print(f"Input recorder unavailable ({RECORD_INPUT_DIR}): {e}")
+
+def mark_session(kind: int, t: float):
+    rec = _session_recorder
+    if rec is not None:
+        try: rec.mark(kind, t)
+        except Exception as e: print(f"Error writing session mark to {RECORD_INPUT_DIR}: {e}")
+
+def open_focus_store():
+    global _focus_store
+    if not FOCUS_STORE_FILE or _focus_store is not None: return
+    try: _focus_store = focus_store.FocusStore(FOCUS_STORE_FILE)
+    except Exception as e: _focus_store = None; print(f"Focus session store unavailable ({FOCUS_STORE_FILE}): {e}")
+
+def get_history_db() -> Optional["history_db.HistoryDB"]:
+    # Opened on the first save rather than at startup (sqlite3 is imported here for the same reason). Only called
+    # from save_daily_data after it has released state_lock: opening and writing SQLite never blocks the listeners.
+    global _history_db, _history_db_failed
+    if _history_db is None and HISTORY_DB_FILE and not _history_db_failed:
+        try: import history_db; _history_db = history_db.HistoryDB(HISTORY_DB_FILE)
+        except Exception as e: _history_db_failed = True; print(f"History DB unavailable ({HISTORY_DB_FILE}): {e}")
+    return _history_db
+
+def publish_for_merge(day_s: str, record: Dict[str, Any]):
+    # Appends today's record to this device's log in SYNC_DIR when it changed. The first call of a run also
+    # publishes every other local day that differs from the log (all of them on the first run on this machine).
+    global _publisher, _publisher_seeded
+    if not SYNC_DIR: return
+    try:
+        if _publisher is None:
+            import history_merge
+            _publisher = history_merge.DevicePublisher(SYNC_DIR, history_merge.device_id(DEVICE_ID_FILE))
+        if not _publisher_seeded: _publisher.publish(history_store.iter_days()); _publisher_seeded = True
+        _publisher.publish([(day_s, record)])
+    except Exception as e: print(f"Error publishing history to {SYNC_DIR}: {e}")
+
+def save_daily_data():
+    t0 = time.perf_counter()
+    with state_lock:
+        drain_input_locked()
+        day_s=app_state.current_day_string
+        data_to_save={k:round(app_state[k],2)if isinstance(app_state[k],float)else app_state[k] for k in activity_storage.DAY_RECORD_FIELDS}
+        db_sessions=_db_focus_sessions[:];_db_focus_sessions.clear()
+    try: _m_save_bytes.inc(history_store.append_checkpoint(day_s, data_to_save))
+    except Exception as e:print(f"Error writing to {DATA_FILE}: {e}")
+    tl = _timeline
+    if tl is not None:
+        try: tl.flush()
+        except Exception as e: print(f"Error flushing timeline {tl.path}: {e}")
+    for rec in (_mouse_recorder, _key_recorder):
+        if rec is not None:
+            try: rec.flush()
+            except Exception as e: print(f"Error flushing input recording to {RECORD_INPUT_DIR}: {e}")
+    fs = _focus_store
+    if fs is not None:
+        try: fs.flush()
+        except Exception as e: print(f"Error writing to {FOCUS_STORE_FILE}: {e}")
+    db = get_history_db()
+    if db is not None:
+        try: db.upsert_day(day_s, data_to_save)
+        except Exception as e: print(f"Error writing to {HISTORY_DB_FILE}: {e}")
+        for row in db_sessions:
+            try: db.add_focus_session(*row)
+            except Exception as e: print(f"Error writing focus session to {HISTORY_DB_FILE}: {e}")
+    publish_for_merge(day_s, data_to_save)
+    _m_save.observe(time.perf_counter() - t0)
+
+def log_focus_session_locked(end: float, planned_seconds: float, active_seconds: float, completed: bool = True) -> float:
+    # Records the focus period ending at `end` and starts the counters of the next one. Called under state_lock;
+    # the store only buffers the record and the history DB row is only queued, the periodic save writes both.
+    # Returns the effectiveness.
+    effectiveness = (active_seconds / planned_seconds) * 100 if planned_seconds > 0 else 0.0
+    fs = _focus_store
+    if fs is not None:
+        try: fs.append(app_state.current_focus_start_time, end, planned_seconds, active_seconds, effectiveness,
+                       app_state.current_focus_paused_seconds, app_state.current_focus_interruptions, completed)
+        except Exception as e: print(f"Error writing to {FOCUS_STORE_FILE}: {e}")
+    if completed and HISTORY_DB_FILE and not _history_db_failed:
+        _db_focus_sessions.append((_day_of(end), time.strftime("%H:%M:%S", time.localtime(end)), int(planned_seconds / 60), effectiveness))
+    app_state.update({"current_focus_start_time": end, "current_focus_interruptions": 0, "current_focus_paused_seconds": 0.0})
+    app_state.focus_session_log_version += 1
+    return effectiveness
+
+def _day_of(t: float) -> str:
+    return datetime.date.fromtimestamp(t).isoformat()
+
+class TrackerEngine:
+    # Everything that keeps tracking going without a window: the input listeners, app_state, the tracking loop,
+    # pause/timed-break state, the focus/break timer and persistence. Front ends (the CTk window in-process, or
+    # clients over the IPC socket) only read snapshot()/events_since() and call the command methods.
+    def __init__(self):
+        self.app_launch_time = time.time()
+        self.session_globally_paused = False
+        self.session_pause_start_time = None
+        self.total_session_time_actively_paused = 0.0
+        self.timed_break_active = False
+        self.timed_break_duration_seconds = 0 
+        self.timed_break_end_time = None
+        self.timed_break_initiated_pause = False
+        self.tracking_thread: Optional[threading.Thread] = None
+        self._last_save = 0.0; self._last_inactivity_log = 0; self._next_midnight: Optional[float] = None
+        self._scheduler = activity_scheduler.DeadlineScheduler(); self._wall_targets: Dict[str, float] = {}; self._wall_offset = 0.0
+        self._marked_paused = False; self._paused_at: Optional[float] = None; self._rate_sample: Optional[Tuple[float, int, int]] = None
+        self._control_lock = threading.RLock()
+        self._events = collections.deque(maxlen=EVENT_BACKLOG); self._event_seq = 0; self._events_lock = threading.Lock()
+        self._events_changed = threading.Condition(self._events_lock)
+        activity_metrics.gauge("activitytracker_event_backlog", "Engine log messages held for events_since() clients", fn=lambda: len(self._events))
+
+    # --- Event log ---
+    def log(self, message: str):
+        with self._events_lock:
+            self._event_seq += 1; self._events.append((self._event_seq, time.time(), message))
+            self._events_changed.notify_all()
+
+    def events_since(self, seq: int) -> Tuple[int, List[Tuple[int, float, str]]]:
+        with self._events_lock:
+            return self._event_seq, [e for e in self._events if e[0] > seq]
+
+    @property
+    def event_seq(self) -> int:
+        # Bumped by every logged state change; front ends poll it to know when a full snapshot is worth taking.
+        return self._event_seq
+
+    def wait_event_seq(self, seq: int, timeout: Optional[float] = None) -> int:
+        # Blocks until the event counter differs from seq (or the timeout passes) and returns it; the IPC "watch"
+        # command pushes it to clients with this, so they never have to poll.
+        with self._events_changed:
+            self._events_changed.wait_for(lambda: self._event_seq != seq, timeout)
+            return self._event_seq
+
+    # --- Lifecycle ---
+    def start(self):
+        global _active_engine
+        _active_engine = self
+        load_daily_data(); open_input_recorders(); open_focus_store()
+        self.start_mouse_listener(); self.start_keyboard_listener(); self.start_tracking_loop()
+
+    def start_mouse_listener(self):
+        try:
+            import pynput.mouse
+            move_handler = on_move_coalesced if MOUSE_COALESCE_WINDOW > 0 else on_move
+            threading.Thread(target=pynput.mouse.Listener(on_move=move_handler, on_click=on_click).start, daemon=True, name="MouseListener").start()
+        except Exception as e: self.log(f"Mouse listener error: {e}")
+    def start_keyboard_listener(self):
+        try:
+            import pynput.keyboard
+            threading.Thread(target=pynput.keyboard.Listener(on_press=on_key_press).start,daemon=True,name="KeyboardListener").start()
+        except Exception as e: self.log(f"Keyboard listener error: {e}")
+    def start_tracking_loop(self):
+        try: self.tracking_thread=threading.Thread(target=self.tracking_loop,daemon=True,name="TrackingLoop");self.tracking_thread.start()
+        except Exception as e: self.log(f"Tracking loop error: {e}")
+
+    def stop(self):
+        with state_lock:app_state.running=False
+        wake_tracking_loop()
+        if self.tracking_thread is not None and self.tracking_thread.is_alive():
+            self.log("Waiting for tracking loop...");self.tracking_thread.join(timeout=0.5)
+        self.log("Final save...");save_daily_data()
+        history_store.join_compaction(timeout=2.0) # a compaction cut off by exit is harmless, but would only redo
+
+    # --- Snapshot ---
+    def snapshot(self, now: Optional[float] = None) -> Mapping[str, Any]:
+        # The published state with totals projected to `now`, plus the session flags. The published mapping is shared,
+        # not copied: everything this call adds or changes goes into the ChainMap's own front dict. Takes no
+        # state_lock, so polling front ends never hold up the listeners or the tracking loop.
+        mono_now = time.monotonic() if now is None else None
+        now = time.time() if now is None else now
+        version, state, drained = _published
+        s = collections.ChainMap({"state_version": version}, state); add_pending_input(s, drained)
+        fs = _focus_store; s["focus_session_total"] = len(fs) if fs is not None else 0
+        s["input_rates"] = input_rates(now)
+        s = project_live_state(s, now, mono_now)
+        with self._control_lock:
+            s.update({
+                "snapshot_time": now, "app_launch_time": self.app_launch_time,
+                "session_globally_paused": self.session_globally_paused, "session_pause_start_time": self.session_pause_start_time,
+                "total_session_time_actively_paused": self.total_session_time_actively_paused,
+                "timed_break_active": self.timed_break_active, "timed_break_duration_seconds": self.timed_break_duration_seconds,
+                "timed_break_end_time": self.timed_break_end_time, "inactivity_timeout": _current_inactivity_timeout,
+            })
+        with self._events_lock: s["event_seq"] = self._event_seq
+        return s
+
+    def focus_sessions(self, offset: int = 0, count: int = 20) -> Dict[str, Any]:
+        # A page of the focus session history, newest first, and how many sessions there are in all.
+        fs = _focus_store
+        if fs is None: return {"total": 0, "sessions": []}
+        return {"total": len(fs), "sessions": fs.page(offset, count)}
+
+    def day_history(self, since: Optional[str] = None) -> Dict[str, Any]:
+        # The saved day records from `since` (ISO date, inclusive) on, oldest first, one row of `fields` per day; the
+        # history charts load this once and then only ask for the days after their newest one. Today's record is
+        # the last save's, the snapshot has the live totals.
+        fields = activity_storage.DAY_RECORD_FIELDS; rows = []
+        for day, record in history_store.stream_days():
+            if since and day < since: continue
+            if isinstance(record, (int, float)): record = {"total_active_seconds_today": float(record)}
+            elif not isinstance(record, dict): continue
+            rows.append((day, [record.get(f, 0) or 0 for f in fields]))
+        rows.sort(key=lambda r: r[0])
+        return {"fields": list(fields), "days": [d for d, _ in rows], "rows": [r for _, r in rows]}
+
+    # --- Commands ---
+    def manual_pause_session(self):
+        with self._control_lock:
+            if self.timed_break_active or self.session_globally_paused: return
+            self.session_globally_paused = True
+            self.session_pause_start_time = time.time()
+        wake_tracking_loop()
+        self.log("Session Paused Manually.")
+
+    def manual_continue_session(self):
+        with self._control_lock:
+            if self.timed_break_active:
+                self.log(f"Timed break of {self.timed_break_duration_seconds//60}m interrupted by Continue.")
+                self.end_timed_break() 
+            elif self.session_globally_paused and not self.timed_break_active: 
+                if self.session_pause_start_time:
+                    self.total_session_time_actively_paused += (time.time() - self.session_pause_start_time)
+                self.session_globally_paused = False
+                self.session_pause_start_time = None
+                wake_tracking_loop()
+                self.log("Session Continued Manually.")
+
+    def add_or_start_5_min_break(self):
+        with self._control_lock:
+            if self.session_globally_paused and not self.timed_break_active:
+                self.log("Cannot add/start 5min break while session is manually paused.")
+                return
+
+            five_minutes = 5 * 60
+            if self.timed_break_active:
+                if self.timed_break_end_time: 
+                    self.timed_break_end_time += five_minutes
+                    self.timed_break_duration_seconds += five_minutes 
+                    wake_tracking_loop()
+                    remaining = self.timed_break_end_time - time.time()
+                    self.log(f"+5min added to break. New total: {self.timed_break_duration_seconds//60}m. Remaining: {format_ms_string(remaining)}")
+                else:
+                    self.log("Error: Tried to extend break with no end time. Starting new 5min break.")
+                    self.start_timed_break(five_minutes, is_extendable=True) 
+            else:
+                self.start_timed_break(five_minutes, is_extendable=True)
+
+    def start_timed_break(self, duration_seconds: int, is_extendable: bool = False):
+        with self._control_lock:
+            if self.session_globally_paused and not self.timed_break_active:
+                 self.log("Cannot start timed break while session is manually paused.")
+                 return
+            if self.timed_break_active and not is_extendable:
+                self.log("Another timed break is already active. Cannot start a new fixed break.")
+                return
+            
+            self.timed_break_active = True
+            self.timed_break_duration_seconds = duration_seconds 
+            self.timed_break_end_time = time.time() + duration_seconds
+            
+            if not self.session_globally_paused:
+                self.session_globally_paused = True
+                self.session_pause_start_time = time.time()
+                self.timed_break_initiated_pause = True
+            else: 
+                self.timed_break_initiated_pause = False
+            wake_tracking_loop()
+                
+            self.log(f"Timed break for {duration_seconds//60} minutes started.")
+
+    def end_timed_break(self):
+        with self._control_lock:
+            if not self.timed_break_active: return
+            
+            break_duration_minutes = self.timed_break_duration_seconds // 60
+            
+            if self.timed_break_initiated_pause and self.session_pause_start_time:
+                 self.total_session_time_actively_paused += (time.time() - self.session_pause_start_time)
+            
+            self.timed_break_active = False
+            self.timed_break_duration_seconds = 0
+            self.timed_break_end_time = None
+            
+            if self.timed_break_initiated_pause: 
+                self.session_globally_paused = False
+                self.session_pause_start_time = None 
+            
+            self.timed_break_initiated_pause = False
+            wake_tracking_loop()
+            self.log(f"Timed break ({break_duration_minutes}m) finished.")
+
+    def reset_daily_activity_counter(self):
+        now=time.time()
+        with state_lock:
+            drain_input_locked(); reset_mouse_distance_anchor()
+            app_state.update({
+                "total_active_seconds_today":0.0,"total_idle_seconds_today":0.0,
+                "max_idle_seconds_today":0.0,"max_active_seconds_today":0.0,
+                "mouse_total_distance_today":0.0,"keystrokes_today":0,"mouse_clicks_today":0,
+                "last_activity_duration":0.0, "last_inactivity_duration":0.0,
+                "current_idle_start_time":None,"current_activity_start_time":now,
+                "last_activity_time":now,"prev_overall_active_state":True,"mouse_last_pos_for_distance":None
+            })
+            if app_state.last_tick_time is not None: app_state.last_tick_time = now; app_state.last_tick_monotonic = time.monotonic()
+            publish_state_locked()
+        wake_tracking_loop()
+        self.log("Daily stats reset.")
+
+    def apply_timer_settings(self, focus_minutes: int, break_minutes: int):
+        f_m,b_m=int(focus_minutes),int(break_minutes)
+        if not(0<f_m<1000 and 0<b_m<1000):raise ValueError("Durations out of range.")
+        now=time.time()
+        with state_lock:
+            if app_state.timer_mode == "focus" and app_state.current_focus_active_seconds > 0:
+                # The running period is cut short; it is kept (flagged as such) so its active time is not lost.
+                log_focus_session_locked(now, app_state.focus_duration_seconds, app_state.current_focus_active_seconds, completed=False)
+            app_state.current_focus_start_time = now; app_state.current_focus_interruptions = 0; app_state.current_focus_paused_seconds = 0.0
+            app_state.update({"focus_duration_seconds":f_m*60,"break_duration_seconds":b_m*60})
+            app_state.timer_mode = "focus"
+            app_state.timer_seconds_remaining = app_state.focus_duration_seconds
+            app_state.current_focus_active_seconds = 0.0
+            publish_state_locked()
+        wake_tracking_loop()
+        self.log(f"Timer Settings: Focus {f_m}m, Break {b_m}m. Timer reset to Focus.")
+
+    def apply_inactivity_timeout_setting(self, seconds: float):
+        global _current_inactivity_timeout
+        new_timeout=float(seconds)
+        if not(1.0<=new_timeout<=3600.0):raise ValueError("Timeout 1-3600s.")
+        _current_inactivity_timeout=new_timeout; wake_tracking_loop()
+        self.log(f"Inactivity timeout: {_current_inactivity_timeout:.1f}s.")
+
+    def tracking_loop(self):
+        while True:
+            _tracking_wakeup.clear()
+            with state_lock: running = app_state.running
+            if not running: break
+            t0 = time.perf_counter(); deadline = self.tracking_pass(); _m_tracking_pass.observe(time.perf_counter() - t0)
+            if not _tracking_wakeup.wait(max(0.0, deadline - time.monotonic())): _m_tracking_overrun.observe(max(0.0, time.monotonic() - deadline))
+        mark_session(activity_recorder.STOP, time.time())
+        print("Tracking loop finished.")
+
+    def tracking_pass(self) -> float:
+        # One wake-up of the tracking loop: accounts the span since the previous pass, applies activity transitions,
+        # the focus/break timer, midnight and the periodic save, and returns the monotonic time to wake up next.
+        # Spans are measured on the monotonic clock, so wall-clock changes and suspend never add or remove tracked
+        # time; wall time is only used for timestamps, midnight and the timed-break end.
+        # Every deadline lives in self._scheduler under a name, so a pass only acts on what is due and the sleep is
+        # exactly until the earliest deadline.
+        if self._next_midnight is None:
+            self._last_save = time.monotonic(); self._last_inactivity_log = 0; self._next_midnight = _next_midnight_timestamp(time.time())
+            mark_session(activity_recorder.START, time.time())
+            with state_lock: app_state.current_focus_start_time = time.time()
+        active_now_local = False
+        now = time.time(); mono = time.monotonic()
+        if activity_metrics.enabled: self._sample_input_rates(mono)
+        sched = self._scheduler; paused = self.session_globally_paused
+        # Wall-clock deadlines are held as monotonic ones, anchored at the current offset between the clocks; when
+        # the offset moves (clock change, suspend on some platforms) they are anchored again.
+        reanchor = abs((now - mono) - self._wall_offset) > WALL_DEADLINE_TOLERANCE
+        if reanchor: self._wall_offset = now - mono
+        self._schedule_wall("timed_break_end", self.timed_break_end_time if self.timed_break_active else None, now, mono, reanchor)
+        self._schedule_wall("midnight", None if paused else self._next_midnight, now, mono, reanchor)
+        due = sched.pop_due(mono)
+        if "timed_break_end" in due and self.timed_break_active and self.timed_break_end_time and now >= self.timed_break_end_time:
+            self.end_timed_break(); paused = self.session_globally_paused
+        if paused != self._marked_paused:
+            # Marked at the pass that opens or closes the tracked span, so a replay pauses exactly where we did.
+            mark_session(activity_recorder.PAUSE if paused else activity_recorder.RESUME, now); self._marked_paused = paused
+            with state_lock:
+                # Pauses and timed breaks inside a focus period are its interruptions.
+                if app_state.timer_mode != "focus": self._paused_at = None
+                elif paused: app_state.current_focus_interruptions += 1; self._paused_at = now
+                elif self._paused_at is not None: app_state.current_focus_paused_seconds += max(0.0, now - self._paused_at); self._paused_at = None
+        log_msg_parts = []
+        with state_lock: span_wall = app_state.last_tick_time; span_mono = app_state.last_tick_monotonic
+        # A pass is needed while running, and once more right after a pause starts to close the open span.
+        if span_mono is not None or not paused:
+            elapsed = 0.0 if span_mono is None else max(0.0, mono - span_mono)
+            span_start = now - elapsed
+            if span_wall is not None and abs((now - span_wall) - elapsed) > CLOCK_GAP_TOLERANCE:
+                log_msg_parts.append(f"Clock moved {format_hms_string(abs((now - span_wall) - elapsed))} "
+                                     f"{'ahead' if now - span_wall > elapsed else 'back'} (suspend or clock change); not counted.")
+            with state_lock:
+                drain_input_locked()
+                last_act_time = app_state.last_activity_time
+                # Input callbacks read prev_overall_active_state under the same lock to decide whether to wake us,
+                # so the state read and the flag written by advance_activity must not be split across lock sections.
+                active_part, active_now_local, transition = activity_state.advance_activity(app_state, now, elapsed, _current_inactivity_timeout)
+                if transition: log_msg_parts.append(transition)
+                app_state.last_tick_time = None if paused else now; app_state.last_tick_monotonic = None if paused else mono
+                idle_start_for_log = app_state.current_idle_start_time
+            if not active_now_local and latest_input_time() > last_act_time: _tracking_wakeup.set()
+            tl = _timeline
+            if tl is not None and active_part > 0: tl.mark_active(span_start, span_start + active_part)
+            current_inactive_seconds_for_log = 0 if active_now_local or idle_start_for_log is None else (now - idle_start_for_log)
+            if not active_now_local and current_inactive_seconds_for_log >= LONG_INACTIVITY_THRESHOLD and (now - self._last_inactivity_log >= LONG_INACTIVITY_THRESHOLD):
+                log_msg_parts.append(f"Still inactive ({round(current_inactive_seconds_for_log / 60)}m)")
+                self._last_inactivity_log = now
+            elif active_now_local: self._last_inactivity_log = 0
+            with state_lock:
+                ended = activity_state.advance_timer(app_state, elapsed, active_part)
+                if ended is not None and ended["ended"] == "focus":
+                    effectiveness = log_focus_session_locked(now, ended["focus_seconds"], ended["active_seconds"])
+                    log_msg_parts.append(f"Focus ({ended['duration_minutes']}m) ended. Eff: {effectiveness:.1f}%.")
+                    log_msg_parts.append(f"Starting Break ({int(ended['break_seconds']/60)}m).")
+                elif ended is not None:
+                    app_state.current_focus_start_time = now; app_state.current_focus_interruptions = 0; app_state.current_focus_paused_seconds = 0.0
+                    log_msg_parts.append(f"Break ({int(ended['break_seconds']/60)}m) ended. Starting Focus ({int(ended['focus_seconds']/60)}m).")
+        if log_msg_parts:
+            final_log_msg = " ".join(log_msg_parts)
+            self.log(final_log_msg)
+        if not paused and "midnight" in due and now >= self._next_midnight:
+            self._next_midnight = _next_midnight_timestamp(now)
+            today_iso = datetime.date.today().isoformat()
+            with state_lock: current_day_s = app_state.current_day_string
+            if current_day_s != today_iso:
+                self.log(f"Day change: {today_iso}. Resetting counters.")
+                save_daily_data()
+                with state_lock:
+                    drain_input_locked(); reset_mouse_distance_anchor()
+                    app_state.update({
+                        "current_day_string": today_iso, "total_active_seconds_today": 0.0, "total_idle_seconds_today": 0.0,
+                        "max_idle_seconds_today": 0.0, "max_active_seconds_today": 0.0, "mouse_total_distance_today": 0.0, 
+                        "keystrokes_today": 0, "mouse_clicks_today": 0, "last_activity_duration": 0.0, 
+                        "last_inactivity_duration": 0.0, "current_idle_start_time": None, "current_activity_start_time": now,
+                        "last_activity_time": now, "prev_overall_active_state": True, "mouse_last_pos_for_distance": None,
+                        "current_focus_active_seconds": 0.0, "last_tick_time": now, "last_tick_monotonic": mono,
+                    })
+                load_daily_data()
+        if not paused and "save" in due: save_daily_data(); self._last_save = mono
+        # Deadlines for the next pass: anything that can change state without input waking us. Input while idle and
+        # GUI commands wake us early, and each pass moves these to what the new state implies.
+        with state_lock:
+            publish_state_locked()
+            active = app_state.prev_overall_active_state; last_act_time = app_state.last_activity_time
+            idle_start = app_state.current_idle_start_time; timer_rem = app_state.timer_seconds_remaining
+        if paused:
+            for name in ("save", "timer", "inactivity", "long_idle"): sched.cancel(name)
+        else:
+            if sched.when("save") is None: sched.schedule("save", max(mono, self._last_save + SAVE_INTERVAL))
+            sched.schedule("timer", mono + max(0.0, timer_rem))
+            if active: sched.schedule("inactivity", mono + max(0.0, last_act_time + _current_inactivity_timeout - now)); sched.cancel("long_idle")
+            else:
+                sched.cancel("inactivity")
+                if idle_start is None: sched.cancel("long_idle")
+                else: sched.schedule("long_idle", mono + max(0.0, max(idle_start, self._last_inactivity_log) + LONG_INACTIVITY_THRESHOLD - now))
+            self._schedule_wall("midnight", self._next_midnight, now, mono, False)
+        self._schedule_wall("timed_break_end", self.timed_break_end_time if self.timed_break_active else None, now, mono, False)
+        sched.schedule("heartbeat", mono + WALL_CLOCK_RECHECK)
+        return sched.next_deadline()
+
+    def _schedule_wall(self, name: str, wall: Optional[float], now: float, mono: float, reanchor: bool):
+        # Schedules (or with wall None cancels) a deadline given in time.time() terms. Unchanged targets keep their
+        # heap entry, so a pass with nothing new costs a dictionary lookup.
+        if wall is None: self._scheduler.cancel(name); self._wall_targets.pop(name, None); return
+        if reanchor or self._wall_targets.get(name) != wall or self._scheduler.when(name) is None:
+            self._scheduler.schedule(name, mono + (wall - now)); self._wall_targets[name] = wall
+
+    def _sample_input_rates(self, mono: float):
+        m = _mouse_input.events; k = _keyboard_input.events; prev = self._rate_sample
+        if prev is not None and mono - prev[0] < 1.0: return # too short a span for a meaningful rate
+        if prev is not None:
+            span = mono - prev[0]
+            _m_input_rate["mouse"].set(max(0, m - prev[1]) / span); _m_input_rate["keyboard"].set(max(0, k - prev[2]) / span)
+        self._rate_sample = (mono, m, k)
+
+# --- IPC: newline-delimited JSON over a Unix domain socket ---
+# Request:  {"cmd": "<name>", ...arguments}
+# Response: {"ok": true, "result": ...} or {"ok": false, "error": "..."}
+# {"cmd": "watch"} turns the connection into a one-way stream: a response carrying the event counter whenever the
+# engine logs a state change (and every IPC_WATCH_KEEPALIVE seconds), until the client hangs up.
+_IPC_COMMANDS = {
+    "snapshot": lambda e, a: e.snapshot(),
+    "events": lambda e, a: e.events_since(int(a.get("since", 0))),
+    "event_seq": lambda e, a: e.event_seq,
+    "pause": lambda e, a: e.manual_pause_session(),
+    "continue": lambda e, a: e.manual_continue_session(),
+    "add_five_min_break": lambda e, a: e.add_or_start_5_min_break(),
+    "timed_break": lambda e, a: e.start_timed_break(int(a["seconds"]), bool(a.get("extendable", False))),
+    "reset": lambda e, a: e.reset_daily_activity_counter(),
+    "apply_timer_settings": lambda e, a: e.apply_timer_settings(int(a["focus_minutes"]), int(a["break_minutes"])),
+    "apply_inactivity_timeout": lambda e, a: e.apply_inactivity_timeout_setting(float(a["seconds"])),
+    "focus_sessions": lambda e, a: e.focus_sessions(int(a.get("offset", 0)), int(a.get("count", 20))),
+    "day_history": lambda e, a: e.day_history(a.get("since")),
+}
+
+class _IPCHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                if request.get("cmd") == "watch": self._watch(int(request.get("since", -1))); return
+                command = _IPC_COMMANDS.get(request.get("cmd"))
+                if command is None: raise ValueError(f"Unknown command {request.get('cmd')!r}")
+                response = {"ok": True, "result": command(self.server.engine, request)}
+            except Exception as e: response = {"ok": False, "error": str(e)}
+            self.wfile.write(json.dumps(response, separators=(",", ":"), default=dict).encode("utf-8") + b"\n") # dict: snapshots
+
+    def _watch(self, seq: int):
+        engine = self.server.engine
+        try:
+            while not self.server.closed:
+                seq = engine.wait_event_seq(seq, IPC_WATCH_KEEPALIVE)
+                self.wfile.write(b'{"ok":true,"result":%d}\n' % seq)
+        except OSError: pass # the client hung up
+
+class EngineServer:
+    def __init__(self, engine: TrackerEngine, path: str = IPC_SOCKET_PATH):
+        if not hasattr(socket, "AF_UNIX"): raise OSError("Unix domain sockets are not available on this platform")
+        self.engine = engine; self.path = path; self._server = None
+
+    def start(self):
+        if os.path.exists(self.path):
+            # A socket left behind by a crashed daemon is removed; a live one means another engine is running.
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try: probe.connect(self.path)
+            except OSError: os.unlink(self.path)
+            else: raise OSError(f"Another tracker engine is already serving {self.path}")
+            finally: probe.close()
+        self._server = socketserver.ThreadingUnixStreamServer(self.path, _IPCHandler)
+        self._server.daemon_threads = True; self._server.engine = self.engine; self._server.closed = False
+        os.chmod(self.path, 0o600)
+        threading.Thread(target=self._server.serve_forever, daemon=True, name="EngineIPC").start()
+
+    def stop(self):
+        if self._server is None: return
+        self._server.closed = True # ends "watch" streams at their next keepalive
+        self._server.shutdown(); self._server.server_close(); self._server = None
+        try: os.unlink(self.path)
+        except OSError: pass
+
+class EngineClient:
+    # Same command surface as TrackerEngine, forwarded to a running daemon; lets the GUI act as a thin client.
+    def __init__(self, path: str = IPC_SOCKET_PATH, timeout: float = 2.0):
+        self.path = path; self.timeout = timeout
+        self._lock = threading.Lock(); self._sock = None; self._file = None
+        self._watched_seq: Optional[int] = None; self._watcher: Optional[threading.Thread] = None; self._closed = False
+
+    def _connect(self):
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM); self._sock.settimeout(self.timeout)
+        self._sock.connect(self.path); self._file = self._sock.makefile("rwb")
+
+    def close(self):
+        self._closed = True
+        with self._lock:
+            if self._sock is not None: self._file.close(); self._sock.close(); self._sock = None; self._file = None
+
+    def call(self, cmd: str, **args) -> Any:
+        with self._lock:
+            try:
+                if self._sock is None: self._connect()
+                self._file.write(json.dumps({"cmd": cmd, **args}).encode("utf-8") + b"\n"); self._file.flush()
+                line = self._file.readline()
+                if not line: raise ConnectionError("Tracker engine closed the connection")
+            except OSError:
+                if self._sock is not None: self._sock.close(); self._sock = None; self._file = None
+                raise
+        response = json.loads(line)
+        if not response["ok"]: raise ValueError(response["error"])
+        return response["result"]
+
+    def snapshot(self) -> Dict[str, Any]: return self.call("snapshot")
+    def events_since(self, seq: int): return self.call("events", since=seq)
+    def focus_sessions(self, offset: int = 0, count: int = 20) -> Dict[str, Any]: return self.call("focus_sessions", offset=offset, count=count)
+    def day_history(self, since: Optional[str] = None) -> Dict[str, Any]: return self.call("day_history", since=since)
+    @property
+    def event_seq(self) -> Optional[int]:
+        # Pushed by the engine over a second connection ("watch"), so front ends can probe it as often as they like
+        # without a round trip. None until the first push and while the engine is unreachable.
+        if self._watcher is None:
+            self._watcher = threading.Thread(target=self._watch_events, daemon=True, name="EngineWatch"); self._watcher.start()
+        return self._watched_seq
+
+    def _watch_events(self):
+        while not self._closed:
+            try:
+                with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                    sock.settimeout(IPC_WATCH_KEEPALIVE * 2); sock.connect(self.path)
+                    sock.sendall(b'{"cmd":"watch"}\n'); f = sock.makefile("rb")
+                    while not self._closed:
+                        line = f.readline()
+                        if not line: break
+                        self._watched_seq = json.loads(line)["result"]
+            except (OSError, ValueError, KeyError): pass
+            self._watched_seq = None
+            if not self._closed: time.sleep(1.0)
+    def manual_pause_session(self): self.call("pause")
+    def manual_continue_session(self): self.call("continue")
+    def add_or_start_5_min_break(self): self.call("add_five_min_break")
+    def start_timed_break(self, duration_seconds: int, is_extendable: bool = False): self.call("timed_break", seconds=duration_seconds, extendable=is_extendable)
+    def reset_daily_activity_counter(self): self.call("reset")
+    def apply_timer_settings(self, focus_minutes: int, break_minutes: int): self.call("apply_timer_settings", focus_minutes=focus_minutes, break_minutes=break_minutes)
+    def apply_inactivity_timeout_setting(self, seconds: float): self.call("apply_inactivity_timeout", seconds=seconds)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless activitytracker3000 engine serving snapshots and commands over a Unix socket")
+    parser.add_argument("--socket", default=IPC_SOCKET_PATH, help=f"socket path (default: {IPC_SOCKET_PATH})")
+    parser.add_argument("--metrics-port", type=int, default=METRICS_PORT, help=f"localhost metrics port, 0 to disable (default: {METRICS_PORT})")
+    parser.add_argument("--no-metrics", action="store_true", help="turn metrics collection off entirely")
+    args = parser.parse_args(argv)
+    if args.no_metrics: activity_metrics.set_enabled(False)
+    try: os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    except Exception as e: print(f"CWD Error: {e}")
+
+    engine = TrackerEngine(); server = EngineServer(engine, args.socket)
+    metrics = activity_metrics.MetricsServer(args.metrics_port, METRICS_DUMP_FILE)
+    stop = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM): signal.signal(sig, lambda *_: stop.set())
+    engine.start(); server.start(); metrics.start()
+    engine.log(f"Engine serving {args.socket}.")
+    print(f"Tracker engine running; socket {args.socket}. Ctrl+C to stop.")
+    while not stop.wait(1.0): pass
+    server.stop(); engine.stop(); metrics.stop(); print("Engine stopped.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())